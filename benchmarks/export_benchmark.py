@@ -0,0 +1,242 @@
+"""benchmark of the export pipeline on synthetic `keras.Sequential` models (`python benchmarks/export_benchmark.py`).
+
+Each model of a grid of depths, widths, activations and input normalization (on/off) is exported stage by stage like
+`nnigen`: parser construction, `generate_struct_layers`, `generate_struct_layer_weights`, writing the ST files and
+streaming the weights file. A second export of the weights file into the same directory measures the comparison with the
+existing file (the file is kept, if it is unchanged). The time of each stage is the best of `--repeat` runs, the peak memory
+(`tracemalloc`) is measured in a separate run. The results can be stored as baseline and compared to it, the exit code
+is 1 if a stage got slower or needs more memory than the baseline by more than `--threshold`.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+STAGES = (
+    "parser",
+    "generate_struct_layers",
+    "generate_struct_layer_weights",
+    "write_st_files",
+    "write_weights_file",
+    "rewrite_weights_file",
+)
+""" timed stages of an export, in the order of `nnigen`, and the re-export of the unchanged weights file"""
+
+DEFAULT_GRID = {
+    "depths": (2, 8),
+    "widths": (32, 256, 1024),
+    "activations": ("relu", "tanh"),
+    "normalizations": (False, True),
+}
+""" default grid of the synthetic models (number of hidden layers, neurons per hidden layer, activation of the hidden
+layers, input normalization)"""
+
+NUM_INPUTS, NUM_OUTPUTS = 8, 2
+""" input and output dimension of all synthetic models"""
+
+MIN_REGRESSION_S = 1e-3
+""" stages faster than this in both runs are not compared (timer noise)"""
+
+
+def get_model_id(depth: int, width: int, activation: str, normalization: bool) -> str:
+    """returns the name of a synthetic model (also used as PLC model name)."""
+    return f"d{depth}_w{width}_{activation}" + ("_norm" if normalization else "")
+
+
+def build_model(depth: int, width: int, activation: str, normalization: bool, seed: int = 0) -> "keras.Sequential":
+    """returns a synthetic model with `depth` hidden dense layers of `width` neurons and reproducible weights."""
+    import keras
+
+    keras.utils.set_random_seed(seed)
+    layers = [keras.Input((NUM_INPUTS,))]
+    if normalization:
+        rng = np.random.default_rng(seed)
+        layers.append(
+            keras.layers.Normalization(mean=rng.normal(size=NUM_INPUTS), variance=rng.uniform(0.5, 2, NUM_INPUTS))
+        )
+    layers += [keras.layers.Dense(width, activation=activation) for _ in range(depth)]
+    layers.append(keras.layers.Dense(NUM_OUTPUTS))
+    return keras.Sequential(layers)
+
+
+def run_stages(model: "keras.Sequential", model_name: str, path: str, trace_memory: bool = False) -> dict:
+    """exports a model stage by stage like `nnigen` (TwinCAT XML files).
+
+    ### Outputs:
+
+    dictionary with the time of each stage in seconds, `st_bytes`, `weights_bytes` and, with `trace_memory`, the peak
+    memory of each stage in bytes (`<stage>_peak_bytes`)
+    """
+    from nnigen.nnigen import get_model_parser
+    from nnigen.gen_st import TwinCAT_ST_writer
+
+    result, objects = {}, {}
+    stages = {
+        "parser": lambda: objects.setdefault("parser", get_model_parser(model, model_name)),
+        "generate_struct_layers": lambda: objects["parser"].generate_struct_layers(),
+        "generate_struct_layer_weights": lambda: objects["parser"].generate_struct_layer_weights(),
+        "write_st_files": lambda: objects.setdefault(
+            "writer", TwinCAT_ST_writer(model_name, objects["parser"])
+        ).write_ST_files_to(path, overwrite_if_exists=True),
+        "write_weights_file": lambda: objects["writer"].write_weights_file(overwrite_if_exists=True),
+        "rewrite_weights_file": lambda: objects["writer"].write_weights_file(overwrite_if_exists=True),
+    }
+    for stage in STAGES:
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        stages[stage]()
+        result[stage] = time.perf_counter() - start
+        if trace_memory:
+            result[f"{stage}_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    result["st_bytes"] = sum(len(contents.encode()) for contents in objects["writer"].to_write.values())
+    result["weights_bytes"] = os.path.getsize(os.path.join(path, f"{model_name}_weights.dat"))
+    return result
+
+
+def benchmark_model(depth: int, width: int, activation: str, normalization: bool, repeat: int = 3) -> dict:
+    """benchmarks the export of one synthetic model.
+
+    ### Outputs:
+
+    dictionary with `model`, `num_parameters`, the best time of each stage and `total_s` in seconds, the largest peak
+    memory of the stages `peak_memory_bytes`, `st_bytes` and `weights_bytes`
+    """
+    model_name = get_model_id(depth, width, activation, normalization)
+    model = build_model(depth, width, activation, normalization)
+    runs = []
+    with tempfile.TemporaryDirectory() as path:
+        for run in range(repeat):  # a new directory per run, the export cache would skip writing unchanged ST files
+            runs.append(run_stages(model, model_name, os.path.join(path, str(run))))
+        memory_run = run_stages(model, model_name, os.path.join(path, "memory"), trace_memory=True)
+
+    result = {"model": model_name, "num_parameters": model.count_params()}
+    for stage in STAGES:
+        result[stage] = min(run[stage] for run in runs)
+    result["total_s"] = sum(result[stage] for stage in STAGES)
+    result["peak_memory_bytes"] = max(memory_run[f"{stage}_peak_bytes"] for stage in STAGES)
+    result["st_bytes"], result["weights_bytes"] = runs[0]["st_bytes"], runs[0]["weights_bytes"]
+    return result
+
+
+def compare_to_baseline(results: list, baseline: dict, threshold: float = 0.25) -> list:
+    """compares the results to a baseline (results of an earlier run by model).
+
+    ### Inputs:
+
+    results: list                       ... results of `benchmark_model`
+    baseline: dict                      ... earlier results by model name
+    threshold: float [default: 0.25]    ... relative increase of a time or the peak memory, which is a regression
+
+    ### Outputs:
+
+    list of findings (dictionaries with `model`, `metric`, `baseline`, `value` and `regression`): times and the peak
+    memory above the threshold (regressions) and changed output sizes (no regression, but worth a look)
+    """
+    findings = []
+    for result in results:
+        reference = baseline.get(result["model"])
+        if reference is None:
+            continue
+        for metric in STAGES + ("total_s", "peak_memory_bytes"):
+            if metric not in reference:
+                continue
+            if metric != "peak_memory_bytes" and max(result[metric], reference[metric]) < MIN_REGRESSION_S:
+                continue
+            if result[metric] > reference[metric] * (1 + threshold):
+                findings.append(
+                    {
+                        "model": result["model"],
+                        "metric": metric,
+                        "baseline": reference[metric],
+                        "value": result[metric],
+                        "regression": True,
+                    }
+                )
+        for metric in ("st_bytes", "weights_bytes"):
+            if metric in reference and result[metric] != reference[metric]:
+                findings.append(
+                    {
+                        "model": result["model"],
+                        "metric": metric,
+                        "baseline": reference[metric],
+                        "value": result[metric],
+                        "regression": False,
+                    }
+                )
+    return findings
+
+
+def format_results(results: list, findings: list = None) -> str:
+    """formats the results as a table with one row per model (times in ms) and the findings of the comparison."""
+    stage_columns = ("parser", "layers", "weights", "write ST", "write dat", "rewrite")
+    lines = [
+        f"{'model':<22}{'params':>10}"
+        + "".join(f"{column:>10}" for column in stage_columns)
+        + f"{'total':>10}{'peak MiB':>10}{'ST bytes':>11}{'dat bytes':>11}"
+    ]
+    for result in results:
+        lines.append(
+            f"{result['model']:<22}{result['num_parameters']:>10}"
+            + "".join(f"{result[stage] * 1000:>10.2f}" for stage in STAGES)
+            + f"{result['total_s'] * 1000:>10.2f}{result['peak_memory_bytes'] / 2**20:>10.2f}"
+            + f"{result['st_bytes']:>11}{result['weights_bytes']:>11}"
+        )
+    lines.append(f"total export time of {len(results)} models: {sum(r['total_s'] for r in results):.3f} s")
+    if findings is not None:
+        regressions = [finding for finding in findings if finding["regression"]]
+        for finding in findings:
+            lines.append(
+                f"{'regression' if finding['regression'] else 'changed'}: {finding['model']} {finding['metric']} "
+                + f"{finding['baseline']:.6g} -> {finding['value']:.6g}"
+            )
+        lines.append(f"{len(regressions)} regressions compared to the baseline")
+    return "\n".join(lines)
+
+
+def main(argv: list = None) -> int:
+    """entry point of the benchmark, returns 1 if a regression compared to the baseline was found."""
+    argument_parser = argparse.ArgumentParser(description="Benchmarks the export stages on synthetic Keras models.")
+    argument_parser.add_argument("--depths", type=int, nargs="+", default=DEFAULT_GRID["depths"])
+    argument_parser.add_argument("--widths", type=int, nargs="+", default=DEFAULT_GRID["widths"])
+    argument_parser.add_argument("--activations", nargs="+", default=DEFAULT_GRID["activations"])
+    argument_parser.add_argument(
+        "--normalizations", type=int, nargs="+", default=DEFAULT_GRID["normalizations"], help="0: off, 1: on"
+    )
+    argument_parser.add_argument("--repeat", type=int, default=3, help="runs per model, the best time is kept")
+    argument_parser.add_argument("--baseline", default=None, help="JSON file of an earlier run to compare to")
+    argument_parser.add_argument("--save-baseline", default=None, help="store the results in this JSON file")
+    argument_parser.add_argument(
+        "--threshold", type=float, default=0.25, help="relative increase, which is a regression (default: 0.25)"
+    )
+    args = argument_parser.parse_args(argv)
+
+    results = []
+    for depth in args.depths:
+        for width in args.widths:
+            for activation in args.activations:
+                for normalization in args.normalizations:
+                    results.append(benchmark_model(depth, width, activation, bool(normalization), args.repeat))
+                    print(f"[{len(results)}] {results[-1]['model']}: {results[-1]['total_s']:.3f} s", file=sys.stderr)
+
+    findings = None
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            findings = compare_to_baseline(results, json.load(f)["models"], args.threshold)
+    print(format_results(results, findings))
+
+    if args.save_baseline is not None:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"models": {result["model"]: result for result in results}}, f, indent=2)
+    return int(any(finding["regression"] for finding in findings or []))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
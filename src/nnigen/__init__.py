@@ -1 +1,7 @@
-from nnigen.nnigen import nnigen, get_example_usage, update_model_weigths
\ No newline at end of file
+from nnigen.nnigen import nnigen, get_example_usage, update_model_weigths, validate_export, get_precision_report, get_quantization_report
+from nnigen.emulator import rtnni_emulator
+from nnigen.quantize import int8_quantized_parser
+from nnigen.optimize import normalization_folding_parser
+from nnigen.sparse import sparse_layer_parser
+from nnigen.chunking import chunked_weights_parser
+from nnigen.approximation import approximated_activation_parser
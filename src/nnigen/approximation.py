@@ -0,0 +1,168 @@
+from typing import Iterator
+import numpy as np
+
+from nnigen.parse_model import (
+    model_parser,
+    model_parser_stage,
+    activation_or_normalization,
+    get_layer_role,
+    pad_weights_layout,
+)
+from nnigen.emulator import rtnni_emulator, activation_functions, get_numpy_data_type
+
+APPROXIMATED_ACTIVATIONS = (
+    activation_or_normalization.tanh,
+    activation_or_normalization.sigmoid,
+    activation_or_normalization.softplus,
+    activation_or_normalization.silu,
+    activation_or_normalization.selu,
+)
+""" activation functions, which RTNNI evaluates with `EXP` and which can be replaced by a table"""
+
+MAX_TABLE_RANGE = 1e2
+""" largest magnitude of the table bounds, RTNNI evaluates the exact functions as constant or linear beyond"""
+
+DEFAULT_TABLE_SIZES = (32, 64, 128, 256, 512, 1024, 2048, 4096)
+""" numbers of intervals per table, which are tried in this order"""
+
+
+def get_activation_table(
+    activation: activation_or_normalization, x_min: float, x_max: float, num_intervals: int, data_type: np.dtype
+) -> np.ndarray:
+    """returns the table of `F_ActivationLayer_LUT` for an activation function on the range `[x_min, x_max]`.
+
+    The table contains `x_min`, `x_max`, `num_intervals / (x_max - x_min)`, `num_intervals` and the exact function values
+    at the `num_intervals + 1` equidistant interval bounds (see `nnigen.emulator.evaluate_activation_table`). If the
+    range contains 0, it is shifted by less than one interval, such that 0 is an interval bound.
+    """
+    if not x_max > x_min:  # constant pre-activations, the table must not be empty
+        x_max = x_min + 1.0
+    step = (x_max - x_min) / num_intervals
+    if x_min < 0 < x_max:  # 0 is an interval bound (`selu` is not differentiable there), the last step may be exact
+        x_min = -np.ceil(-x_min / step) * step
+        x_max = x_min + num_intervals * step
+    x_min, x_max = np.asarray([x_min, x_max], dtype=data_type).astype(np.float64)
+    values = activation_functions[activation](np.linspace(x_min, x_max, num_intervals + 1))
+    header = [x_min, x_max, num_intervals / (x_max - x_min), num_intervals]
+    return np.concatenate([header, values]).astype(data_type)
+
+
+class approximated_activation_parser(model_parser_stage):
+    """Replaces the exact activation functions of a float model by tables with linear interpolation.
+
+    `tanh`, `sigmoid`, `softplus`, `silu` and `selu` evaluate `EXP` in RTNNI. For each layer with one of these
+    activations, the `LayerWeights` struct contains `<layer>_activation_table` (see `get_activation_table`) on the range
+    of its pre-activations for the calibration inputs, values outside of the range are evaluated exactly. On the PLC,
+    `F_ActivationLayer_LUT` is used for layers with a `pointer_table`.
+
+    The smallest table size of `table_sizes`, for which the emulated outputs deviate at most `tolerance` from the
+    reference outputs on the calibration inputs, is selected. If no size meets the tolerance, a `RuntimeError` is raised.
+    """
+
+    def __init__(
+        self,
+        parser: model_parser,
+        calibration_inputs: np.ndarray,
+        tolerance: float,
+        reference_outputs: np.ndarray = None,
+        table_sizes: tuple = DEFAULT_TABLE_SIZES,
+    ):
+        """approximated_activation_parser __init__
+
+        ### Inputs:
+
+        parser: `model_parser`                  ... parser of the float model (not quantized)
+        calibration_inputs: np.ndarray          ... representative model inputs of shape `(num_samples, num_inputs)`
+                                                    (sequence models: `(num_samples, num_steps, num_inputs)`)
+        tolerance: float                        ... maximum absolute deviation of the outputs from `reference_outputs`
+        reference_outputs: np.ndarray [default: None] ... outputs of the exact model (e.g. Keras) for the calibration
+                                                    inputs. If `None`, the exact export (emulated) is the reference.
+        table_sizes: tuple [default: DEFAULT_TABLE_SIZES] ... numbers of intervals per table, tried in this order
+        """
+        if parser.quantized:
+            raise ValueError("Approximated activations are not supported for quantized models.")
+        if not table_sizes or min(table_sizes) < 1:
+            raise ValueError(f"Table sizes must be positive, got {table_sizes}.")
+
+        super(approximated_activation_parser, self).__init__(parser)
+        layer_table = self.get_layer_table()
+        self.approximated_layers = {
+            layer_counter
+            for layer_counter, (_, _, activation) in enumerate(layer_table, start=1)
+            if activation in APPROXIMATED_ACTIVATIONS
+        }
+        if not self.approximated_layers:
+            raise ValueError(f"Model '{self.model_name}' has no activation function to approximate.")
+
+        calibration_inputs = np.asarray(calibration_inputs, dtype=np.float64)
+        exact_emulator = rtnni_emulator(parser)
+        if reference_outputs is None:
+            reference_outputs = exact_emulator.predict(calibration_inputs)
+        self.exact_deviation = exact_emulator.max_deviation(reference_outputs, calibration_inputs)
+
+        pre_activations = exact_emulator.get_pre_activations(calibration_inputs)
+        self.table_ranges = {
+            layer_counter: np.clip(
+                [np.min(pre_activations[layer_counter - 1]), np.max(pre_activations[layer_counter - 1])],
+                -MAX_TABLE_RANGE,
+                MAX_TABLE_RANGE,
+            )
+            for layer_counter in self.approximated_layers
+        }
+
+        for num_intervals in table_sizes:
+            self.num_intervals = num_intervals
+            self.tables = self._get_tables(num_intervals)
+            self.max_deviation = rtnni_emulator(self).max_deviation(reference_outputs, calibration_inputs)
+            if self.max_deviation <= tolerance:
+                return
+        raise RuntimeError(
+            f"Approximated activations of '{self.model_name}' deviate {self.max_deviation:.3e} from the reference with "
+            + f"{self.num_intervals} intervals per table (exact activations: {self.exact_deviation:.3e}), which exceeds "
+            + f"the tolerance of {tolerance:.3e}. Export with exact activations or a larger tolerance."
+        )
+
+    def _get_tables(self, num_intervals: int) -> dict:
+        """returns the activation tables of all approximated layers by member name."""
+        layer_table = self.get_layer_table()
+        data_type = get_numpy_data_type(self)
+        tables = {}
+        for layer_counter in sorted(self.approximated_layers):
+            x_min, x_max = self.table_ranges[layer_counter]
+            tables[f"{get_layer_role(layer_counter, len(layer_table))}_activation_table"] = get_activation_table(
+                layer_table[layer_counter - 1][2], x_min, x_max, num_intervals, data_type
+            )
+        return tables
+
+    def get_approximated_layers(self) -> set:
+        return set(self.approximated_layers)
+
+    def _get_row_macs(self, layer_counter: int) -> np.ndarray:
+        return self.parser._get_row_macs(layer_counter)
+
+    def get_weights_layout(self) -> list:
+        """returns the layout of the wrapped parser followed by the activation tables (padded to a multiple of 8 bytes)."""
+        layout = self.parser.get_weights_layout() + [
+            (member_name, table.shape, self.nn_data_type) for member_name, table in self.tables.items()
+        ]
+        return pad_weights_layout(layout, member_name="table_padding")
+
+    def _iter_weights(self) -> Iterator[np.ndarray]:
+        yield from self.parser._iter_weights()
+        for member_name, shape, _ in self.get_weights_layout()[len(self.parser.get_weights_layout()) :]:
+            if member_name == "table_padding":
+                yield np.zeros(shape, dtype=np.uint8)
+            else:
+                yield self.tables[member_name]
+
+    def generate_struct_layers(self) -> str:
+        """returns the `Layers` struct of the wrapped parser with the table pointers of the approximated layers."""
+        context = self.parser.generate_struct_layers()
+        layer_table = self.get_layer_table()
+        for layer_counter in self.approximated_layers:
+            layer_role = get_layer_role(layer_counter, len(layer_table))
+            context = context.replace(
+                f"pointer_bias:= ADR(weights.{layer_role}_bias)",
+                f"pointer_bias:= ADR(weights.{layer_role}_bias),pointer_table:= ADR(weights.{layer_role}_activation_table)",
+            )
+        return context
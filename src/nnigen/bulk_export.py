@@ -0,0 +1,175 @@
+"""command line interface to export many models in parallel (`nnigen-export <manifest.json>`)."""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+
+ARRAY_OPTIONS = ("quantization_calibration_inputs", "folding_verification_inputs", "activation_calibration_inputs")
+""" options of `nnigen` which are given as paths of `.npy` files in the manifest"""
+
+
+def read_manifest(manifest_path: str) -> list:
+    """reads the export jobs of a manifest.
+
+    The manifest is a JSON file with a list `models` (or only this list). Each entry contains the path of the saved
+    Keras model `model`, the PLC model name `name`, the export path `path` and optionally further keyword arguments of
+    `nnigen` (arrays as paths of `.npy` files). The dictionary `defaults` applies to all entries. Relative paths are
+    relative to the manifest.
+
+    ### Outputs:
+
+    list of export jobs (dictionaries with `model`, `name`, `path` and `options`)
+    """
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if isinstance(manifest, list):
+        manifest = {"models": manifest}
+
+    base_path = os.path.dirname(os.path.abspath(manifest_path))
+    jobs = []
+    for entry in manifest["models"]:
+        entry = {**manifest.get("defaults", {}), **entry}
+        missing_keys = [key for key in ("model", "name", "path") if key not in entry]
+        if missing_keys:
+            raise ValueError(f"Manifest entry {entry} misses {missing_keys}.")
+
+        options = {key: value for key, value in entry.items() if key not in ("model", "name", "path")}
+        for key in ARRAY_OPTIONS:
+            if isinstance(options.get(key), str):
+                options[key] = os.path.join(base_path, options[key])
+        jobs.append(
+            {
+                "model": os.path.join(base_path, entry["model"]),
+                "name": entry["name"],
+                "path": os.path.join(base_path, entry["path"]),
+                "options": options,
+            }
+        )
+
+    names = [job["name"] for job in jobs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Model names must be unique, found duplicates {duplicates}.")
+    return jobs
+
+
+def export_model(job: dict) -> dict:
+    """loads the Keras model of an export job and exports it with `nnigen` (runs in a worker process).
+
+    ### Outputs:
+
+    dictionary with `name`, `status` ("ok" or "failed"), `error`, the times `load_s` and `export_s` in seconds and the
+    sizes of the written `weights_bytes` and ST files `st_bytes`
+    """
+    result = {"name": job["name"], "status": "failed", "error": None, "load_s": 0.0, "export_s": 0.0}
+    try:
+        import keras
+        from nnigen.nnigen import nnigen
+
+        start = time.perf_counter()
+        model = keras.models.load_model(job["model"])
+        options = dict(job["options"])
+        for key in ARRAY_OPTIONS:
+            if isinstance(options.get(key), str):
+                options[key] = np.load(options[key])
+        result["load_s"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        nnigen(model, job["name"], job["path"], **options)
+        result["export_s"] = time.perf_counter() - start
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        return result
+
+    result["weights_bytes"] = os.path.getsize(os.path.join(job["path"], f"{job['name']}_weights.dat"))
+    result["st_bytes"] = sum(
+        os.path.getsize(os.path.join(job["path"], file_name))
+        for file_name in os.listdir(job["path"])
+        if file_name.startswith(
+            (
+                f"FB_{job['name']}.",
+                f"FB_{job['name']}_Batch.",
+                f"FB_{job['name']}_Weights.",
+                f"GVL_{job['name']}.",
+                f"{job['name']}_Layer",
+            )
+        )
+    )
+    result["status"] = "ok"
+    return result
+
+
+def bulk_export(jobs: list, max_workers: int = None) -> list:
+    """exports all jobs (see `read_manifest`) in a pool of processes.
+
+    ### Inputs:
+
+    jobs: list                          ... export jobs
+    max_workers: int [default: None]    ... number of processes (`None`: number of CPUs, at most one per job)
+
+    ### Outputs:
+
+    results of `export_model` in the order of the jobs
+    """
+    if not jobs:
+        return []
+    max_workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+
+    # spawn: the deep learning backends are not fork-safe once initialized
+    with ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = {executor.submit(export_model, job): job_num for job_num, job in enumerate(jobs)}
+        results = [None] * len(jobs)
+        for num_done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            results[futures[future]] = result
+            print(f"[{num_done}/{len(jobs)}] {result['name']}: {result['status']}", file=sys.stderr)
+    return results
+
+
+def format_summary(results: list, wall_time_s: float) -> str:
+    """formats the results of `bulk_export` as a table with one row per model and the totals."""
+    lines = [f"{'model':<32} {'status':<7} {'load s':>8} {'export s':>9} {'weights bytes':>14} {'ST bytes':>10}"]
+    for result in results:
+        lines.append(
+            f"{result['name']:<32} {result['status']:<7} {result['load_s']:>8.2f} {result['export_s']:>9.2f} "
+            + f"{result.get('weights_bytes', 0):>14} {result.get('st_bytes', 0):>10}"
+        )
+    failed = [result for result in results if result["status"] != "ok"]
+    lines.append(
+        f"{len(results) - len(failed)} of {len(results)} models exported in {wall_time_s:.2f} s "
+        + f"(sum of worker times {sum(result['load_s'] + result['export_s'] for result in results):.2f} s)"
+    )
+    for result in failed:
+        lines.append(f"failed: {result['name']}: {result['error']}")
+    return "\n".join(lines)
+
+
+def main(argv: list = None) -> int:
+    """entry point of `nnigen-export`, returns 1 if any export failed."""
+    argument_parser = argparse.ArgumentParser(
+        prog="nnigen-export", description="Exports the Keras models of a manifest to TwinCAT ST in parallel."
+    )
+    argument_parser.add_argument(
+        "manifest", help="JSON manifest of the models (see `nnigen.bulk_export.read_manifest`)"
+    )
+    argument_parser.add_argument("-j", "--jobs", type=int, default=None, help="number of processes (default: CPUs)")
+    argument_parser.add_argument("--summary-json", default=None, help="write the results to this JSON file")
+    args = argument_parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = bulk_export(read_manifest(args.manifest), max_workers=args.jobs)
+    print(format_summary(results, time.perf_counter() - start))
+
+    if args.summary_json is not None:
+        with open(args.summary_json, "w") as f:
+            json.dump(results, f, indent=2)
+    return int(any(result["status"] != "ok" for result in results))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
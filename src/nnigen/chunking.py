@@ -0,0 +1,116 @@
+from typing import Iterator
+import hashlib
+import numpy as np
+
+from nnigen.parse_model import (
+    model_parser,
+    model_parser_stage,
+    pad_weights_layout,
+    plc_data_types,
+    HASH_NUM_BYTES,
+)
+
+
+class chunked_weights_parser(model_parser_stage):
+    """Splits the weights into chunks, which the PLC loads and verifies one per cycle.
+
+    The `LayerWeights` struct of the wrapped parser (the payload, padded to a multiple of 8 bytes) is followed by
+    `chunk_table` (byte offset of each chunk in the struct and the end of the payload), `chunk_hashes` (SHA-256 of each
+    chunk) and `chunk_index_hash` (SHA-256 of `chunk_table` and `chunk_hashes`). The SHA-256 trailer of the whole file is
+    kept. On the PLC, `FB_LoadWeightsChunked` reads at most `chunk_size` bytes per cycle, then the FB verifies the chunk
+    index and one chunk per cycle before the first inference.
+    """
+
+    def __init__(self, parser: model_parser, chunk_size: int):
+        """chunked_weights_parser __init__
+
+        ### Inputs:
+
+        parser: `model_parser`              ... parser to wrap (any stage)
+        chunk_size: int                     ... bytes to load and to hash per cycle on the PLC
+        """
+        if chunk_size < 1:
+            raise ValueError(f"The chunk size must be positive, got {chunk_size}.")
+        if parser.weights_chunk_size is not None:
+            raise ValueError("The weights of the parser are chunked already.")
+
+        super(chunked_weights_parser, self).__init__(parser)
+        self.weights_chunk_size = chunk_size
+
+    @property
+    def quantized(self) -> bool:
+        return self.parser.quantized
+
+    def forward_layer(self, *args, **kwargs) -> np.ndarray:
+        """see `int8_quantized_parser.forward_layer` (quantized parsers only)"""
+        return self.parser.forward_layer(*args, **kwargs)
+
+    def _get_row_macs(self, layer_counter: int) -> np.ndarray:
+        return self.parser._get_row_macs(layer_counter)
+
+    def generate_struct_layers(self) -> str:
+        return self.parser.generate_struct_layers()
+
+    def _get_payload_layout(self) -> list:
+        """returns the layout of the wrapped parser, padded to a multiple of 8 bytes."""
+        return pad_weights_layout(self.parser.get_weights_layout(), member_name="payload_padding")
+
+    def get_payload_size(self) -> int:
+        """returns the number of bytes of the chunked part of the `LayerWeights` struct."""
+        return sum(
+            int(np.prod(shape)) * np.dtype(plc_data_types[data_type]).itemsize
+            for _, shape, data_type in self._get_payload_layout()
+        )
+
+    def get_num_chunks(self) -> int:
+        return -(-self.get_payload_size() // self.weights_chunk_size)
+
+    def get_chunk_table(self) -> np.ndarray:
+        """returns the byte offsets of all chunks in the `LayerWeights` struct and the end of the payload."""
+        payload_size = self.get_payload_size()
+        return np.append(np.arange(0, payload_size, self.weights_chunk_size), payload_size)
+
+    def get_weights_layout(self) -> list:
+        num_chunks = self.get_num_chunks()
+        layout = self._get_payload_layout() + [
+            ("chunk_table", (num_chunks + 1,), "UDINT"),
+            ("chunk_hashes", (num_chunks, HASH_NUM_BYTES), "BYTE"),
+            ("chunk_index_hash", (HASH_NUM_BYTES,), "BYTE"),
+        ]
+        return pad_weights_layout(layout, member_name="chunk_padding")
+
+    def _iter_weights(self) -> Iterator[np.ndarray]:
+        """yields the weights of the wrapped parser and hashes them chunk by chunk on the fly (one layer in memory)."""
+        chunk_table = self.get_chunk_table()
+        chunk_hashes = []
+        m = hashlib.sha256()
+        chunk_end = chunk_table[1]
+        offset = 0
+
+        weights = self.parser._iter_weights()
+        for member_name, shape, data_type in self._get_payload_layout():
+            if member_name == "payload_padding":
+                values = np.zeros(shape, dtype=np.uint8)
+            else:
+                values = np.ascontiguousarray(next(weights), dtype="<" + plc_data_types[data_type])
+            yield values
+
+            data = memoryview(values.reshape(-1)).cast("B")
+            while len(data):
+                num_bytes = min(len(data), chunk_end - offset)
+                m.update(data[:num_bytes])
+                data = data[num_bytes:]
+                offset += num_bytes
+                if offset == chunk_end:
+                    chunk_hashes.append(m.digest())
+                    m = hashlib.sha256()
+                    chunk_end = chunk_table[min(len(chunk_hashes) + 1, len(chunk_table) - 1)]
+
+        chunk_table = np.asarray(chunk_table, dtype="<" + plc_data_types["UDINT"])
+        chunk_hashes = np.frombuffer(b"".join(chunk_hashes), dtype=np.uint8)
+        yield chunk_table
+        yield chunk_hashes
+        yield np.frombuffer(hashlib.sha256(chunk_table.tobytes() + chunk_hashes.tobytes()).digest(), dtype=np.uint8)
+        for member_name, shape, _ in self.get_weights_layout():
+            if member_name == "chunk_padding":
+                yield np.zeros(shape, dtype=np.uint8)
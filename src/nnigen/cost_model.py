@@ -0,0 +1,74 @@
+cost_calibrations = {
+    "generic_x64": {
+        "mac_ns": {"LREAL": 1.0, "REAL": 0.8, "SINT": 0.7},
+        "activation_ns": {
+            "linear": 0.0,
+            "relu": 1.5,
+            "tanh": 40.0,
+            "sigmoid": 25.0,
+            "softplus": 45.0,
+            "softsign": 5.0,
+            "silu": 25.0,
+            "selu": 25.0,
+            "exponential": 20.0,
+        },
+        "neuron_overhead_ns": 8.0,
+        "layer_overhead_ns": 200.0,
+        "byte_ns": 0.05,
+        "normalization_ns": 5.0,
+        "quantization_ns": 5.0,
+        "sparse_index_ns": 1.5,
+        "activation_table_ns": 4.0,
+    },
+}
+""" per target calibration tables of instruction costs in nanoseconds.
+
+`mac_ns`               ... one multiply-accumulate per data type of the weights
+`activation_ns`        ... one evaluation of the activation function
+`neuron_overhead_ns`   ... per neuron call/dispatch overhead of the generic `F_ForwardPropagation` (not for specialized code)
+`layer_overhead_ns`    ... per layer overhead (function calls, buffer switching)
+`byte_ns`              ... per byte of weights, biases and layer buffers touched (memory traffic)
+`normalization_ns`     ... one element of input normalization or output denormalization
+`quantization_ns`      ... quantization of one layer input element (int8 models)
+`sparse_index_ns`      ... indirect access of the input per stored weight of a sparse (CSR) layer
+`activation_table_ns`  ... one evaluation of an approximated activation function (see `nnigen.approximation`)
+
+The values of "generic_x64" are rough estimates for an x64 industrial PC. For reliable budgets, add a table measured on
+the actual target (e.g. `cost_calibrations["CX2040"] = {...}`) or pass a dictionary with the same keys.
+"""
+
+LAYER_STRUCT_SIZES = {"LREAL": 32, "REAL": 32, "INT8": 40, "CSR": 48, "RECURRENT": 40, "TEMPORAL": 32}
+""" SIZEOF of the RTNNI `Layer`, `Layer_REAL`, `Layer_INT8`, `Layer_CSR(_REAL)`, `RecurrentLayer(_REAL)` and
+`TemporalLayer(_REAL)` structs on x64 targets in bytes"""
+
+
+def get_calibration(target) -> dict:
+    """returns the calibration table for a target name of `cost_calibrations` or a given table (dictionary)."""
+    if isinstance(target, dict):
+        return target
+    if target not in cost_calibrations:
+        raise ValueError(f"No cost calibration for target '{target}'. Use one of {list(cost_calibrations)}.")
+    return cost_calibrations[target]
+
+
+def format_cost_report(report: dict) -> str:
+    """returns a human readable table of a cost report (see `model_parser.get_cost_report`)."""
+    lines = [f"{'layer':<16}{'inputs':>8}{'neurons':>9}{'activation':>13}{'MACs':>12}{'bytes':>12}{'time [us]':>12}"]
+    for layer in report["layers"]:
+        lines.append(
+            f"{layer['layer']:<16}{layer['num_inputs']:>8}{layer['num_neurons']:>9}{layer['activation']:>13}"
+            + f"{layer['macs']:>12}{layer['bytes_touched']:>12}{layer['estimated_time_us']:>12.2f}"
+        )
+    total = report["total"]
+    lines.append(f"{'total':<46}{total['macs']:>12}{total['bytes_touched']:>12}{total['estimated_time_us']:>12.2f}")
+    lines.append(f"activation evaluations: {total['activation_evaluations']}")
+    if "num_calls" in total:
+        lines.append(
+            f"time sliced: {total['num_calls']} calls per inference, "
+            + f"at most {total['estimated_time_per_call_us']:.2f} us per call"
+        )
+    lines.append(
+        f"memory: LayerWeights struct {total['weights_struct_bytes']} bytes, "
+        + f"Layers struct {total['layers_struct_bytes']} bytes"
+    )
+    return "\n".join(lines)
@@ -0,0 +1,574 @@
+import hashlib
+import numpy as np
+
+from nnigen.parse_model import (
+    model_parser,
+    activation_or_normalization,
+    layer_kind,
+    get_layer_role,
+    get_recurrent_layer_role,
+    get_temporal_layer_role,
+    get_temporal_history_length,
+    recurrent_state_sizes,
+    temporal_pooling,
+    global_pooling_kinds,
+    nn_data_types,
+    plc_data_types,
+    HASH_NUM_BYTES,
+)
+from nnigen.sparse import from_csr
+from nnigen.weights_file import weights_file_reader
+
+
+def _clip_exp_argument(x: np.ndarray) -> np.ndarray:
+    """clips the argument of `exp` to the range the RTNNI activation functions evaluate it in (|x| <= 1E2)."""
+    return np.clip(x, -1e2, 1e2)
+
+
+def _relu(x: np.ndarray) -> np.ndarray:
+    return np.where(x < 0, 0.0, x)
+
+
+def _tanh(x: np.ndarray) -> np.ndarray:
+    x_clip = _clip_exp_argument(x)
+    res = (np.exp(x_clip) - np.exp(-x_clip)) / (np.exp(x_clip) + np.exp(-x_clip))
+    return np.where(x > 1e2, 1.0, np.where(x < -1e2, -1.0, res))
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    res = 1 / (1 + np.exp(-_clip_exp_argument(x)))
+    return np.where(x > 1e2, 1.0, np.where(x < -1e2, 0.0, res))
+
+
+def _softplus(x: np.ndarray) -> np.ndarray:
+    res = np.log(np.exp(_clip_exp_argument(x)) + 1)
+    return np.where(x > 1e2, x, np.where(x < -1e2, 0.0, res))
+
+
+def _softsign(x: np.ndarray) -> np.ndarray:
+    return x / (np.abs(x) + 1)
+
+
+def _silu(x: np.ndarray) -> np.ndarray:
+    res = x / (1 + np.exp(-_clip_exp_argument(x)))
+    return np.where(x > 1e2, x, np.where(x < -1e2, 0.0, res))
+
+
+def _selu(x: np.ndarray) -> np.ndarray:
+    scale = 1.05070098
+    alpha = 1.67326324
+    res = scale * alpha * (np.exp(_clip_exp_argument(x)) - 1)
+    return np.where(x > 0, scale * x, np.where(x < -1e2, -scale * alpha, res))
+
+
+def _exponential(x: np.ndarray) -> np.ndarray:
+    return np.exp(x)
+
+
+activation_functions = {
+    activation_or_normalization.linear: lambda x: x,
+    activation_or_normalization.relu: _relu,
+    activation_or_normalization.tanh: _tanh,
+    activation_or_normalization.sigmoid: _sigmoid,
+    activation_or_normalization.softplus: _softplus,
+    activation_or_normalization.softsign: _softsign,
+    activation_or_normalization.silu: _silu,
+    activation_or_normalization.selu: _selu,
+    activation_or_normalization.exponential: _exponential,
+}
+""" vectorized counterparts of the activation functions in `RTNNI/POUs/activation function` (same clipping)"""
+
+
+def _scalar_tanh(x: np.float64) -> np.float64:
+    if x > 1e2:
+        return np.float64(1)
+    elif x < -1e2:
+        return np.float64(-1)
+    return (np.exp(x) - np.exp(-x)) / (np.exp(x) + np.exp(-x))
+
+
+def _scalar_sigmoid(x: np.float64) -> np.float64:
+    if x > 1e2:
+        return np.float64(1)
+    elif x < -1e2:
+        return np.float64(0)
+    return 1 / (1 + np.exp(-x))
+
+
+def _scalar_softplus(x: np.float64) -> np.float64:
+    if x > 1e2:
+        return x
+    elif x < -1e2:
+        return np.float64(0)
+    return np.log(np.exp(x) + 1)
+
+
+def _scalar_silu(x: np.float64) -> np.float64:
+    if x > 1e2:
+        return x
+    elif x < -1e2:
+        return np.float64(0)
+    return x / (1 + np.exp(-x))
+
+
+def _scalar_selu(x: np.float64) -> np.float64:
+    scale = 1.05070098
+    alpha = 1.67326324
+    if x > 0:
+        return scale * x
+    elif x < -1e2:
+        return -scale * alpha
+    return scale * alpha * (np.exp(x) - 1)
+
+
+scalar_activation_functions = {
+    activation_or_normalization.linear: lambda x: x,
+    activation_or_normalization.relu: lambda x: np.float64(0) if x < 0 else x,
+    activation_or_normalization.tanh: _scalar_tanh,
+    activation_or_normalization.sigmoid: _scalar_sigmoid,
+    activation_or_normalization.softplus: _scalar_softplus,
+    activation_or_normalization.softsign: lambda x: x / (np.abs(x) + 1),
+    activation_or_normalization.silu: _scalar_silu,
+    activation_or_normalization.selu: _scalar_selu,
+    activation_or_normalization.exponential: np.exp,
+}
+""" ports of the scalar functions in `RTNNI/POUs/activation function` (one value per call, like their ST code)"""
+
+
+def _call_scalar_function(activation: activation_or_normalization):
+    """port of a CASE branch calling the scalar `F_<activation>`: the value is converted to LREAL and the result is
+    rounded to the type of the layer buffer (`LREAL_TO_REAL` in `F_ActivationLayer_REAL`)."""
+    function = scalar_activation_functions[activation]
+    return lambda x: x.dtype.type(function(np.float64(x)))
+
+
+def _inlined_relu(x: np.floating) -> np.floating:
+    # IF pointer_input[i] < 0 THEN pointer_input[i] := 0; END_IF (in the type of the layer buffer)
+    return x.dtype.type(0) if x < 0 else x
+
+
+def _inlined_softsign(x: np.float64) -> np.float64:
+    # pointer_input[i] := pointer_input[i] / (ABS(pointer_input[i]) + 1); (LREAL only)
+    return x / (np.abs(x) + 1)
+
+
+def _get_activation_layer_kernel(inlined_branches: dict) -> dict:
+    kernel = {activation: _call_scalar_function(activation) for activation in scalar_activation_functions}
+    kernel[activation_or_normalization.linear] = lambda x: x  # no CASE branch
+    kernel.update(inlined_branches)
+    return kernel
+
+
+activation_layer_kernels = {
+    "LREAL": _get_activation_layer_kernel(
+        {activation_or_normalization.relu: _inlined_relu, activation_or_normalization.softsign: _inlined_softsign}
+    ),
+    "REAL": _get_activation_layer_kernel({activation_or_normalization.relu: _inlined_relu}),
+}
+""" ports of the CASE branches of `F_ActivationLayer` ("LREAL") and `F_ActivationLayer_REAL` ("REAL"), one value per
+call in the type of the layer buffer: relu (and softsign in `F_ActivationLayer`) are inlined, the other branches call
+the scalar functions in LREAL (softsign of `F_ActivationLayer_REAL` too)"""
+
+ACTIVATION_TEST_VALUES = np.array(
+    [-np.inf, -1e300, -3e7, -1e2 - 1e-9, -1e2, -1e2 + 1e-9, -20, -1, -1 / 3, -1e-300, -0.0]
+    + [0, 1e-300, 0.1, 1 / 3, 1, 20, 1e2, 1e2 + 1e-9, 3e7, 1e300]
+)
+""" inputs of `rtnni_emulator.check_activation_kernels` besides the layers' values: the clipping bounds, zeros, limits
+and values, whose result is rounded differently in REAL and LREAL (e.g. `3e7 + 1`)"""
+
+
+ACTIVATION_TABLE_HEADER_SIZE = 4
+""" number of values before the function values in an activation table: `x_min`, `x_max`, `1/step`, number of intervals"""
+
+
+def evaluate_activation_table(table: np.ndarray, activation: activation_or_normalization, x: np.ndarray) -> np.ndarray:
+    """vectorized counterpart of `F_ActivationLayer_LUT` (computed in the data type of `table`, like on the PLC).
+
+    Values in `[x_min, x_max]` are interpolated linearly between the table values, all others are evaluated exactly.
+    """
+    x_min, x_max, inverse_step, num_intervals = table[0], table[1], table[2], int(table[3])
+    values = table[ACTIVATION_TABLE_HEADER_SIZE:]
+    inside = (x >= x_min) & (x <= x_max)
+    position = np.where(inside, (x - x_min) * inverse_step, 0).astype(table.dtype)
+    k = np.minimum(np.trunc(position), num_intervals - 1).astype(np.int64)
+    interpolated = values[k] + (position - k.astype(table.dtype)) * (values[k + 1] - values[k])
+    exact = activation_functions[activation](x.astype(np.float64)).astype(table.dtype)
+    return np.where(inside, interpolated, exact)
+
+
+def verify_weights_hash(binary_weights: bytes) -> bool:
+    """checks the SHA-256 trailer appended by `model_parser.pack_weights_binary` against the payload."""
+    payload, hash_sha_256 = binary_weights[:-HASH_NUM_BYTES], binary_weights[-HASH_NUM_BYTES:]
+    return hashlib.sha256(payload).digest() == hash_sha_256
+
+
+def get_numpy_data_type(parser: model_parser) -> np.dtype:
+    """returns the (little endian) numpy data type corresponding to the PLC data type of the parser."""
+    return np.dtype("<" + nn_data_types[parser.nn_data_type])
+
+
+def unpack_weights_binary(binary_weights: bytes, parser: model_parser, check_hash: bool = True) -> dict:
+    """inverse of `model_parser.pack_weights_binary`.
+
+    ### Inputs:
+
+    binary_weights: bytes               ... serialized weights including the SHA-256 trailer
+    parser: `model_parser`              ... parser of the exported model (defines the layout and data type)
+    check_hash: bool [default: True]    ... raise a `RuntimeError` if the SHA-256 trailer does not match the contents
+
+    ### Outputs:
+
+    dictionary with the `LayerWeights` struct member names as keys and the weights as `np.ndarray` values
+    """
+    if check_hash and not verify_weights_hash(binary_weights):
+        raise RuntimeError("SHA-256 hash of the weights does not match their contents.")
+
+    layout = [
+        (member_name, shape, np.dtype("<" + plc_data_types[data_type]))
+        for member_name, shape, data_type in parser.get_weights_layout()
+    ]
+    num_bytes = sum(int(np.prod(shape)) * data_type.itemsize for _, shape, data_type in layout)
+    if len(binary_weights) != num_bytes + HASH_NUM_BYTES:
+        raise RuntimeError(
+            f"Weights have {len(binary_weights)} bytes, "
+            + f"but the model layout requires {num_bytes + HASH_NUM_BYTES} bytes."
+        )
+
+    weights = {}
+    offset = 0
+    for member_name, shape, data_type in layout:
+        size = int(np.prod(shape))
+        weights[member_name] = np.frombuffer(binary_weights, dtype=data_type, count=size, offset=offset).reshape(shape)
+        offset += size * data_type.itemsize
+    return weights
+
+
+def read_weights_file(weights_file_path: str, parser: model_parser, check_hash: bool = True) -> dict:
+    """reads an exported `<name>_weights.dat` file without copying (see `nnigen.weights_file.weights_file_reader`).
+
+    The tensors of the file must match the `LayerWeights` struct of the parser."""
+    try:
+        reader = weights_file_reader(weights_file_path, check_hash=check_hash)
+        reader.check_layout(parser)
+    except RuntimeError as e:
+        raise RuntimeError(f"Invalid weights file '{weights_file_path}': {e}") from e
+    return reader.get_weights()
+
+
+class rtnni_emulator:
+    """NumPy reference runtime for exported models.
+
+    Evaluates whole batches the same way the generated `FB_<name>` does on the PLC
+    (`F_NormalizationLayer`, `F_ForwardPropagation` per dense layer, `F_NormalizationLayer` for denormalization),
+    but based on the exported weights file instead of the Keras model. Sequence models are evaluated one time step after
+    another like consecutive calls of the FB after `reset_state`: the causal convolution and pooling layers on ring
+    buffers of their past inputs (`F_Conv1D`, `F_Pooling1D`, `F_GlobalPooling1D`), the recurrent layers on their states
+    (`F_LSTMCell`, `F_GRUCell`).
+    Computations are done in the PLC data type of the parser (`LREAL` or `REAL`), activation and normalization functions
+    in double precision like in RTNNI.
+    """
+
+    def __init__(self, parser: model_parser, weights_file_path: str = None, check_hash: bool = True):
+        """rtnni_emulator __init__
+
+        ### Inputs:
+
+        parser: `model_parser`                  ... parser of the exported model (layer table and weights layout)
+        weights_file_path: str [default: None]  ... path of the exported `<name>_weights.dat`.
+                                                    If `None`, the weights are packed by the parser directly.
+        check_hash: bool [default: True]        ... verify the SHA-256 trailer of the weights
+        """
+        self.parser = parser
+        self.layer_table = parser.get_layer_table()
+        self.data_type = get_numpy_data_type(parser)
+        if weights_file_path is None:
+            self.weights = unpack_weights_binary(parser.pack_weights_binary(), parser, check_hash=check_hash)
+        else:
+            self.weights = read_weights_file(weights_file_path, parser, check_hash=check_hash)
+
+    def _get_dense_layer_weights(self):
+        """returns `(weight, bias, activation)` for each dense layer."""
+        dense_layers = []
+        sparse_layers = self.parser.get_sparse_layers()
+        for layer_counter, (num_inputs, _, activation) in enumerate(self.layer_table, start=1):
+            layer_role = get_layer_role(layer_counter, len(self.layer_table))
+            if layer_counter in sparse_layers:
+                weight = from_csr(
+                    self.weights[f"{layer_role}_values"],
+                    self.weights[f"{layer_role}_column_index"],
+                    self.weights[f"{layer_role}_row_start"],
+                    num_inputs,
+                )
+            else:
+                weight = self.weights[f"{layer_role}_weight"]
+            dense_layers.append((weight, self.weights[f"{layer_role}_bias"], activation))
+        return dense_layers
+
+    def predict(self, inputs: np.ndarray, per_neuron_activations: bool = False) -> np.ndarray:
+        """runs the inference for a batch of inputs with the shape `(num_samples, num_inputs)`.
+
+        The activation of a layer is evaluated for all its values at once (like `F_ActivationLayer`). With
+        `per_neuron_activations`, it is evaluated value by value with the scalar functions instead, like the RTNNI
+        kernels did before `F_ActivationLayer` (see `check_activation_kernels`).
+
+        Sequence models take sequences of the shape `(num_samples, num_steps, num_inputs)` and return the outputs of
+        all time steps `(num_samples, num_steps, num_outputs)`, or of the last one, if the last recurrent layer does not
+        return sequences or the last temporal layer is a global pooling (like Keras). Time steps, in which a pooling
+        layer completes no window, have no output (the FB does not update its outputs)."""
+        x = self._get_dense_inputs(inputs, per_neuron_activations)
+
+        if self.parser.quantized:
+            for layer_counter, (_, _, activation) in enumerate(self.layer_table, start=1):
+                layer_role = get_layer_role(layer_counter, len(self.layer_table))
+                if per_neuron_activations:
+                    x = self.parser.forward_layer(self.weights, layer_role, activation_or_normalization.linear, x)
+                    x = self._per_value(scalar_activation_functions[activation], x)
+                else:
+                    x = self.parser.forward_layer(self.weights, layer_role, activation, x)
+        else:
+            for layer_counter, (weight, bias, activation) in enumerate(self._get_dense_layer_weights(), start=1):
+                table = self.weights.get(f"{get_layer_role(layer_counter, len(self.layer_table))}_activation_table")
+                if table is not None:  # approximated activation (see `nnigen.approximation`)
+                    x = evaluate_activation_table(table, activation, x @ weight.T + bias)
+                elif per_neuron_activations:
+                    x = self._per_value(scalar_activation_functions[activation], x @ weight.T + bias)
+                else:
+                    x = self._double_precision(activation_functions[activation], x @ weight.T + bias)
+
+        if self.parser.has_denormalization:
+            x = self._double_precision(
+                lambda x: x * self.weights["denormalization_std"] + self.weights["denormalization_mean"], x
+            )
+
+        recurrent_layers, temporal_layers = self.parser.get_recurrent_layers(), self.parser.get_temporal_layers()
+        if recurrent_layers or temporal_layers:
+            x = x.reshape(np.shape(inputs)[0], -1, self.parser.output_dim)
+            if recurrent_layers:
+                returns_sequences = recurrent_layers[-1].return_sequences
+            else:
+                returns_sequences = temporal_layers[-1].kind not in global_pooling_kinds
+            if not returns_sequences:
+                x = x[:, -1]
+        return x
+
+    def _get_dense_inputs(self, inputs: np.ndarray, per_neuron_activations: bool = False) -> np.ndarray:
+        """returns the (normalized) inputs of the first dense layer with the shape `(num_values, num_inputs)`.
+
+        For sequence models, these are the outputs of the last temporal or recurrent layer after each time step, in
+        which all pooling layers completed a window."""
+        recurrent_layers, temporal_layers = self.parser.get_recurrent_layers(), self.parser.get_temporal_layers()
+        x = np.asarray(inputs, dtype=self.data_type)
+        if recurrent_layers or temporal_layers:
+            x = x.reshape(x.shape[0], -1, self.parser.input_dim)
+        else:
+            x = x.reshape(-1, self.parser.input_dim)
+
+        if self.parser.has_normalization:
+            x = self._double_precision(
+                lambda x: (x - self.weights["normalization_mean"]) / self.weights["normalization_std"], x
+            )
+        if not (recurrent_layers or temporal_layers):
+            return x
+
+        # the state of each layer after `reset_state`: empty ring buffers and zero recurrent states
+        temporal_states = [
+            {
+                "history": np.zeros(
+                    (x.shape[0], get_temporal_history_length(layer), layer.num_inputs), self.data_type
+                ),
+                "newest": 0,
+                "count": 0,
+            }
+            for layer in temporal_layers
+        ]
+        recurrent_states = [
+            np.zeros((x.shape[0], recurrent_state_sizes[layer.kind] * layer.num_units), dtype=self.data_type)
+            for layer in recurrent_layers
+        ]
+        outputs = []
+        for step in range(x.shape[1]):
+            y = x[:, step]
+            for layer_counter, state in enumerate(temporal_states, start=1):
+                y = self._temporal_step(layer_counter, y, state, per_neuron_activations)
+                if y is None:  # no complete pooling window, the FB returns before the following layers
+                    break
+            else:
+                for layer_counter, layer in enumerate(recurrent_layers, start=1):
+                    recurrent_states[layer_counter - 1] = self._recurrent_step(
+                        layer_counter, y, recurrent_states[layer_counter - 1], per_neuron_activations
+                    )
+                    y = recurrent_states[layer_counter - 1][:, : layer.num_units]
+                outputs.append(y)
+        num_outputs = self.layer_table[0][0]
+        return np.stack(outputs, axis=1).reshape(-1, num_outputs) if outputs else np.zeros((0, num_outputs))
+
+    def _temporal_step(
+        self, layer_counter: int, x: np.ndarray, state: dict, per_neuron_activations: bool = False
+    ) -> np.ndarray:
+        """returns the newest output of a temporal layer like `F_Conv1D`, `F_Pooling1D` and `F_GlobalPooling1D`, or
+        `None` if a pooling layer completes no window with this input.
+
+        `state` contains the ring buffer `history` of each sample, the row of the `newest` input and the pooling `count`
+        (updated in place)."""
+        layer = self.parser.get_temporal_layers()[layer_counter - 1]
+        history = state["history"]
+        if layer.kind in global_pooling_kinds:  # running sum or maximum since the reset
+            state["count"] += 1
+            if temporal_pooling[layer.kind]:
+                history[:, 0] += x
+                return history[:, 0] / state["count"]
+            history[:, 0] = x if state["count"] == 1 else np.maximum(history[:, 0], x)
+            return history[:, 0].copy()
+
+        history_length = history.shape[1]
+        state["newest"] = (state["newest"] + 1) % history_length
+        history[:, state["newest"]] = x
+        if layer.kind == layer_kind.conv1d:
+            layer_role = get_temporal_layer_role(layer_counter)
+            kernel = self.weights[f"{layer_role}_kernel"].reshape(layer.num_outputs, layer.window, layer.num_inputs)
+            y = np.broadcast_to(self.weights[f"{layer_role}_bias"], (x.shape[0], layer.num_outputs))
+            for k in range(layer.window):
+                row = (state["newest"] + history_length - (layer.window - 1 - k) * layer.dilation) % history_length
+                y = y + history[:, row] @ kernel[:, k].T
+            return self._activation(layer.activation, y, per_neuron_activations)
+
+        state["count"] += 1
+        if state["count"] < layer.window:
+            return None
+        state["count"] -= layer.stride  # the next window starts `stride` inputs later
+        if not temporal_pooling[layer.kind]:
+            return np.max(history, axis=1)
+        y = history[:, 0]
+        for k in range(1, layer.window):
+            y = y + history[:, k]
+        return y / layer.window
+
+    def _recurrent_step(
+        self, layer_counter: int, x: np.ndarray, state: np.ndarray, per_neuron_activations: bool = False
+    ) -> np.ndarray:
+        """returns the state of a recurrent layer after one time step like `F_LSTMCell` and `F_GRUCell`.
+
+        `state` contains the hidden state (LSTM: followed by the cell state) of each sample."""
+        layer = self.parser.get_recurrent_layers()[layer_counter - 1]
+        layer_role = get_recurrent_layer_role(layer_counter)
+        kernel = self.weights[f"{layer_role}_kernel"]
+        recurrent_kernel = self.weights[f"{layer_role}_recurrent_kernel"]
+        n = layer.num_units
+
+        def activation(activation_type: activation_or_normalization, x: np.ndarray) -> np.ndarray:
+            return self._activation(activation_type, x, per_neuron_activations)
+
+        h = state[:, :n]
+        if layer.kind == layer_kind.lstm:
+            c = state[:, n:]
+            gates = self.weights[f"{layer_role}_bias"] + x @ kernel.T + h @ recurrent_kernel.T
+            input_gate, forget_gate = np.split(activation(layer.recurrent_activation, gates[:, : 2 * n]), 2, axis=1)
+            candidate = activation(layer.activation, gates[:, 2 * n : 3 * n])
+            output_gate = activation(layer.recurrent_activation, gates[:, 3 * n :])
+            c = forget_gate * c + input_gate * candidate
+            return np.concatenate([output_gate * activation(layer.activation, c), c], axis=1)
+
+        input_part = self.weights[f"{layer_role}_bias"] + x @ kernel.T
+        recurrent_part = self.weights[f"{layer_role}_recurrent_bias"] + h @ recurrent_kernel.T
+        update_gate, reset_gate = np.split(
+            activation(layer.recurrent_activation, input_part[:, : 2 * n] + recurrent_part[:, : 2 * n]), 2, axis=1
+        )
+        candidate = activation(layer.activation, input_part[:, 2 * n :] + reset_gate * recurrent_part[:, 2 * n :])
+        return update_gate * h + (1 - update_gate) * candidate
+
+    def get_pre_activations(self, inputs: np.ndarray) -> list:
+        """returns the values of each dense layer before its activation function for a batch of inputs (float models).
+
+        For recurrent models, the values of all time steps are returned."""
+        if self.parser.quantized:
+            raise ValueError("Pre-activations are only available for float models.")
+        pre_activations = []
+        x = self._get_dense_inputs(inputs)
+        for weight, bias, activation in self._get_dense_layer_weights():
+            pre_activations.append(x @ weight.T + bias)
+            x = self._double_precision(activation_functions[activation], pre_activations[-1])
+        return pre_activations
+
+    def _activation(
+        self, activation: activation_or_normalization, x: np.ndarray, per_neuron_activations: bool = False
+    ) -> np.ndarray:
+        """evaluates an activation function for all values (`F_ActivationLayer`) or value by value."""
+        if per_neuron_activations:
+            return self._per_value(scalar_activation_functions[activation], x)
+        return self._double_precision(activation_functions[activation], x)
+
+    def _double_precision(self, function, x: np.ndarray) -> np.ndarray:
+        """evaluates `function` in double precision and rounds the result to the PLC data type."""
+        return function(x.astype(np.float64)).astype(self.data_type)
+
+    def _per_value(self, function, x: np.ndarray) -> np.ndarray:
+        """evaluates the scalar `function` for each value in double precision, rounded to the type of `x`."""
+        return np.array([function(value) for value in x.astype(np.float64).flat], dtype=x.dtype).reshape(x.shape)
+
+    def check_activation_kernels(self, inputs: np.ndarray) -> int:
+        """checks that the per layer activation (`F_ActivationLayer`) is bit-identical to the per neuron evaluation.
+
+        The ports of `F_ActivationLayer` and `F_ActivationLayer_REAL` (`activation_layer_kernels`) are compared to the
+        scalar functions on `ACTIVATION_TEST_VALUES` and, for float models, on the pre-activations of each layer for
+        `inputs`. The vectorized functions of the emulator are compared on the test values, `predict` with and without
+        `per_neuron_activations` on `inputs` (one value per neuron is evaluated in Python, use a few hundred samples).
+        Raises a `RuntimeError` for the first difference.
+
+        ### Outputs:
+
+        the number of compared values
+        """
+        num_values = 0
+        with np.errstate(over="ignore", invalid="ignore"):
+            for nn_data_type, kernel in activation_layer_kernels.items():
+                data_type = np.dtype(nn_data_types[nn_data_type])
+                test_values = np.append(ACTIVATION_TEST_VALUES, np.nan).astype(data_type)
+                for activation, branch in kernel.items():
+                    num_values += self._check_activation_values(
+                        f"Branch '{activation.value}' of the {nn_data_type} activation kernel",
+                        np.array([branch(value) for value in test_values], dtype=data_type),
+                        self._per_value(scalar_activation_functions[activation], test_values),
+                        test_values,
+                    )
+
+            if not self.parser.quantized:
+                kernel = activation_layer_kernels[self.parser.nn_data_type]
+                for (_, _, activation), pre_activation in zip(self.layer_table, self.get_pre_activations(inputs)):
+                    pre_activation = pre_activation.astype(self.data_type)
+                    num_values += self._check_activation_values(
+                        f"Branch '{activation.value}' of the {self.parser.nn_data_type} activation kernel",
+                        np.array([kernel[activation](value) for value in pre_activation.flat], dtype=self.data_type),
+                        self._per_value(scalar_activation_functions[activation], pre_activation).ravel(),
+                        pre_activation.ravel(),
+                    )
+
+            test_values = ACTIVATION_TEST_VALUES.astype(self.data_type)
+            for activation, function in activation_functions.items():
+                num_values += self._check_activation_values(
+                    f"Activation '{activation.value}'",
+                    self._double_precision(function, test_values),
+                    self._per_value(scalar_activation_functions[activation], test_values),
+                    test_values,
+                )
+
+        per_layer, per_neuron = self.predict(inputs), self.predict(inputs, per_neuron_activations=True)
+        if per_layer.tobytes() != per_neuron.tobytes():
+            raise RuntimeError(
+                "Outputs of the per layer activations differ from the per neuron evaluation "
+                + f"(maximum deviation {np.max(np.abs(per_layer - per_neuron))})."
+            )
+        return num_values + per_layer.size
+
+    @staticmethod
+    def _check_activation_values(name: str, values: np.ndarray, scalar_values: np.ndarray, inputs: np.ndarray) -> int:
+        """compares the bits of activation values (signed zeros, NaN) to the scalar functions, returns their number."""
+        unsigned_type = np.dtype(f"u{values.dtype.itemsize}")
+        differences = values.view(unsigned_type) != scalar_values.view(unsigned_type)
+        if np.any(differences):
+            raise RuntimeError(f"{name} differs from the scalar function for the inputs {inputs[differences]}.")
+        return values.size
+
+    def max_deviation(self, reference_outputs: np.ndarray, inputs: np.ndarray) -> float:
+        """returns the maximum absolute deviation between `predict(inputs)` and given reference outputs."""
+        outputs = self.predict(inputs)
+        return float(np.max(np.abs(outputs - np.asarray(reference_outputs).reshape(outputs.shape))))
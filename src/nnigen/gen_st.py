@@ -1,16 +1,156 @@
 import uuid
 import os
+import struct
+import json
+import hashlib
+import re
 from pathlib import Path
 import logging
 
-from nnigen.parse_model import clean_indentation, model_parser
+from nnigen.parse_model import (
+    clean_indentation,
+    model_parser,
+    activation_or_normalization,
+    layer_kind,
+    get_layer_role,
+    get_recurrent_layer_role,
+    get_temporal_layer_role,
+    recurrent_state_sizes,
+    recurrent_buffer_sizes,
+    temporal_pooling,
+    global_pooling_kinds,
+    get_temporal_history_length,
+    rtnni_type_suffixes,
+    HASH_NUM_BYTES,
+)
+from nnigen.weights_file import (
+    get_weights_file_header,
+    get_weights_file_layout,
+    get_weights_data_offset,
+    write_weights_file_to,
+    weights_file_reader,
+)
 from nnigen.template_strings import (
     template_st_function_block_xml,
     template_st_struct_xml,
     template_st_struct,
     template_fb_inference_impl,
+    template_fb_inference_impl_chunked,
     template_fb_inference_decl,
+    template_fb_inference_generic,
+    template_fb_inference_specialized,
+    template_specialized_layer,
+    template_specialized_sparse_layer,
+    template_specialized_activation,
+    template_specialized_activation_table,
+    template_fb_sequence_input_vars,
+    template_fb_sequence_output_vars,
+    template_fb_sequence,
+    template_recurrent_reset,
+    template_recurrent_layer,
+    template_temporal_reset,
+    template_temporal_conv,
+    template_temporal_pooling,
+    template_temporal_global_pooling,
+    template_forward_propagation,
+    template_forward_propagation_sparse,
+    template_fb_time_sliced_output_vars,
+    template_fb_inference_time_sliced,
+    template_time_slice_input,
+    template_time_slice_normalization,
+    template_time_slice_output,
+    template_time_slice_denormalization,
+    template_time_slice_segment,
+    template_time_slice_segment_sparse,
+    template_fb_batch_inference_decl,
+    template_fb_batch_inference,
+    template_fb_batch_normalization,
+    template_fb_batch_denormalization,
+    template_fb_hot_swap_input_vars,
+    template_fb_hot_swap_output_vars,
+    template_fb_hot_swap_nn_vars,
+    template_fb_hot_swap_init,
+    template_fb_hot_swap,
+    template_hot_swap_switch,
+    template_hot_swap_check,
+    template_hot_swap_check_chunked,
+    template_fb_weights_vars,
+    template_fb_shared_weights_vars,
+    template_fb_shared_weights_init,
+    template_fb_inference_impl_shared,
+    template_fb_shared_weights_decl,
+    template_gvl_shared_weights,
+    template_st_gvl_xml,
+    template_fb_profiling_output_vars,
+    template_fb_profiling_vars,
+    template_profiling_start,
+    template_profiling_event,
 )
+from nnigen.profiling import get_profiling_sections
+
+WEIGHTS_MANIFEST_FORMAT = "<II32s"
+""" layout of `<name>_weights_manifest.dat` (struct `WeightsManifest` in RTNNI): version, size of the `LayerWeights`
+struct in the weights file and its SHA-256 hash (see `nnigen.weights_file`)"""
+
+UUID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_DNS, "nnigen")
+""" namespace of the deterministic uuids of the generated TwinCAT objects"""
+
+WEIGHTS_FILE_BLOCK_SIZE = 1 << 20
+""" block size in bytes, in which an existing weights file is compared to a new export"""
+
+
+def read_weights_manifest(manifest_path: str) -> dict:
+    """reads a `<name>_weights_manifest.dat` file (see `ST_writer.write_versioned_weights_file`).
+
+    ### Outputs:
+
+    dictionary with the `version`, the `weights_size` (data size in bytes) and the `hash_sha_256` (SHA-256 trailer) of the
+    newest weights file
+    """
+    with open(manifest_path, "rb") as f:
+        version, weights_size, hash_sha_256 = struct.unpack(WEIGHTS_MANIFEST_FORMAT, f.read())
+    return {"version": version, "weights_size": weights_size, "hash_sha_256": hash_sha_256}
+
+
+def _get_text_hash(contents: str) -> str:
+    return hashlib.sha256(contents.encode("utf-8")).hexdigest()
+
+
+def _get_text_file_hash(file_path: str) -> str:
+    """returns the hash of a written ST file (see `_get_text_hash`), `None` if it does not exist."""
+    try:
+        with open(file_path) as f:
+            return _get_text_hash(f.read())
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _is_weights_file_unchanged(file_path: str, header: bytes, hash_sha_256: bytes) -> bool:
+    """checks whether an existing weights file has the header `header`, the SHA-256 trailer `hash_sha_256` and matching
+    contents.
+
+    The contents are hashed in blocks of `WEIGHTS_FILE_BLOCK_SIZE` bytes, such that the existing file is never held in
+    memory completely."""
+    if not os.path.exists(file_path):
+        return False
+    data_size = os.path.getsize(file_path) - len(header) - HASH_NUM_BYTES
+    if data_size < 0:
+        return False
+    with open(file_path, "rb") as f:
+        if f.read(len(header)) != header:
+            return False
+        f.seek(-HASH_NUM_BYTES, os.SEEK_END)
+        if f.read(HASH_NUM_BYTES) != hash_sha_256:
+            return False
+        f.seek(len(header))
+        m = hashlib.sha256()
+        while data_size > 0:
+            block = f.read(min(WEIGHTS_FILE_BLOCK_SIZE, data_size))
+            if not block:
+                return False
+            m.update(block)
+            data_size -= len(block)
+    return m.digest() == hash_sha_256
 
 
 class ST_writer:
@@ -19,22 +159,85 @@ class ST_writer:
     to_write = {}
     """ dictionary being written to the file system. keys (str) are file names, values are file contents"""
 
-    def __init__(self, unique_model_name: str, parser: model_parser):
+    def __init__(
+        self,
+        unique_model_name: str,
+        parser: model_parser,
+        specialized: bool = False,
+        time_slice_macs_per_call: int = None,
+        max_batch_size: int = None,
+        hot_swap: bool = False,
+        shared_weights: bool = False,
+        profiling_trace_length: int = None,
+    ):
         """ST_writer __init__
 
         ### Inputs:
 
         unique_model_name: str ... name of the model (used in file names to distinguish models)
         parser: `model_parser` subclass to generate structured text
+        specialized: bool [default: False] ... generate a network specific forward pass with constant layer sizes and
+                                                activations instead of the generic loop over `F_ForwardPropagation`
+        time_slice_macs_per_call: int [default: None] ... if given, the FB is generated as a state machine, which
+                                                computes at most this number of multiply-accumulates per call
+                                                (see `model_parser.get_time_slices`) and signals `busy`/`done`
+        max_batch_size: int [default: None] ... if given, `FB_<name>_Batch` is generated additionally, which evaluates
+                                                up to this number of samples per call with one pass over the weights
+        hot_swap: bool [default: False] ... `FB_<name>` keeps a second (shadow) copy of the weights, into which it loads
+                                                a newer weights version (see `write_versioned_weights_file`) in the
+                                                background on a rising edge of `check_for_update`. After the hash is
+                                                verified, the FB switches to the new weights between two inferences.
+        shared_weights: bool [default: False] ... the weights and the layer table are declared once in `GVL_<name>` and
+                                                loaded once by `FB_<name>_Weights` for all instances of `FB_<name>`
+                                                (and `FB_<name>_Batch`), each instance only holds its layer buffers
+        profiling_trace_length: int [default: None] ... if given, a profiling build of `FB_<name>` is generated, which
+                                                records the CPU counter at the start and end of each section (weights
+                                                loading and verification, normalization, each layer, denormalization)
+                                                into the ring buffer `profiling_trace` of this number of records
+                                                (see `nnigen.profiling`)
         """
         self.model_name = unique_model_name
-        self.nn_data_type = "LREAL"
+        self.nn_data_type = parser.nn_data_type
+        if specialized and parser.quantized:
+            raise ValueError("Specialized inference is not available for quantized models.")
+        if specialized and time_slice_macs_per_call is not None:
+            raise ValueError("Time sliced inference is not available in combination with specialized inference.")
+        if max_batch_size is not None:
+            if max_batch_size < 1:
+                raise ValueError(f"The maximum batch size must be positive, got {max_batch_size}.")
+            if (
+                parser.quantized
+                or parser.get_sparse_layers()
+                or parser.get_recurrent_layers()
+                or parser.get_temporal_layers()
+            ):
+                raise ValueError("Batched inference is only available for dense floating point models.")
+            if hot_swap:
+                raise ValueError("Hot swapping the weights is not available in combination with batched inference.")
+        if shared_weights and hot_swap:
+            raise ValueError("Hot swapping the weights is not available in combination with shared weights.")
+        if profiling_trace_length is not None:
+            if profiling_trace_length < 1:
+                raise ValueError(f"The length of the profiling trace must be positive, got {profiling_trace_length}.")
+            if time_slice_macs_per_call is not None:
+                raise ValueError("Profiling is not available in combination with time sliced inference.")
+
         self.parser = parser
+        self.specialized = specialized
+        self.time_slices = None if time_slice_macs_per_call is None else parser.get_time_slices(time_slice_macs_per_call)
+        self.time_slice_macs_per_call = time_slice_macs_per_call
+        self.max_batch_size = max_batch_size
+        self.hot_swap = hot_swap
+        self.shared_weights = shared_weights
+        self.profiling_trace_length = profiling_trace_length
         self.path = "."
 
     def write_ST_files_to(self, path: str, overwrite_if_exists: bool = False):
         """writes the ST files
 
+        Files whose contents did not change are not rewritten. If the export cache `<name>_export_cache.json` in `path`
+        matches the architecture hash (see `get_architecture_hash`) and all files are unchanged, nothing is generated.
+
         ### Inputs:
 
         path : str                                ... path to export the files to (can be in the PLC project).
@@ -45,24 +248,111 @@ class ST_writer:
         """
         self.to_write = {}
         self.path = path
+        architecture_hash = self.get_architecture_hash()
+        if self._is_export_cached(architecture_hash):
+            logging.info(f"The ST files of '{self.model_name}' in '{path}' are up to date.")
+            return
+
         self._add_fb_inference_file()
+        if self.max_batch_size is not None:
+            self._add_fb_batch_inference_file()
+        if self.shared_weights:
+            self._add_fb_shared_weights_file()
+            self._add_gvl_shared_weights_file()
         self._add_nn_struct_file()
         self._add_nn_weights_struct_file()
 
         Path(path).mkdir(parents=True, exist_ok=True)
 
         # go through dict and write files
+        files_up_to_date = True
         for file_name, contents in self.to_write.items():
             file_path = os.path.join(path, file_name)
+            if _get_text_file_hash(file_path) == _get_text_hash(contents):
+                continue  # unchanged, keep the file untouched for TwinCAT
             if not overwrite_if_exists and os.path.exists(file_path):
                 logging.warning(
                     f"File '{file_path}' exists and `write_ST_files_to` was not set to overwrite the old contents."
                     + "The existing model was not overwritten. Either rename the model or allow overwriting."
                 )
+                files_up_to_date = False
             else:
                 with open(file_path, "w") as f:
                     f.write(contents)
 
+        if files_up_to_date:
+            self._write_export_cache(architecture_hash)
+
+    def get_architecture_hash(self) -> str:
+        """returns a SHA-256 hash (hex) of everything the ST files depend on: the architecture and the weights layout
+        of the model, the generation options, the export path and the sources of the `nnigen` package.
+
+        Retrained weights with an unchanged architecture have the same hash."""
+        description = {
+            "writer": type(self).__name__,
+            "twincat_version": getattr(self, "twincat_version", None),
+            "model_name": self.model_name,
+            "weights_path": self._get_layer_weights_path(),
+            "nn_data_type": self.nn_data_type,
+            "io_dimensions": [self.parser.input_dim, self.parser.output_dim],
+            "normalization": [self.parser.has_normalization, self.parser.has_denormalization],
+            "layer_table": [
+                [num_inputs, num_neurons, activation.value]
+                for num_inputs, num_neurons, activation in self.parser.get_layer_table()
+            ],
+            "weights_layout": [
+                [member_name, list(shape), data_type] for member_name, shape, data_type in self.parser.get_weights_layout()
+            ],
+            "recurrent_layers": [
+                [layer.kind.value, layer.num_inputs, layer.num_units]
+                + [layer.activation.value, layer.recurrent_activation.value]
+                for layer in self.parser.get_recurrent_layers()
+            ],
+            "temporal_layers": [
+                [layer.kind.value, layer.num_inputs, layer.num_outputs, layer.window, layer.dilation, layer.stride]
+                + [layer.activation.value if layer.activation else None]
+                for layer in self.parser.get_temporal_layers()
+            ],
+            "sparse_layers": sorted(self.parser.get_sparse_layers()),
+            "quantized": self.parser.quantized,
+            "weights_chunk_size": self.parser.weights_chunk_size,
+            "specialized": self.specialized,
+            "time_slice_macs_per_call": self.time_slice_macs_per_call,
+            "max_batch_size": self.max_batch_size,
+            "hot_swap": self.hot_swap,
+            "shared_weights": self.shared_weights,
+            "profiling_trace_length": self.profiling_trace_length,
+        }
+        m = hashlib.sha256(json.dumps(description, sort_keys=True).encode())
+        for source_path in sorted(Path(__file__).parent.glob("*.py")):
+            m.update(source_path.read_bytes())
+        return m.hexdigest()
+
+    def _get_export_cache_path(self) -> str:
+        """helper function to get the full absolute path of the export cache."""
+        return os.path.abspath(os.path.join(self.path, f"{self.model_name}_export_cache.json"))
+
+    def _is_export_cached(self, architecture_hash: str) -> bool:
+        """checks whether the export cache matches `architecture_hash` and all cached files are unchanged."""
+        try:
+            with open(self._get_export_cache_path()) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return cache.get("architecture_hash") == architecture_hash and all(
+            _get_text_file_hash(os.path.join(self.path, file_name)) == file_hash
+            for file_name, file_hash in cache.get("files", {}).items()
+        )
+
+    def _write_export_cache(self, architecture_hash: str):
+        """stores the architecture hash and the hashes of the written files."""
+        cache = {
+            "architecture_hash": architecture_hash,
+            "files": {file_name: _get_text_hash(contents) for file_name, contents in self.to_write.items()},
+        }
+        with open(self._get_export_cache_path(), "w") as f:
+            json.dump(cache, f, indent=2)
+
     def write_weights_file(self, overwrite_if_exists: bool = False):
         """
         Save weights and bias of all layers into a binary file, which can be
@@ -85,8 +375,70 @@ class ST_writer:
                 + "The existing model was not overwritten. Either rename the model of allow overwriting."
             )
         else:
-            with open(file_path, "wb") as f:
-                f.write(self.parser.pack_weights_binary())
+            Path(os.path.dirname(file_path)).mkdir(parents=True, exist_ok=True)
+            with open(file_path + ".tmp", "wb") as f:
+                hash_sha_256 = write_weights_file_to(f, self.parser)
+            header = get_weights_file_header(get_weights_file_layout(self.parser))
+            if _is_weights_file_unchanged(file_path, header, hash_sha_256):  # keep the file untouched
+                os.remove(file_path + ".tmp")
+            else:
+                os.replace(file_path + ".tmp", file_path)
+            if self.hot_swap and not os.path.exists(self._get_weights_manifest_path()):
+                # version 0 announces the exported weights, the FB then reports a missing manifest as `update_error`
+                weights_size = os.path.getsize(file_path) - len(header)
+                self._write_weights_manifest(0, weights_size, hash_sha_256)
+
+    def write_versioned_weights_file(self, version: int = None) -> int:
+        """
+        Save the weights into `<name>_weights_v<version>.dat` and announce them in `<name>_weights_manifest.dat`, from
+        where an FB generated with `hot_swap` loads them without stopping the inference
+
+        The manifest is replaced only after the weights file was written completely, such that the PLC never reads a
+        version which is not fully written. Older versions are kept.
+
+        ### Inputs:
+
+        version: int [default: None] ... version number of the weights (must be larger than the version in the
+                                          manifest). If `None`, the version in the manifest plus one.
+
+        ### Outputs:
+
+        the version number of the written weights
+        """
+        manifest_path = self._get_weights_manifest_path()
+        previous_version = read_weights_manifest(manifest_path)["version"] if os.path.exists(manifest_path) else 0
+        if version is None:
+            version = previous_version + 1
+        if not previous_version < version <= 0xFFFFFFFF:
+            raise ValueError(
+                f"Weights version {version} must be larger than the version {previous_version} in '{manifest_path}'."
+            )
+
+        self.check_weights_layout()
+
+        file_path = self._get_versioned_weights_path(version)
+        Path(os.path.dirname(file_path)).mkdir(parents=True, exist_ok=True)
+        with open(file_path, "wb") as f:
+            hash_sha_256 = write_weights_file_to(f, self.parser)
+            weights_size = f.tell() - get_weights_data_offset(self.parser)
+        self._write_weights_manifest(version, weights_size, hash_sha_256)
+        return version
+
+    def _write_weights_manifest(self, version: int, weights_size: int, hash_sha_256: bytes):
+        """replaces `<name>_weights_manifest.dat` (written completely to a temporary file first)"""
+        manifest_path = self._get_weights_manifest_path()
+        with open(manifest_path + ".tmp", "wb") as f:
+            f.write(struct.pack(WEIGHTS_MANIFEST_FORMAT, version, weights_size, hash_sha_256))
+        os.replace(manifest_path + ".tmp", manifest_path)
+
+    def check_weights_layout(self):
+        """raises a `RuntimeError`, if the exported `<name>_weights.dat` has another `LayerWeights` layout than the
+        parser (e.g. another number of nonzero weights per sparse layer with the same total size). The PLC would read
+        new weights with the struct of the export at the wrong offsets. Nothing is checked without an exported file.
+        """
+        file_path = self._get_layer_weights_path()
+        if os.path.exists(file_path):
+            weights_file_reader(file_path, check_hash=False).check_layout(self.parser)
 
     def _add_fb_inference_file(self):
         """internal function to query the function block for model inference for writing."""
@@ -98,11 +450,24 @@ class ST_writer:
 
         self.to_write[file_name] = file_contents
 
+    def _add_fb_batch_inference_file(self):
+        """internal function to query the function block for batched model inference for writing."""
+        file_name = f"FB_{self.model_name}_Batch.st"
+        self.to_write[file_name] = self._get_fb_batch_inference_decl() + "\n\n" + self._get_fb_batch_inference_impl()
+
+    def _add_fb_shared_weights_file(self):
+        """internal function to query the function block loading the shared weights for writing."""
+        file_name = f"FB_{self.model_name}_Weights.st"
+        self.to_write[file_name] = self._get_fb_shared_weights_decl() + "\n\n" + self._get_fb_shared_weights_impl()
+
+    def _add_gvl_shared_weights_file(self):
+        """internal function to query the global variable list of the shared weights for writing."""
+        self.to_write[f"GVL_{self.model_name}.st"] = self._get_gvl_shared_weights_decl()
+
     def _add_nn_struct_file(self):
         """internal function to query the neural network data structure for writing."""
-        uuid = TwinCAT_ST_writer.generate_uuid()
         st_struct_contents = self._get_st_struct_contents(
-            struct_name=self._get_layers_struct_name(), struct_contents=self.parser.generate_struct_layers()
+            struct_name=self._get_layers_struct_name(), struct_contents=self._get_layers_struct_contents()
         )
 
         file_name = f"{self._get_layers_struct_name()}.st"
@@ -111,7 +476,6 @@ class ST_writer:
 
     def _add_nn_weights_struct_file(self):
         """internal function to query the neural network weights structure for writing."""
-        uuid = TwinCAT_ST_writer.generate_uuid()
         st_weigths_struct_contents = self._get_st_struct_contents(
             struct_name=self._get_layersweights_struct_name(),
             struct_contents=self.parser.generate_struct_layer_weights(),
@@ -124,47 +488,509 @@ class ST_writer:
     def _get_layers_struct_name(self) -> str:
         return self.model_name + "_Layers"
 
+    def _get_layers_struct_contents(self) -> str:
+        """return the members of the `Layers` struct (without the layer buffers for shared weights)"""
+        struct_contents = self.parser.generate_struct_layers()
+        if self.shared_weights:  # each instance of the FB holds its own layer buffers
+            struct_contents = re.sub(r"^\s*layer_buffer_\w+ :.*\n", "", struct_contents, flags=re.MULTILINE)
+        return struct_contents
+
+    def _get_layer_buffer_vars(self) -> str:
+        """return the layer buffers of the `Layers` struct as local variables (for shared weights)"""
+        return "".join(
+            f"  {line.strip()}\n"
+            for line in self.parser.generate_struct_layers().splitlines()
+            if re.match(r"^\s*layer_buffer_\w+ :", line)
+        )
+
+    def _get_weights_vars(self, nn_vars: str, layer_buffers: bool = False) -> str:
+        """return the local variables holding the weights (or referencing the shared weights) of a function block"""
+        if self.shared_weights:
+            weights_vars = template_fb_shared_weights_vars + (self._get_layer_buffer_vars() if layer_buffers else "")
+        else:
+            weights_vars = template_fb_weights_vars.replace("[[NN_VARS]]", nn_vars)
+        return (
+            weights_vars.replace("[[NAME]]", self.model_name)
+            .replace("[[NAME_ST_LAYERS]]", self._get_layers_struct_name())
+            .replace("[[WEIGHTS_FILE_PATH]]", self._get_layer_weights_path())
+            .replace("[[MANIFEST_FILE_PATH]]", self._get_weights_manifest_path())
+            .replace("[[LOAD_WEIGHTS_FB]]", self._get_load_weights_fb())
+            .replace("[[LOAD_WEIGHTS_VARS]]", self._get_load_weights_vars())
+        )
+
     def _get_layersweights_struct_name(self) -> str:
         return self.model_name + "_LayerWeights"
 
     def _get_fb_inference_decl(self) -> str:
         """return the declaration part of the inference function block"""
         return (
-            template_fb_inference_decl.replace("[[NAME]]", self.model_name)
+            template_fb_inference_decl.replace(
+                "[[WEIGHTS_VARS]]",
+                self._get_weights_vars(
+                    template_fb_hot_swap_nn_vars if self.hot_swap else "  nn : [[NAME_ST_LAYERS]];\n",
+                    layer_buffers=True,
+                ),
+            )
+            .replace("[[NAME]]", self.model_name)
             .replace("[[DATA_TYPE]]", self.nn_data_type)
-            .replace("[[NAME_ST_LAYERS]]", self._get_layers_struct_name())
-            .replace("[[WEIGHTS_FILE_PATH]]", self._get_layer_weights_path())
+            .replace(
+                "[[ADDITIONAL_VARS]]",
+                self._get_fb_inference_additional_vars()
+                + self._get_sequence_vars()
+                + (template_fb_profiling_vars if self.profiling_trace_length else ""),
+            )
+            .replace(
+                "[[INPUT_VARS]]",
+                (template_fb_hot_swap_input_vars if self.hot_swap else "")
+                + (template_fb_sequence_input_vars if self._is_sequence_model() else ""),
+            )
+            .replace("[[OUTPUT_VARS]]", self._get_fb_inference_output_vars())
+        )
+
+    def _get_fb_inference_output_vars(self) -> str:
+        """return the output variables of the inference function block (depending on the generation mode)"""
+        output_vars = ""
+        if self.time_slices:
+            output_vars += template_fb_time_sliced_output_vars
+        if self.hot_swap:
+            output_vars += template_fb_hot_swap_output_vars.replace(
+                "[[WEIGHTS_FILE_NAME]]", os.path.basename(self._get_layer_weights_path())
+            )
+        if self._has_pooling_windows():
+            output_vars += template_fb_sequence_output_vars
+        if self.profiling_trace_length:
+            output_vars += template_fb_profiling_output_vars.replace(
+                "[[TRACE_LENGTH]]", str(self.profiling_trace_length)
+            )
+        return f"VAR_OUTPUT\n{output_vars}END_VAR\n" if output_vars else ""
+
+    def _get_load_weights_fb(self) -> str:
+        """return the RTNNI function block loading the weights file"""
+        return "FB_LoadWeights" if self.parser.weights_chunk_size is None else "FB_LoadWeightsChunked"
+
+    def _get_load_weights_vars(self) -> str:
+        """return local variables for loading and verifying the weights"""
+        if self.parser.weights_chunk_size is None:
+            return ""
+        return "  chunk_counter : UDINT;\n" + ("  shadow_chunk_counter : UDINT;\n" if self.hot_swap else "")
+
+    def _get_weights_check_template(self, profiling: bool = False) -> str:
+        """return the implementation template loading and verifying the weights before the inference (`profiling`:
+        with the profiling events of the loading and verification steps)"""
+        if self.shared_weights:
+            return template_fb_inference_impl_shared.replace("[[NAME]]", self.model_name).replace(
+                "[[PROFILING_LOAD]]", self._get_profiling_event("load_weights") if profiling else ""
+            )
+        return self._get_weights_load_template(profiling)
+
+    def _get_weights_load_template(self, profiling: bool = False) -> str:
+        """return the implementation template loading and verifying the weights (`[[INFERENCE]]` once verified)"""
+        if self.parser.weights_chunk_size is None:
+            template = template_fb_inference_impl
+        else:
+            template = template_fb_inference_impl_chunked.replace(
+                "[[CHUNK_SIZE]]", str(self.parser.weights_chunk_size)
+            ).replace("[[NUM_CHUNKS]]", str(self.parser.get_num_chunks()))
+        return (
+            template.replace("[[WEIGHTS_DATA_OFFSET]]", str(get_weights_data_offset(self.parser)))
+            .replace("[[PROFILING_LOAD]]", self._get_profiling_event("load_weights", "\t\t") if profiling else "")
+            .replace("[[PROFILING_CHECK]]", self._get_profiling_event("check_weights") if profiling else "")
+        )
+
+    def _get_profiling_event(
+        self, section: str, indent: str = "\t", section_offset: str = "", comment: str = None
+    ) -> str:
+        """return a new line with the call of `F_ProfilingEvent`, which records the end of a section (see
+        `get_profiling_sections`) in the ring buffer of the profiling build, empty without profiling
+        (`section_offset`: ST expression added to the section index)"""
+        if not self.profiling_trace_length:
+            return ""
+        return "\n" + (
+            template_profiling_event.replace("[[INDENT]]", indent)
+            .replace("[[TRACE_LENGTH]]", str(self.profiling_trace_length))
+            .replace("[[SECTION]]", f"{get_profiling_sections(self.parser).index(section)}{section_offset}")
+            .replace("[[SECTION_NAME]]", comment or section)
+        )
+
+    def _get_fb_inference_additional_vars(self) -> str:
+        """return additional local variables of the inference function block (depending on the generation mode)"""
+        if self.specialized:
+            additional_vars = f"  j : UINT;\n  k : UINT;\n  acc : {self.nn_data_type};\n"
+            if self.parser.get_sparse_layers():
+                additional_vars += "  k_sparse : DINT;\n"
+            return additional_vars
+        if self.time_slices:
+            if self.parser.quantized:
+                layer_type = "Layer_INT8"
+            else:
+                layer_type = f"Layer{rtnni_type_suffixes[self.nn_data_type]}"
+            additional_vars = f"  slice : UINT;\n  slice_layer : {layer_type};\n"
+            if self.parser.get_sparse_layers():
+                additional_vars += f"  slice_layer_csr : Layer_CSR{rtnni_type_suffixes[self.nn_data_type]};\n"
+            additional_vars += f"  slice_input : ARRAY[0..{self.parser.input_dim-1}] OF {self.nn_data_type};\n"
+            additional_vars += f"  slice_output : ARRAY[0..{self.parser.output_dim-1}] OF {self.nn_data_type};\n"
+            return additional_vars
+        return ""
+
+    def _is_sequence_model(self) -> bool:
+        """return whether the FB evaluates one time step of a sequence per call (temporal or recurrent layers)"""
+        return bool(self.parser.get_temporal_layers() or self.parser.get_recurrent_layers())
+
+    def _has_pooling_windows(self) -> bool:
+        """return whether a pooling layer completes a window only every stride-th call (the FB signals `updated`)"""
+        return any(
+            layer.kind in temporal_pooling and layer.kind not in global_pooling_kinds
+            for layer in self.parser.get_temporal_layers()
+        )
+
+    def _get_sequence_vars(self) -> str:
+        """return the ring buffers and outputs of the temporal layers, the states of the recurrent layers and the gates
+        buffer of `F_LSTMCell`/`F_GRUCell` (per instance)"""
+        sequence_vars, data_type = "", self.nn_data_type
+        for layer_counter, layer in enumerate(self.parser.get_temporal_layers(), start=1):
+            history_size = get_temporal_history_length(layer) * layer.num_inputs
+            sequence_vars += f"  temporal_history_{layer_counter} : ARRAY[0..{history_size-1}] OF {data_type};\n"
+            sequence_vars += f"  temporal_output_{layer_counter} : ARRAY[0..{layer.num_outputs-1}] OF {data_type};\n"
+            if layer.kind in global_pooling_kinds:
+                sequence_vars += f"  temporal_count_{layer_counter} : UDINT;\n"
+            else:
+                sequence_vars += f"  temporal_newest_{layer_counter} : UINT;\n"
+                if layer.kind in temporal_pooling:
+                    sequence_vars += f"  temporal_count_{layer_counter} : DINT;\n"
+
+        recurrent_layers = self.parser.get_recurrent_layers()
+        if not recurrent_layers:
+            return sequence_vars
+        for layer_counter, layer in enumerate(recurrent_layers, start=1):
+            state_size = recurrent_state_sizes[layer.kind] * layer.num_units
+            sequence_vars += f"  recurrent_state_{layer_counter} : ARRAY[0..{state_size-1}] OF {data_type};\n"
+        buffer_size = max(recurrent_buffer_sizes[layer.kind] * layer.num_units for layer in recurrent_layers)
+        return sequence_vars + f"  recurrent_gates : ARRAY[0..{buffer_size-1}] OF {data_type};\n"
+
+    def _get_sequence_impl(self) -> str:
+        """return one time step of the temporal and recurrent layers (empty without such layers)"""
+        if not self._is_sequence_model():
+            return ""
+        layer_input = "ADR(nn.layer_buffer_a)" if self.parser.has_normalization else "pointer_input"
+        resets, layers_impl = [], []
+        if self._has_pooling_windows():
+            layers_impl.append("\tupdated := TRUE;")
+        for layer_counter, layer in enumerate(self.parser.get_temporal_layers(), start=1):
+            resets.append(template_temporal_reset.replace("[[LAYER_NUM]]", str(layer_counter)))
+            if layer.kind not in global_pooling_kinds:
+                resets.append(f"\t\ttemporal_newest_{layer_counter} := 0;")
+            if layer.kind in temporal_pooling:
+                resets.append(f"\t\ttemporal_count_{layer_counter} := 0;")
+            profiling_event = self._get_profiling_event(get_temporal_layer_role(layer_counter))
+            if layer.kind == layer_kind.conv1d:
+                template = template_temporal_conv + profiling_event
+            elif layer.kind in global_pooling_kinds:
+                template = template_temporal_global_pooling + profiling_event
+            else:  # the profiling event in front of the early return
+                template = template_temporal_pooling.replace("[[PROFILING_EVENT]]", profiling_event)
+            layers_impl.append(
+                template.replace("[[LAYER_NUM]]", str(layer_counter))
+                .replace("[[LAYER_INPUT]]", layer_input)
+                .replace("[[AVERAGE]]", "TRUE" if temporal_pooling.get(layer.kind) else "FALSE")
+            )
+            layer_input = f"ADR(temporal_output_{layer_counter})"
+        for layer_counter, layer in enumerate(self.parser.get_recurrent_layers(), start=1):
+            resets.append(template_recurrent_reset.replace("[[LAYER_NUM]]", str(layer_counter)))
+            layers_impl.append(
+                template_recurrent_layer.replace("[[CELL]]", "LSTM" if layer.kind == layer_kind.lstm else "GRU")
+                .replace("[[LAYER_NUM]]", str(layer_counter))
+                .replace("[[LAYER_INPUT]]", layer_input)
+                + self._get_profiling_event(get_recurrent_layer_role(layer_counter))
+            )
+            layer_input = f"ADR(recurrent_state_{layer_counter})"  # the hidden state comes first
+        return template_fb_sequence.replace("[[RESET_STATES]]", "\n".join(resets)).replace(
+            "[[SEQUENCE_LAYERS]]", "\n".join(layers_impl)
         )
 
+    def _get_dense_layers_input(self) -> str:
+        """return the input of the first dense layer: the hidden state of the last recurrent layer, the output of the
+        last temporal layer or the model input"""
+        num_recurrent_layers = len(self.parser.get_recurrent_layers())
+        num_temporal_layers = len(self.parser.get_temporal_layers())
+        if num_recurrent_layers:
+            return f"recurrent_state_{num_recurrent_layers}"
+        if num_temporal_layers:
+            return f"temporal_output_{num_temporal_layers}"
+        return "nn.layer_buffer_a" if self.parser.has_normalization else "pointer_input"
+
     def _get_fb_inference_impl(self) -> str:
         """return the implementation part of the inference function block"""
 
         if self.parser.has_normalization:
             norm_impl = clean_indentation(
-                """// input normalization
-                            F_NormalizationLayer(pointer_input := ADR(nn.layer_input),pointer_mean := ADR(nn.weights.normalization_mean),
+                """// input normalization (on a copy, the input of the caller is not modified)
+                            MEMCPY(destAddr:=ADR(nn.layer_buffer_a),srcAddr:=pointer_input,n:=SIZEOF([[DATA_TYPE]])*nn.layers[0].num_neurons);
+                            F_NormalizationLayer[[TYPE_SUFFIX]](pointer_input := ADR(nn.layer_buffer_a),pointer_mean := ADR(nn.weights.normalization_mean),
                                 pointer_std := ADR(nn.weights.normalization_std),invert := FALSE, num_neurons := nn.layers[0].num_neurons); """,
                 " " * 4,
-            )
+            ) + self._get_profiling_event("normalization")
         else:
             norm_impl = ""
+        if self._is_sequence_model():  # `nn.layers[0]` is the input of the dense layers
+            norm_impl = norm_impl.replace("nn.layers[0].num_neurons", str(self.parser.input_dim))
+            norm_impl = (norm_impl + "\n" if norm_impl else "") + self._get_sequence_impl()
 
         if self.parser.has_denormalization:
             denorm_impl = clean_indentation(
                 """// output denormalization
-                            F_NormalizationLayer(pointer_input := pointer_output,pointer_mean := ADR(nn.weights.denormalization_mean),
+                            F_NormalizationLayer[[TYPE_SUFFIX]](pointer_input := pointer_output,pointer_mean := ADR(nn.weights.denormalization_mean),
                                 pointer_std := ADR(nn.weights.denormalization_std),invert := TRUE, num_neurons := nn.layers[SIZEOF(nn.layers)/SIZEOF(nn.layers[0])-1].num_neurons);""",
                 " " * 4,
-            )
+            ) + self._get_profiling_event("denormalization")
         else:
             denorm_impl = ""
 
-        return (
-            template_fb_inference_impl.replace("[[DATA_TYPE]]", self.nn_data_type)
+        if self.specialized:
+            inference_impl = self._get_specialized_inference_impl()
+        elif self.time_slices:
+            inference_impl = self._get_time_sliced_inference_impl()
+        else:
+            if self.parser.get_sparse_layers():  # dispatch between the dense and the sparse kernel per layer
+                forward_propagation = template_forward_propagation_sparse.replace(
+                    "[[FORWARD_PROPAGATION]]", template_forward_propagation.replace("\n", "\n\t")
+                )
+            else:
+                forward_propagation = template_forward_propagation
+            dense_layers_input = self._get_dense_layers_input()
+            first_layer_role = get_layer_role(1, len(self.parser.get_layer_table()))
+            inference_impl = (
+                template_fb_inference_generic.replace(
+                    "[[FIRST_LAYER_INPUT]]",
+                    dense_layers_input if dense_layers_input == "pointer_input" else f"ADR({dense_layers_input})",
+                )
+                .replace("[[FORWARD_PROPAGATION]]", forward_propagation)
+                .replace(
+                    "[[PROFILING_LAYER]]", self._get_profiling_event(first_layer_role, "\t\t", "+i", "dense layer i+1")
+                )
+            )
+            if self.parser.quantized:
+                inference_impl = inference_impl.replace("[[KERNEL_SUFFIX]]", "_INT8").replace(
+                    "[[KERNEL_ARGS]]", ",\n\t\t\t\t\t\t\t\tpointer_in_quantized := ADR(nn.layer_buffer_quantized)"
+                )
+            else:
+                inference_impl = inference_impl.replace("[[KERNEL_SUFFIX]]", "[[TYPE_SUFFIX]]").replace(
+                    "[[KERNEL_ARGS]]", ""
+                )
+
+        if self.hot_swap:
+            inference_impl = (
+                self._get_hot_swap_impl() + self._get_profiling_event("weights_update") + "\n" + inference_impl
+            )
+
+        impl = (
+            (template_profiling_start if self.profiling_trace_length else "")
+            + (template_fb_hot_swap_init if self.hot_swap else "")
+            + self._get_shared_weights_init()
+            + self._get_weights_check_template(profiling=True).replace("[[INFERENCE]]", inference_impl)
             .replace("[[NORMALIZATION]]", norm_impl)
             .replace("[[DENORMALIZATION]]", denorm_impl)
+            .replace("[[DATA_TYPE]]", self.nn_data_type)
+            .replace("[[TYPE_SUFFIX]]", rtnni_type_suffixes[self.nn_data_type])
+        )
+        if self.shared_weights:  # the layer buffers are local variables (also for the normalization and sequence layers)
+            impl = impl.replace("nn.layer_buffer_", "layer_buffer_")
+        return impl
+
+    def _get_hot_swap_impl(self) -> str:
+        """return the state machine loading, verifying and switching to a newer weights version (one step per call)"""
+        if self.parser.weights_chunk_size is None:
+            shadow_check, load_shadow_args = template_hot_swap_check, ""
+        else:
+            shadow_check = template_hot_swap_check_chunked.replace("[[NUM_CHUNKS]]", str(self.parser.get_num_chunks()))
+            load_shadow_args = f", ChunkLen := {self.parser.weights_chunk_size}"
+        if self.time_slices:  # a time sliced inference uses the same weights in all slices
+            switch_weights = "\t\tIF slice = 0 THEN\n\t" + template_hot_swap_switch.replace("\n", "\n\t") + "\n\t\tEND_IF"
+        else:
+            switch_weights = template_hot_swap_switch
+        return (
+            template_fb_hot_swap.replace("[[SHADOW_CHECK]]", shadow_check)
+            .replace("[[LOAD_SHADOW_ARGS]]", load_shadow_args)
+            .replace("[[WEIGHTS_DATA_OFFSET]]", str(get_weights_data_offset(self.parser)))
+            .replace("[[VERSIONED_FILE_PATH_PREFIX]]", self._get_versioned_weights_path(1)[: -len("1.dat")])
+            .replace("[[SWITCH_WEIGHTS]]", switch_weights)
+        )
+
+    def _get_shared_weights_init(self) -> str:
+        """return the initialization of the reference to the shared weights (empty without shared weights)"""
+        return template_fb_shared_weights_init.replace("[[NAME]]", self.model_name) if self.shared_weights else ""
+
+    def _get_fb_shared_weights_decl(self) -> str:
+        """return the declaration part of the function block loading the shared weights"""
+        return (
+            template_fb_shared_weights_decl.replace(
+                "[[WEIGHTS_VARS]]", template_fb_weights_vars.replace("[[NN_VARS]]", template_fb_shared_weights_vars)
+            )
+            .replace("[[NAME]]", self.model_name)
+            .replace("[[NAME_ST_LAYERS]]", self._get_layers_struct_name())
+            .replace("[[WEIGHTS_FILE_PATH]]", self._get_layer_weights_path())
+            .replace("[[LOAD_WEIGHTS_FB]]", self._get_load_weights_fb())
+            .replace("[[LOAD_WEIGHTS_VARS]]", self._get_load_weights_vars())
+        )
+
+    def _get_fb_shared_weights_impl(self) -> str:
+        """return the implementation part of the function block loading the shared weights"""
+        return self._get_shared_weights_init() + self._get_weights_load_template().replace(
+            "[[INFERENCE]]", "\tready := TRUE;"
+        )
+
+    def _get_gvl_shared_weights_decl(self) -> str:
+        """return the global variable list of the shared weights"""
+        return template_gvl_shared_weights.replace("[[NAME]]", self.model_name).replace(
+            "[[NAME_ST_LAYERS]]", self._get_layers_struct_name()
+        )
+
+    def get_batch_buffer_size(self) -> int:
+        """returns the number of elements of each of the two layer buffers of `FB_<name>_Batch`."""
+        buffer_dims = [num_neurons for _, num_neurons, _ in self.parser.get_layer_table()[:-1]]
+        if self.parser.has_normalization:
+            buffer_dims.append(self.parser.input_dim)
+        return self.max_batch_size * max(buffer_dims, default=1)
+
+    def _get_fb_batch_inference_decl(self) -> str:
+        """return the declaration part of the batched inference function block"""
+        return (
+            template_fb_batch_inference_decl.replace(
+                "[[WEIGHTS_VARS]]", self._get_weights_vars("  nn : [[NAME_ST_LAYERS]];\n")
+            )
+            .replace("[[NAME]]", self.model_name)
+            .replace("[[DATA_TYPE]]", self.nn_data_type)
+            .replace("[[NUM_INPUTS]]", str(self.parser.input_dim))
+            .replace("[[NUM_OUTPUTS]]", str(self.parser.output_dim))
+            .replace("[[MAX_BATCH_SIZE]]", str(self.max_batch_size))
+            .replace("[[BATCH_BUFFER_SIZE]]", str(self.get_batch_buffer_size()))
+        )
+
+    def _get_fb_batch_inference_impl(self) -> str:
+        """return the implementation part of the batched inference function block"""
+        inference_impl = template_fb_batch_inference.replace(
+            "[[FIRST_LAYER_INPUT]]", "ADR(batch_buffer_a)" if self.parser.has_normalization else "pointer_input"
+        )
+        return (
+            self._get_shared_weights_init()
+            + self._get_weights_check_template().replace("[[INFERENCE]]", inference_impl)
+            .replace("[[NORMALIZATION]]", template_fb_batch_normalization if self.parser.has_normalization else "")
+            .replace("[[DENORMALIZATION]]", template_fb_batch_denormalization if self.parser.has_denormalization else "")
+            .replace("[[NUM_OUTPUTS]]", str(self.parser.output_dim))
+            .replace("[[MAX_BATCH_SIZE]]", str(self.max_batch_size))
+            .replace("[[DATA_TYPE]]", self.nn_data_type)
+            .replace("[[TYPE_SUFFIX]]", rtnni_type_suffixes[self.nn_data_type])
+        )
+
+    def _get_time_sliced_inference_impl(self) -> str:
+        """return the forward pass as a state machine, which evaluates one slice of neurons per call."""
+        layer_table = self.parser.get_layer_table()
+        sparse_layers = self.parser.get_sparse_layers()
+
+        def get_layer_output(layer_counter: int) -> str:
+            if layer_counter == len(layer_table):
+                return "slice_output"
+            return "nn.layer_buffer_a" if layer_counter % 2 else "nn.layer_buffer_b"
+
+        slices_impl = []
+        for slice_num, segments in enumerate(self.time_slices):
+            slice_impl = [f"\t{slice_num}:"]
+            if slice_num == 0:
+                slice_impl.append(template_time_slice_input)
+                if self.parser.has_normalization:
+                    slice_impl.append(template_time_slice_normalization)
+
+            for layer_counter, first_neuron, end_neuron in segments:
+                num_inputs, num_neurons, _ = layer_table[layer_counter - 1]
+                if layer_counter in sparse_layers:
+                    segment_impl = template_time_slice_segment_sparse
+                else:
+                    segment_impl = template_time_slice_segment.replace("[[FIRST_WEIGHT]]", str(first_neuron * num_inputs))
+                if self.parser.quantized:
+                    segment_impl = (
+                        segment_impl.replace(
+                            "[[SLICE_POINTERS]]",
+                            f"\t\tslice_layer.pointer_scale := ADR(nn.layers[{layer_counter}].pointer_scale[{first_neuron}]);\n",
+                        )
+                        .replace("[[KERNEL_SUFFIX]]", "_INT8")
+                        .replace("[[KERNEL_ARGS]]", ",\n\t\t\tpointer_in_quantized := ADR(nn.layer_buffer_quantized)")
+                    )
+                else:
+                    segment_impl = (
+                        segment_impl.replace("[[SLICE_POINTERS]]", "")
+                        .replace("[[KERNEL_SUFFIX]]", "[[TYPE_SUFFIX]]")
+                        .replace("[[KERNEL_ARGS]]", "")
+                    )
+                slice_impl.append(
+                    segment_impl.replace("[[LAYER_ROLE]]", get_layer_role(layer_counter, len(layer_table)))
+                    .replace("[[LAYER_NUM]]", str(layer_counter))
+                    .replace("[[PREVIOUS_LAYER_NUM]]", str(layer_counter - 1))
+                    .replace("[[FIRST_NEURON]]", str(first_neuron))
+                    .replace("[[LAST_NEURON]]", str(end_neuron - 1))
+                    .replace("[[NUM_NEURONS]]", str(num_neurons))
+                    .replace("[[SLICE_NEURONS]]", str(end_neuron - first_neuron))
+                    .replace("[[LAYER_INPUT]]", "slice_input" if layer_counter == 1 else get_layer_output(layer_counter - 1))
+                    .replace("[[LAYER_OUTPUT]]", get_layer_output(layer_counter))
+                )
+
+            if slice_num == len(self.time_slices) - 1:
+                slice_impl.append(template_time_slice_output)
+                if self.parser.has_denormalization:
+                    slice_impl.append(template_time_slice_denormalization)
+            slices_impl.append("\n".join(slice_impl))
+
+        return (
+            template_fb_inference_time_sliced.replace("[[SLICES]]", "\n".join(slices_impl))
+            .replace("[[NUM_SLICES]]", str(len(self.time_slices)))
+            .replace("[[MACS_PER_CALL]]", str(self.time_slice_macs_per_call))
         )
 
+    def _get_specialized_inference_impl(self) -> str:
+        """return the forward pass with one loop per dense layer, resolving sizes and activations at generation time."""
+        layer_table = self.parser.get_layer_table()
+        sparse_layers = self.parser.get_sparse_layers()
+        approximated_layers = self.parser.get_approximated_layers()
+        weights_layout = {member_name: shape for member_name, shape, _ in self.parser.get_weights_layout()}
+        layer_buffers = ["nn.layer_buffer_a", "nn.layer_buffer_b"]
+
+        layers_impl = []
+        layer_input = self._get_dense_layers_input()
+        for layer_counter, (num_inputs, num_neurons, activation) in enumerate(layer_table, start=1):
+            layer_role = get_layer_role(layer_counter, len(layer_table))
+            if layer_counter == len(layer_table):
+                layer_output = "pointer_output"
+            else:  # alternate between the two layer buffers
+                layer_output = layer_buffers[1] if layer_input == layer_buffers[0] else layer_buffers[0]
+            if activation == activation_or_normalization.linear:
+                activation_layer = ""
+            elif layer_counter in approximated_layers:  # table with linear interpolation (see `nnigen.approximation`)
+                activation_layer = template_specialized_activation_table
+            else:  # one call for the whole layer after the dot products
+                activation_layer = template_specialized_activation
+            activation_layer = activation_layer.replace(
+                "[[LAYER_OUTPUT_ADR]]", layer_output if layer_output == "pointer_output" else f"ADR({layer_output})"
+            )
+
+            if layer_counter in sparse_layers:
+                layer_template = template_specialized_sparse_layer.replace(
+                    "[[NUM_VALUES]]", str(weights_layout[f"{layer_role}_values"][0])
+                )
+            else:
+                layer_template = template_specialized_layer
+            layer_impl = (
+                layer_template.replace("[[ACTIVATION_LAYER]]", activation_layer)
+                .replace("[[LAYER_NUM]]", str(layer_counter))
+                .replace("[[NUM_INPUTS]]", str(num_inputs))
+                .replace("[[NUM_NEURONS]]", str(num_neurons))
+                .replace("[[ACTIVATION]]", activation.value)
+                .replace("[[LAYER_ROLE]]", layer_role)
+                .replace("[[LAYER_INPUT]]", layer_input)
+                .replace("[[LAYER_OUTPUT]]", layer_output)
+            )
+            layers_impl.append(layer_impl + self._get_profiling_event(layer_role))
+            layer_input = layer_output
+
+        return template_fb_inference_specialized.replace("[[LAYERS]]", "\n".join(layers_impl))
+
     def _get_st_struct_contents(self, struct_name: str, struct_contents: str) -> str:
         """builds a ST struct with given `name` and contents (`struct_contents` as IEC61131-3 code)"""
         return template_st_struct.replace("[[STRUCT_NAME]]", struct_name).replace(
@@ -175,6 +1001,14 @@ class ST_writer:
         """helper function to get the full absolute path of the serialized model weigths."""
         return os.path.abspath(os.path.join(self.path, f"{self.model_name}_weights.dat"))
 
+    def _get_versioned_weights_path(self, version: int) -> str:
+        """helper function to get the full absolute path of a weights version written by `write_versioned_weights_file`."""
+        return os.path.abspath(os.path.join(self.path, f"{self.model_name}_weights_v{version}.dat"))
+
+    def _get_weights_manifest_path(self) -> str:
+        """helper function to get the full absolute path of the manifest announcing the newest weights version."""
+        return os.path.abspath(os.path.join(self.path, f"{self.model_name}_weights_manifest.dat"))
+
 
 class TwinCAT_ST_writer(ST_writer):
     """Subclass of `ST_writer` for writing TwinCAT XML files."""
@@ -184,22 +1018,39 @@ class TwinCAT_ST_writer(ST_writer):
         unique_model_name: str,
         parser: model_parser,
         twincat_version: str = "3.1.4024.12",
+        specialized: bool = False,
+        time_slice_macs_per_call: int = None,
+        max_batch_size: int = None,
+        hot_swap: bool = False,
+        shared_weights: bool = False,
+        profiling_trace_length: int = None,
     ):
 
         self.twincat_version = twincat_version
-        super(TwinCAT_ST_writer, self).__init__(unique_model_name, parser)
+        super(TwinCAT_ST_writer, self).__init__(
+            unique_model_name,
+            parser,
+            specialized=specialized,
+            time_slice_macs_per_call=time_slice_macs_per_call,
+            max_batch_size=max_batch_size,
+            hot_swap=hot_swap,
+            shared_weights=shared_weights,
+            profiling_trace_length=profiling_trace_length,
+        )
 
     @classmethod
-    def generate_uuid(cls) -> str:
-        """returns a random uuid for the ST implementation."""
-        return str(uuid.uuid4())
+    def generate_uuid(cls, model_name: str, object_name: str) -> str:
+        """returns the uuid of a TwinCAT object of a model, which is the same on every export.
+
+        TwinCAT identifies objects by their uuid, so an unchanged object is recognized as such after a new export."""
+        return str(uuid.uuid5(UUID_NAMESPACE, f"{model_name}/{object_name}"))
 
     def _add_fb_inference_file(self):
-        uuid = TwinCAT_ST_writer.generate_uuid()
+        file_name = f"FB_{self.model_name}.TcPOU"
+        uuid = TwinCAT_ST_writer.generate_uuid(self.model_name, file_name)
         decl_part = self._get_fb_inference_decl()
         impl_part = self._get_fb_inference_impl()
 
-        file_name = f"FB_{self.model_name}.TcPOU"
         file_contents = (
             template_st_function_block_xml.replace("[[TWINCAT_VERSION]]", self.twincat_version)
             .replace("[[UUID]]", uuid)
@@ -210,12 +1061,45 @@ class TwinCAT_ST_writer(ST_writer):
 
         self.to_write[file_name] = file_contents
 
+    def _add_fb_batch_inference_file(self):
+        file_name = f"FB_{self.model_name}_Batch.TcPOU"
+        file_contents = (
+            template_st_function_block_xml.replace("[[TWINCAT_VERSION]]", self.twincat_version)
+            .replace("[[UUID]]", TwinCAT_ST_writer.generate_uuid(self.model_name, file_name))
+            .replace("[[FB_DECL]]", self._get_fb_batch_inference_decl())
+            .replace("[[FB_IMPL]]", self._get_fb_batch_inference_impl())
+            .replace("[[NAME]]", f"{self.model_name}_Batch")
+        )
+
+        self.to_write[file_name] = file_contents
+
+    def _add_fb_shared_weights_file(self):
+        file_name = f"FB_{self.model_name}_Weights.TcPOU"
+        file_contents = (
+            template_st_function_block_xml.replace("[[TWINCAT_VERSION]]", self.twincat_version)
+            .replace("[[UUID]]", TwinCAT_ST_writer.generate_uuid(self.model_name, file_name))
+            .replace("[[FB_DECL]]", self._get_fb_shared_weights_decl())
+            .replace("[[FB_IMPL]]", self._get_fb_shared_weights_impl())
+            .replace("[[NAME]]", f"{self.model_name}_Weights")
+        )
+
+        self.to_write[file_name] = file_contents
+
+    def _add_gvl_shared_weights_file(self):
+        file_name = f"GVL_{self.model_name}.TcGVL"
+        self.to_write[file_name] = (
+            template_st_gvl_xml.replace("[[TWINCAT_VERSION]]", self.twincat_version)
+            .replace("[[UUID]]", TwinCAT_ST_writer.generate_uuid(self.model_name, file_name))
+            .replace("[[GVL_DECL]]", self._get_gvl_shared_weights_decl())
+            .replace("[[NAME]]", self.model_name)
+        )
+
     def _add_nn_struct_file(self):
-        uuid = TwinCAT_ST_writer.generate_uuid()
+        file_name = f"{self._get_layers_struct_name()}.TcDUT"
+        uuid = TwinCAT_ST_writer.generate_uuid(self.model_name, file_name)
         st_struct_contents = self._get_st_struct_contents(
-            struct_name=self._get_layers_struct_name(), struct_contents=self.parser.generate_struct_layers()
+            struct_name=self._get_layers_struct_name(), struct_contents=self._get_layers_struct_contents()
         )
-        file_name = f"{self._get_layers_struct_name()}.TcDUT"
         file_contents = (
             template_st_struct_xml.replace("[[TWINCAT_VERSION]]", self.twincat_version)
             .replace("[[NAME_ST_LAYERS]]", self._get_layers_struct_name())
@@ -226,13 +1110,13 @@ class TwinCAT_ST_writer(ST_writer):
         self.to_write[file_name] = file_contents
 
     def _add_nn_weights_struct_file(self):
-        uuid = TwinCAT_ST_writer.generate_uuid()
+        file_name = f"{self._get_layersweights_struct_name()}.TcDUT"
+        uuid = TwinCAT_ST_writer.generate_uuid(self.model_name, file_name)
         st_weigths_struct_contents = self._get_st_struct_contents(
             struct_name=self._get_layersweights_struct_name(),
             struct_contents=self.parser.generate_struct_layer_weights(),
         )
 
-        file_name = f"{self._get_layersweights_struct_name()}.TcDUT"
         file_contents = (
             template_st_struct_xml.replace("[[TWINCAT_VERSION]]", self.twincat_version)
             .replace("[[NAME_ST_LAYERS]]", self._get_layersweights_struct_name())
@@ -0,0 +1,137 @@
+import json
+import os
+import re
+import zipfile
+import numpy as np
+
+from nnigen.parse_model import (
+    ir_parser,
+    model_ir,
+    ir_layer,
+    layer_kind,
+    activation_or_normalization,
+    get_recurrent_ir_layer,
+    get_temporal_ir_layer,
+    temporal_layer_kinds,
+    TEMPORAL_LAYER_CLASSES,
+)
+
+
+def _get_layer_kind(class_name: str) -> layer_kind:
+    return {
+        "Dense": layer_kind.dense,
+        "Normalization": layer_kind.normalization,
+        "Dropout": layer_kind.dropout,
+        "LSTM": layer_kind.lstm,
+        "GRU": layer_kind.gru,
+        **TEMPORAL_LAYER_CLASSES,
+    }.get(class_name, layer_kind.unsupported)
+
+
+def _get_weights_group_names(layer_configs: list) -> list:
+    """returns the names of the layers' groups in `model.weights.h5`.
+
+    Keras names the groups by the class (`dense`, `dense_1`, ...) in the order of the layers, not by the layer names.
+    """
+    group_names, counts = [], {}
+    for layer_config in layer_configs:
+        name = re.sub(r"(.)([A-Z][a-z]+)", r"\1_\2", layer_config["class_name"])
+        name = re.sub(r"([a-z])([A-Z])", r"\1_\2", name).lower()
+        group_names.append(name if name not in counts else f"{name}_{counts[name]}")
+        counts[name] = counts.get(name, 0) + 1
+    return group_names
+
+
+def read_keras_archive(keras_file_path: str) -> model_ir:
+    """reads the `model_ir` of a `keras.Sequential` model saved as `.keras` archive, without importing Keras.
+
+    Only `config.json` and `model.weights.h5` of the archive are read (Keras 3 format).
+
+    ### Inputs:
+
+    keras_file_path: str                ... path of the `.keras` file
+
+    ### Outputs:
+
+    the same `model_ir` as `extract_keras_ir` for the loaded model
+    """
+    import h5py  # only needed here, keeps `import nnigen` fast
+
+    with zipfile.ZipFile(keras_file_path) as archive:
+        config = json.loads(archive.read("config.json"))
+        with archive.open("model.weights.h5") as f, h5py.File(f, "r") as weights_file:
+            return _get_model_ir(config, weights_file, keras_file_path)
+
+
+def _get_model_ir(config: dict, weights_file, keras_file_path: str) -> model_ir:
+    if config.get("class_name") != "Sequential":
+        raise ValueError(f"'{keras_file_path}' does not contain a Sequential model, but '{config.get('class_name')}'.")
+
+    layer_configs = config["config"]["layers"]
+    input_dim = None
+    if layer_configs and layer_configs[0]["class_name"] == "InputLayer":
+        input_dim = layer_configs.pop(0)["config"]["batch_shape"][-1]
+
+    layers = []
+    for layer_config, group_name in zip(layer_configs, _get_weights_group_names(layer_configs)):
+        kind = _get_layer_kind(layer_config["class_name"])
+        layer_input_shape = layer_config.get("build_config", {}).get("input_shape")
+        if input_dim is None and layer_input_shape is not None:
+            input_dim = layer_input_shape[-1]
+        variables = weights_file.get(f"layers/{group_name}/vars", {})
+
+        if kind == layer_kind.dense:
+            units = layer_config["config"]["units"]
+            weight = np.asarray(variables["0"]).T
+            bias = np.asarray(variables["1"]) if layer_config["config"]["use_bias"] else np.zeros(units, weight.dtype)
+            activation = activation_or_normalization(layer_config["config"]["activation"])
+            layers.append(ir_layer(kind, layer_config["config"]["name"], units, activation, (weight, bias)))
+        elif kind in (layer_kind.lstm, layer_kind.gru):
+            cell_variables = weights_file[f"layers/{group_name}/cell/vars"]
+            layers.append(
+                get_recurrent_ir_layer(
+                    layer_config["config"],
+                    layer_config["class_name"],
+                    [cell_variables[str(i)] for i in range(len(cell_variables))],
+                )
+            )
+        elif kind in temporal_layer_kinds:
+            layers.append(
+                get_temporal_ir_layer(
+                    layer_config["config"],
+                    layer_config["class_name"],
+                    [variables[str(i)] for i in range(len(variables))],
+                )
+            )
+        elif kind == layer_kind.normalization:
+            num_features = layer_input_shape[-1]
+            if layer_config["config"].get("mean") is not None:  # statistics given in the constructor
+                mean, variance = layer_config["config"]["mean"], layer_config["config"]["variance"]
+            else:  # adapted statistics
+                mean, variance = np.asarray(variables["0"]), np.asarray(variables["1"])
+            mean = np.broadcast_to(np.asarray(mean, dtype=np.float32), (num_features,)).flatten()
+            std = np.sqrt(np.broadcast_to(np.asarray(variance, dtype=np.float32), (num_features,)).flatten())
+            layers.append(ir_layer(kind, layer_config["config"]["name"], num_features, None, (mean, std)))
+        else:
+            layers.append(ir_layer(kind, layer_config["config"]["name"], 0, None, ()))
+
+    output_layers = [layer for layer in layers if layer.kind != layer_kind.dropout]
+    return model_ir(
+        input_dim=input_dim,
+        output_dim=output_layers[-1].num_neurons if output_layers else input_dim,
+        layers=tuple(layers),
+    )
+
+
+class keras_archive_parser(ir_parser):
+    """nnigen model parser implementation for `keras.Sequential` models saved as `.keras` file.
+
+    Keras is not imported (see `read_keras_archive`), which makes e.g. `update_model_weigths` with the path of a
+    retrained model fast."""
+
+    def __init__(self, keras_file_path: str, unique_model_name: str, nn_data_type: str = "LREAL"):
+
+        self.keras_file_path = os.fspath(keras_file_path)
+        super(keras_archive_parser, self).__init__(
+            read_keras_archive(self.keras_file_path), unique_model_name, nn_data_type=nn_data_type
+        )
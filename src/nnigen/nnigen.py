@@ -1,70 +1,594 @@
-from typing import Tuple
-import keras
-from nnigen.parse_model import keras_to_st_parser
+from typing import Tuple, Union, TYPE_CHECKING
+import logging
+import os
+import struct
+import numpy as np
+from nnigen.parse_model import (
+    model_parser,
+    keras_to_st_parser,
+    nn_data_types,
+    temporal_pooling,
+    global_pooling_kinds,
+)
+from nnigen.keras_archive import keras_archive_parser
 from nnigen.gen_st import TwinCAT_ST_writer, ST_writer
+from nnigen.emulator import rtnni_emulator
+from nnigen.quantize import int8_quantized_parser
+from nnigen.optimize import normalization_folding_parser
+from nnigen.sparse import sparse_layer_parser
+from nnigen.chunking import chunked_weights_parser
+from nnigen.approximation import approximated_activation_parser
+
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:  # Keras is only imported, when a Keras model is passed (see `get_model_parser`)
+    import keras
+
+
+def get_model_parser(
+    keras_sequential_model: Union["keras.Sequential", str, os.PathLike],
+    plc_model_name: str,
+    nn_data_type: str = "LREAL",
+) -> model_parser:
+    """returns the parser of a Keras model, or of a model saved as `.keras` file (read without importing Keras)."""
+    if isinstance(keras_sequential_model, (str, os.PathLike)):
+        return keras_archive_parser(keras_sequential_model, plc_model_name, nn_data_type=nn_data_type)
+    return keras_to_st_parser(keras_sequential_model, plc_model_name, nn_data_type=nn_data_type)
+
+
+def _build_parser(
+    keras_sequential_model: Union["keras.Sequential", str, os.PathLike],
+    plc_model_name: str,
+    nn_data_type: str = "LREAL",
+    fold_normalization: bool = False,
+    folding_verification_inputs: np.ndarray = None,
+    sparsity_threshold: float = None,
+    cost_target="generic_x64",
+    quantization_calibration_inputs: np.ndarray = None,
+    activation_tolerance: float = None,
+    activation_calibration_inputs: np.ndarray = None,
+    activation_table_size: int = None,
+    weights_chunk_size: int = None,
+) -> model_parser:
+    """returns the parser of an export with all its stages: folded normalization, sparse layers, int8 quantization,
+    approximated activations and chunked weights (in this order).
+
+    `nnigen`, `update_model_weigths` and `validate_export` build the parser here, such that the same options always
+    result in the same `LayerWeights` layout. The options are those of `nnigen`. With `activation_table_size`, only this
+    table size is used (for an existing export), without `activation_tolerance` the tables are not checked.
+    """
+    reader = get_model_parser(keras_sequential_model, plc_model_name, nn_data_type=nn_data_type)
+    if fold_normalization:
+        reader = fold_and_verify_normalization(keras_sequential_model, reader, folding_verification_inputs)
+    if sparsity_threshold is not None:
+        reader = sparse_layer_parser(reader, sparsity_threshold, target=cost_target)
+    if quantization_calibration_inputs is not None:
+        reader = int8_quantized_parser(reader, quantization_calibration_inputs)
+    if activation_tolerance is not None or activation_table_size is not None:
+        reader = approximate_and_verify_activations(
+            keras_sequential_model,
+            reader,
+            activation_calibration_inputs,
+            np.inf if activation_tolerance is None else activation_tolerance,
+            table_sizes=None if activation_table_size is None else (activation_table_size,),
+        )
+    if weights_chunk_size is not None:
+        reader = chunked_weights_parser(reader, weights_chunk_size)
+    return reader
 
 
 def nnigen(
-    keras_sequential_model: keras.Sequential,
+    keras_sequential_model: Union["keras.Sequential", str, os.PathLike],
     plc_model_name: str,
     plc_model_path: str,
     overwrite_if_model_exists: bool = False,
     write_plain_st: bool = False,
+    specialized_inference: bool = False,
+    nn_data_type: str = "LREAL",
+    quantization_calibration_inputs: np.ndarray = None,
+    cycle_time_budget_us: float = None,
+    memory_budget_bytes: int = None,
+    cost_target="generic_x64",
+    fold_normalization: bool = False,
+    folding_verification_inputs: np.ndarray = None,
+    sparsity_threshold: float = None,
+    time_slice_macs_per_call: int = None,
+    max_batch_size: int = None,
+    weights_chunk_size: int = None,
+    hot_swap: bool = False,
+    activation_tolerance: float = None,
+    activation_calibration_inputs: np.ndarray = None,
+    shared_weights: bool = False,
+    profiling_trace_length: int = None,
 ):
     """converts a given `keras.Sequential` model to TwinCAT ST files.
 
     ### Inputs:
 
-    keras_sequential_model                          ... the Keras model to generate a PLC model from
+    keras_sequential_model                          ... the Keras model to generate a PLC model from, or the path of the
+                                                        model saved as `.keras` file (read without Keras)
     plc_model_name: str                             ... a unique model name to distinguish the model from others in the PLC
     plc_model_path : str                            ... the path to export the model to. If nonexistent, the path will be generated.
     overwrite_if_model_exists: bool [default: False] ... Flag, whether to oveewrite files, if model files exist already.
-    write_plain_st: bool [default: False]           ...
+    write_plain_st: bool [default: False]           ... Flag, whether to write plain ST files instead of TwinCAT XML files.
+    specialized_inference: bool [default: False]    ... Flag, whether to generate a network specific forward pass
+                                                        (constant layer sizes, activations resolved at generation time)
+                                                        instead of the generic loop over `F_ForwardPropagation`.
+    nn_data_type: str [default: "LREAL"]            ... floating point type of weights and computations on the PLC
+                                                        ("LREAL" or "REAL"). See `get_precision_report` for the
+                                                        deviation caused by "REAL".
+    quantization_calibration_inputs: np.ndarray [default: None] ... if given, the weights are quantized to int8
+                                                        (post-training, calibrated on these representative inputs).
+                                                        See `get_quantization_report` for the resulting deviation.
+    cycle_time_budget_us: float [default: None]     ... if given, the export fails (`RuntimeError`) when the estimated
+                                                        execution time of the model exceeds this budget
+    memory_budget_bytes: int [default: None]        ... if given, the export fails (`RuntimeError`) when the memory of
+                                                        the model structs exceeds this budget
+    cost_target [default: "generic_x64"]            ... calibration table for the estimation (see `nnigen.cost_model`)
+    fold_normalization: bool [default: False]       ... Flag, whether to fold the input normalization and the output
+                                                        denormalization into the first and last dense layer. The folded
+                                                        model is compared to Keras before writing (`RuntimeError` if
+                                                        it deviates more than the unfolded export).
+    folding_verification_inputs: np.ndarray [default: None] ... samples for the comparison. If `None`, samples are
+                                                        drawn from the statistics of the normalization layer.
+    sparsity_threshold: float [default: None]       ... if given, layers with at least this share of zero weights
+                                                        (e.g. pruned networks) are stored in the compressed sparse row
+                                                        format, if this is estimated to be faster (see `cost_target`).
+    time_slice_macs_per_call: int [default: None]   ... if given, `FB_<name>` is generated as a state machine, which
+                                                        spreads the inference over several calls (at most this number of
+                                                        multiply-accumulates per call) and signals `busy`/`done`.
+                                                        `cycle_time_budget_us` is then checked per call.
+    max_batch_size: int [default: None]             ... if given, `FB_<name>_Batch` is generated additionally, which
+                                                        evaluates up to this number of samples per call (one pass
+                                                        over the weights for all samples, see `get_example_usage`)
+    weights_chunk_size: int [default: None]         ... if given, the PLC loads and verifies (SHA-256) at most this
+                                                        number of bytes of the weights per cycle. The weights file then
+                                                        contains a chunk table and one hash per chunk.
+    hot_swap: bool [default: False]                 ... Flag, whether `FB_<name>` can switch to retrained weights
+                                                        without stopping the inference (see `update_model_weigths`).
+                                                        The FB then holds the weights twice.
+    activation_tolerance: float [default: None]     ... if given, `tanh`, `sigmoid`, `softplus`, `silu` and `selu` are
+                                                        approximated by tables (no `EXP` on the PLC). The smallest table,
+                                                        for which the outputs deviate at most this much from Keras on
+                                                        `activation_calibration_inputs`, is used (`RuntimeError` if none).
+    activation_calibration_inputs: np.ndarray [default: None] ... representative inputs of shape
+                                                        `(num_samples, num_inputs)` for the table ranges and the check
+                                                        (required with `activation_tolerance`)
+    shared_weights: bool [default: False]           ... Flag, whether all instances of `FB_<name>` share one copy of the
+                                                        weights in `GVL_<name>`, which is loaded once (for many
+                                                        instances of the same model, e.g. one per axis). Each instance
+                                                        only holds its layer buffers.
+    profiling_trace_length: int [default: None]     ... if given, a profiling build of `FB_<name>` is generated, which
+                                                        records the CPU counter around the weights loading and
+                                                        verification, the (de)normalization and each layer into a ring
+                                                        buffer of this number of records (see `nnigen.profiling` for the
+                                                        analysis of the exported trace, not with time slicing).
 
     ### Outputs:
 
     written to files directly
     """
-    reader = keras_to_st_parser(keras_sequential_model, plc_model_name)
+    reader = _build_parser(
+        keras_sequential_model,
+        plc_model_name,
+        nn_data_type=nn_data_type,
+        fold_normalization=fold_normalization,
+        folding_verification_inputs=folding_verification_inputs,
+        sparsity_threshold=sparsity_threshold,
+        cost_target=cost_target,
+        quantization_calibration_inputs=quantization_calibration_inputs,
+        activation_tolerance=activation_tolerance,
+        activation_calibration_inputs=activation_calibration_inputs,
+        weights_chunk_size=weights_chunk_size,
+    )
+    reader.check_cost_budget(
+        cycle_time_budget_us,
+        memory_budget_bytes,
+        target=cost_target,
+        specialized=specialized_inference,
+        time_slice_macs_per_call=time_slice_macs_per_call,
+    )
     # layers_contents = reader.generate_struct_layers()
     # layersWeights_contents = reader.generate_struct_layer_weights()
 
     if write_plain_st:
-        writer = ST_writer(plc_model_name, reader)
+        writer = ST_writer(
+            plc_model_name,
+            reader,
+            specialized=specialized_inference,
+            time_slice_macs_per_call=time_slice_macs_per_call,
+            max_batch_size=max_batch_size,
+            hot_swap=hot_swap,
+            shared_weights=shared_weights,
+            profiling_trace_length=profiling_trace_length,
+        )
     else:  # output TwinCAT3 ready xml files
-        writer = TwinCAT_ST_writer(plc_model_name, reader)
+        writer = TwinCAT_ST_writer(
+            plc_model_name,
+            reader,
+            specialized=specialized_inference,
+            time_slice_macs_per_call=time_slice_macs_per_call,
+            max_batch_size=max_batch_size,
+            hot_swap=hot_swap,
+            shared_weights=shared_weights,
+            profiling_trace_length=profiling_trace_length,
+        )
 
     writer.write_ST_files_to(plc_model_path, overwrite_if_exists=overwrite_if_model_exists)
     writer.write_weights_file(overwrite_if_exists=overwrite_if_model_exists)
 
 
-def update_model_weigths(keras_sequential_model: keras.Sequential, plc_model_name: str, plc_model_path: str):
+def update_model_weigths(
+    keras_sequential_model: Union["keras.Sequential", str, os.PathLike],
+    plc_model_name: str,
+    plc_model_path: str,
+    nn_data_type: str = "LREAL",
+    quantization_calibration_inputs: np.ndarray = None,
+    fold_normalization: bool = False,
+    sparsity_threshold: float = None,
+    weights_chunk_size: int = None,
+    hot_swap: bool = False,
+    version: int = None,
+    activation_tolerance: float = None,
+    activation_calibration_inputs: np.ndarray = None,
+    activation_table_size: int = None,
+    cost_target="generic_x64",
+) -> int:
     """with retrained weights in keras_sequential_model this function just exports the weights file again.
 
-    An existing weights file at the same location is overwritten.
+    An existing weights file at the same location is overwritten. With `hot_swap`, the weights are written to the new
+    file `<name>_weights_v<version>.dat` instead and announced in `<name>_weights_manifest.dat`. A running
+    `FB_<name>` generated with `hot_swap` loads them on a rising edge of `check_for_update`. In both cases, the
+    `LayerWeights` layout must equal the one of the exported `<name>_weights.dat` (`RuntimeError` otherwise).
 
     ### Inputs:
 
-    keras_sequential_model                          ... the Keras model to generate a PLC model from
+    keras_sequential_model                          ... the Keras model to generate a PLC model from, or the path of the
+                                                        model saved as `.keras` file (read without Keras)
     plc_model_name: str                             ... a unique model name to distinguish the model from others in the PLC
     plc_model_path : str                            ... the path to export the model to. If nonexistent, the path will be generated.
+    nn_data_type: str [default: "LREAL"]            ... floating point type used for the original export
+    quantization_calibration_inputs: np.ndarray [default: None] ... calibration inputs, if the original export was quantized
+    fold_normalization: bool [default: False]       ... Flag, whether the original export folded the normalization
+    sparsity_threshold: float [default: None]       ... sparsity threshold of the original export. The sparse layers and
+                                                        their number of nonzero weights must not have changed
+                                                        (`RuntimeError` if the layout differs from the exported file).
+    weights_chunk_size: int [default: None]         ... chunk size of the original export
+    hot_swap: bool [default: False]                 ... Flag, whether to write a new weights version for hot swapping
+    version: int [default: None]                    ... version number for `hot_swap` (larger than the version in the
+                                                        manifest). If `None`, the version in the manifest plus one.
+    activation_tolerance: float [default: None]     ... tolerance of the approximated activations of the original export
+    activation_calibration_inputs: np.ndarray [default: None] ... calibration inputs for the approximated activations
+    activation_table_size: int [default: None]      ... number of intervals per table of the original export (logged
+                                                        by `nnigen`). The tables are recomputed for the new weights and
+                                                        must meet the tolerance with this size.
+    cost_target [default: "generic_x64"]            ... calibration table of the original export, which selected the
+                                                        sparse layers (see `nnigen.cost_model`)
+
+    ### Outputs:
+
+    the version number of the written weights (0 without `hot_swap`)
     """
-    reader = keras_to_st_parser(keras_sequential_model, plc_model_name)
+    if activation_tolerance is not None and activation_table_size is None:
+        raise ValueError("The table size of the approximated activations is required to keep the weights layout.")
+    reader = _build_parser(
+        keras_sequential_model,
+        plc_model_name,
+        nn_data_type=nn_data_type,
+        fold_normalization=fold_normalization,
+        sparsity_threshold=sparsity_threshold,
+        cost_target=cost_target,
+        quantization_calibration_inputs=quantization_calibration_inputs,
+        activation_tolerance=activation_tolerance,
+        activation_calibration_inputs=activation_calibration_inputs,
+        activation_table_size=activation_table_size if activation_tolerance is not None else None,
+        weights_chunk_size=weights_chunk_size,
+    )
     writer = ST_writer(plc_model_name, reader)
     writer.path = plc_model_path
+    if hot_swap:
+        return writer.write_versioned_weights_file(version)
+    writer.check_weights_layout()
     writer.write_weights_file(overwrite_if_exists=True)
+    return 0
+
 
+def fold_and_verify_normalization(
+    keras_sequential_model: Union["keras.Sequential", str, os.PathLike],
+    reader: model_parser,
+    inputs: np.ndarray = None,
+    batch_size: int = 4096,
+    tolerance: float = 1e-6,
+) -> normalization_folding_parser:
+    """folds the (de)normalization of a parser into its dense layers and checks the result against Keras.
 
-def get_example_usage(keras_sequential_model: keras.Sequential, plc_model_name: str) -> str:
+    ### Inputs:
+
+    keras_sequential_model                          ... the Keras model the parser was created from. For the path of
+                                                        a saved model, the unfolded parser is the reference.
+    reader: `model_parser`                          ... parser of the model
+    inputs: np.ndarray [default: None]              ... samples of shape `(num_samples, num_inputs)`. If `None`, 1000
+                                                        samples are drawn from the statistics of the input normalization
+                                                        (standard normal without normalization layer), for sequence
+                                                        models (temporal or recurrent layers) 100 sequences of 32 time
+                                                        steps.
+    batch_size: int [default: 4096]                 ... batch size for `keras.Sequential.predict`
+    tolerance: float [default: 1e-6]                ... allowed additional deviation relative to the output range
+
+    ### Outputs:
+
+    `normalization_folding_parser` wrapping `reader` (`RuntimeError` if the folded model deviates from Keras by more
+    than the unfolded model plus `tolerance`)
+    """
+    folded_reader = normalization_folding_parser(reader)
+    if inputs is None:
+        samples_shape = (100, 32) if reader.get_recurrent_layers() or reader.get_temporal_layers() else (1000,)
+        inputs = np.random.default_rng(0).standard_normal(samples_shape + (reader.input_dim,))
+        if reader.has_normalization:
+            weights = reader.get_weights()
+            inputs = inputs * weights["normalization_std"] + weights["normalization_mean"]
+
+    if isinstance(keras_sequential_model, (str, os.PathLike)):
+        reference_outputs = rtnni_emulator(reader).predict(inputs)
+    else:
+        reference_outputs = keras_sequential_model.predict(inputs, batch_size=batch_size, verbose=0)
+    deviation = rtnni_emulator(reader).max_deviation(reference_outputs, inputs)
+    folded_deviation = rtnni_emulator(folded_reader).max_deviation(reference_outputs, inputs)
+    output_range = max(float(np.max(np.abs(reference_outputs))), 1.0)
+    if folded_deviation > deviation + tolerance * output_range:
+        raise RuntimeError(
+            f"Folding the normalization of '{reader.model_name}' changes the model outputs: maximum deviation to Keras "
+            + f"{folded_deviation:.3e} (unfolded: {deviation:.3e}). Export without `fold_normalization`."
+        )
+    return folded_reader
+
+
+def approximate_and_verify_activations(
+    keras_sequential_model: Union["keras.Sequential", str, os.PathLike],
+    reader: model_parser,
+    calibration_inputs: np.ndarray,
+    tolerance: float,
+    table_sizes: tuple = None,
+    batch_size: int = 4096,
+) -> approximated_activation_parser:
+    """approximates the activation functions of a parser by tables, which keep the outputs within a tolerance of Keras.
+
+    ### Inputs:
+
+    keras_sequential_model                          ... the Keras model the parser was created from. For the path of
+                                                        a saved model, the exact export (emulated) is the reference.
+    reader: `model_parser`                          ... parser of the model (not quantized)
+    calibration_inputs: np.ndarray                  ... samples of shape `(num_samples, num_inputs)`
+    tolerance: float                                ... maximum absolute deviation of the outputs from the reference
+    table_sizes: tuple [default: None]              ... numbers of intervals per table to try
+                                                        (`None`: `nnigen.approximation.DEFAULT_TABLE_SIZES`)
+    batch_size: int [default: 4096]                 ... batch size for `keras.Sequential.predict`
+
+    ### Outputs:
+
+    `approximated_activation_parser` wrapping `reader` (`RuntimeError` if no table size meets the tolerance)
+    """
+    if calibration_inputs is None:
+        raise ValueError("Approximated activations require calibration inputs (`activation_calibration_inputs`).")
+
+    reference_outputs = None
+    if not isinstance(keras_sequential_model, (str, os.PathLike)):
+        reference_outputs = keras_sequential_model.predict(calibration_inputs, batch_size=batch_size, verbose=0)
+    options = {} if table_sizes is None else {"table_sizes": table_sizes}
+    approximated_reader = approximated_activation_parser(
+        reader, calibration_inputs, tolerance, reference_outputs=reference_outputs, **options
+    )
+    logger.info(
+        f"Activations of '{reader.model_name}' approximated with {approximated_reader.num_intervals} intervals per "
+        + f"table: maximum deviation {approximated_reader.max_deviation:.3e} "
+        + f"(exact activations: {approximated_reader.exact_deviation:.3e})."
+    )
+    return approximated_reader
+
+
+def validate_export(
+    keras_sequential_model: "keras.Sequential",
+    plc_model_name: str,
+    plc_model_path: str,
+    inputs: np.ndarray,
+    batch_size: int = 4096,
+    nn_data_type: str = "LREAL",
+    fold_normalization: bool = False,
+    sparsity_threshold: float = None,
+    weights_chunk_size: int = None,
+    activation_calibration_inputs: np.ndarray = None,
+    activation_table_size: int = None,
+    cost_target="generic_x64",
+    quantization_calibration_inputs: np.ndarray = None,
+) -> float:
+    """evaluates an exported model with the NumPy reference runtime and compares it to `keras.Sequential.predict`.
+
+    The SHA-256 hash of the weights file is checked before the comparison (`RuntimeError` if it does not match).
+
+    ### Inputs:
+
+    keras_sequential_model                          ... the Keras model the PLC model was generated from
+    plc_model_name: str                             ... the unique model name used for the export
+    plc_model_path : str                            ... the path the model was exported to
+    inputs: np.ndarray                              ... samples of shape `(num_samples, num_inputs)`, sequences of shape
+                                                        `(num_samples, num_steps, num_inputs)` for sequence models
+                                                        (compared to the FB called once per time step after `reset_state`)
+    batch_size: int [default: 4096]                 ... batch size for `keras.Sequential.predict`
+    nn_data_type: str [default: "LREAL"]            ... floating point type used for the export
+    fold_normalization: bool [default: False]       ... Flag, whether the export folded the normalization
+    sparsity_threshold: float [default: None]       ... sparsity threshold used for the export
+    weights_chunk_size: int [default: None]         ... chunk size used for the export
+    activation_calibration_inputs: np.ndarray [default: None] ... calibration inputs of approximated activations
+    activation_table_size: int [default: None]      ... number of intervals per table, if the export approximated the
+                                                        activations (the tables themselves are read from the file)
+    cost_target [default: "generic_x64"]            ... calibration table used for the export, which selected the sparse
+                                                        layers (see `nnigen.cost_model`)
+    quantization_calibration_inputs: np.ndarray [default: None] ... calibration inputs, if the export was quantized
+                                                        (the quantized model is emulated)
+
+    ### Outputs:
+
+    maximum absolute deviation between the exported model and the Keras model over all samples and outputs
+    """
+    reader = _build_parser(
+        keras_sequential_model,
+        plc_model_name,
+        nn_data_type=nn_data_type,
+        fold_normalization=fold_normalization,
+        sparsity_threshold=sparsity_threshold,
+        cost_target=cost_target,
+        quantization_calibration_inputs=quantization_calibration_inputs,
+        activation_calibration_inputs=activation_calibration_inputs,
+        activation_table_size=activation_table_size,
+        weights_chunk_size=weights_chunk_size,
+    )
+    writer = ST_writer(plc_model_name, reader)
+    writer.path = plc_model_path
+    emulator = rtnni_emulator(reader, writer._get_layer_weights_path())
+
+    reference_outputs = keras_sequential_model.predict(inputs, batch_size=batch_size, verbose=0)
+    return emulator.max_deviation(reference_outputs, inputs)
+
+
+def get_precision_report(
+    keras_sequential_model: "keras.Sequential", inputs: np.ndarray, nn_data_type: str = "REAL", batch_size: int = 4096
+) -> dict:
+    """reports the deviation caused by exporting a model with a reduced floating point precision (e.g. "REAL").
+
+    ### Inputs:
+
+    keras_sequential_model                          ... the Keras model to generate a PLC model from
+    inputs: np.ndarray                              ... representative samples of shape `(num_samples, num_inputs)`
+    nn_data_type: str [default: "REAL"]             ... floating point type to evaluate
+    batch_size: int [default: 4096]                 ... batch size for `keras.Sequential.predict`
+
+    ### Outputs:
+
+    dictionary with the maximum absolute deviations `max_deviation_to_lreal` (to the export with "LREAL") and
+    `max_deviation_to_keras` (to `keras.Sequential.predict`) over all samples and outputs
+    """
+    emulator = rtnni_emulator(
+        keras_to_st_parser(keras_sequential_model, "precision_report", nn_data_type=nn_data_type)
+    )
+    emulator_lreal = rtnni_emulator(keras_to_st_parser(keras_sequential_model, "precision_report"))
+
+    reference_outputs = keras_sequential_model.predict(inputs, batch_size=batch_size, verbose=0)
+    return {
+        "max_deviation_to_lreal": emulator.max_deviation(emulator_lreal.predict(inputs), inputs),
+        "max_deviation_to_keras": emulator.max_deviation(reference_outputs, inputs),
+    }
+
+
+def get_quantization_report(
+    keras_sequential_model: "keras.Sequential",
+    calibration_inputs: np.ndarray,
+    inputs: np.ndarray,
+    batch_size: int = 4096,
+) -> dict:
+    """reports the accuracy and the weights size of the int8 quantized export compared to the float Keras model.
+
+    ### Inputs:
+
+    keras_sequential_model                          ... the Keras model to generate a PLC model from
+    calibration_inputs: np.ndarray                  ... representative inputs used for calibrating the quantization
+    inputs: np.ndarray                              ... (other) samples to evaluate the accuracy on
+    batch_size: int [default: 4096]                 ... batch size for `keras.Sequential.predict`
+
+    ### Outputs:
+
+    dictionary with the maximum and mean absolute deviation to `keras.Sequential.predict` (`max_deviation_to_keras`,
+    `mean_deviation_to_keras`), the maximum deviation relative to the output range of Keras (`max_relative_deviation`),
+    and the size of the weights file in bytes for the float (`weights_bytes_float`) and quantized (`weights_bytes_int8`) export.
+    """
+    reader = keras_to_st_parser(keras_sequential_model, "quantization_report")
+    quantized_reader = int8_quantized_parser(reader, calibration_inputs)
+    emulator = rtnni_emulator(quantized_reader)
+
+    reference_outputs = keras_sequential_model.predict(inputs, batch_size=batch_size, verbose=0)
+    deviations = np.abs(emulator.predict(inputs) - reference_outputs.reshape(-1, reader.output_dim))
+    output_range = np.max(reference_outputs, axis=0) - np.min(reference_outputs, axis=0)
+    return {
+        "max_deviation_to_keras": float(np.max(deviations)),
+        "mean_deviation_to_keras": float(np.mean(deviations)),
+        "max_relative_deviation": float(
+            np.max(np.max(deviations, axis=0) / np.where(output_range > 0, output_range, 1))
+        ),
+        "weights_bytes_float": reader.get_weights_file_size(),
+        "weights_bytes_int8": quantized_reader.get_weights_file_size(),
+    }
+
+
+def get_example_usage(
+    keras_sequential_model: Union["keras.Sequential", str, os.PathLike],
+    plc_model_name: str,
+    nn_data_type: str = "LREAL",
+    time_slice_macs_per_call: int = None,
+    max_batch_size: int = None,
+) -> str:
     """returns a string of example IEC 61131 code to call the generated model."""
-    reader = keras_to_st_parser(keras_sequential_model, plc_model_name)
+    reader = get_model_parser(keras_sequential_model, plc_model_name, nn_data_type=nn_data_type)
     dims_input, dims_output = reader._get_io_dimensions()
 
+    if max_batch_size is not None:
+        writer = ST_writer(plc_model_name, reader, max_batch_size=max_batch_size)
+        buffer_size = writer.get_batch_buffer_size()
+        return f"""The following code can be used to call the generated batched model:
+        Assuming declared inputs/outputs for up to {max_batch_size} samples:
+
+            inputs : ARRAY[0..{max_batch_size-1}, 0..{dims_input-1}] OF {reader.nn_data_type};
+            results : ARRAY[0..{max_batch_size-1}, 0..{dims_output-1}] OF {reader.nn_data_type};
+
+        Then call as (the first `batch_size` rows are evaluated):
+
+            FB_{plc_model_name}_Batch(pointer_input:=ADR(inputs), pointer_output:=ADR(results), batch_size:={max_batch_size});
+
+        FB_{plc_model_name}_Batch contains two layer buffers of {buffer_size} elements each
+        ({2 * buffer_size * struct.calcsize(nn_data_types[reader.nn_data_type])} bytes).
+
+        """
+
+    if time_slice_macs_per_call is not None:
+        num_calls = len(reader.get_time_slices(time_slice_macs_per_call))
+        return f"""The following code can be used to call the generated (time sliced) model:
+        Assuming declared input/output for model:
+
+            input : ARRAY[0..{dims_input-1}] OF {reader.nn_data_type};
+            result : ARRAY[0..{dims_output-1}] OF {reader.nn_data_type};
+
+        Then call as (once per cycle, the input is read in the first of {num_calls} calls per inference):
+
+            FB_{plc_model_name}(pointer_input:=ADR(input), pointer_output:=ADR(result));
+            IF FB_{plc_model_name}.done THEN
+                // result was updated in this cycle
+            END_IF
+
+        """
+
+    temporal_layers = reader.get_temporal_layers()
+    if reader.get_recurrent_layers() or temporal_layers:
+        usage = f"""The following code can be used to call the generated (sequence) model:
+        Assuming declared input/output for one time step and a flag for the start of a sequence:
+
+            input : ARRAY[0..{dims_input-1}] OF {reader.nn_data_type};
+            result : ARRAY[0..{dims_output-1}] OF {reader.nn_data_type};
+            new_sequence : BOOL;
+
+        Then call as (once per time step, the past inputs and the states of the layers persist between the calls):
+
+            FB_{plc_model_name}(pointer_input:=ADR(input), pointer_output:=ADR(result), reset_state:=new_sequence);
+"""
+        if any(layer.kind in temporal_pooling and layer.kind not in global_pooling_kinds for layer in temporal_layers):
+            usage += f"""            IF FB_{plc_model_name}.updated THEN
+                // result was updated in this cycle (the pooling layers complete a window every stride-th time step)
+            END_IF
+"""
+        return usage + "\n        "
+
     return f"""The following code can be used to call the generated model:
         Assuming declared input/output for model:
         
-            input : ARRAY[0..{dims_input-1}] OF LREAL;
-            result : ARRAY[0..{dims_output-1}] OF LREAL;
+            input : ARRAY[0..{dims_input-1}] OF {reader.nn_data_type};
+            result : ARRAY[0..{dims_output-1}] OF {reader.nn_data_type};
 
         Then call as:
 
@@ -0,0 +1,92 @@
+import logging
+from typing import Iterator
+import numpy as np
+
+from nnigen.parse_model import (
+    model_parser,
+    model_parser_stage,
+    activation_or_normalization,
+    get_layer_role,
+    get_recurrent_layer_role,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class normalization_folding_parser(model_parser_stage):
+    """Folds the input normalization and the output denormalization into the first and last dense layer.
+
+    With `x_norm = (x - mean) / std`, the first dense layer `W @ x_norm + b` equals `W' @ x + b'` with
+    `W' = W / std` (column wise) and `b' = b - W @ (mean / std)`. For recurrent models, the normalization is folded into
+    the kernel and the (input) bias of the first recurrent layer the same way.
+    With `y = z * std + mean`, the denormalization of a linear output layer `z = W @ h + b` equals `W'' @ h + b''` with
+    `W'' = W * std` (row wise) and `b'' = b * std + mean`.
+    The generated `FB_<name>` then skips the `F_NormalizationLayer` passes. The denormalization can only be folded if the
+    output layer is linear, otherwise it is kept. The normalization is kept in front of causal convolution and pooling
+    layers, their zero padding of the past refers to the normalized inputs.
+    """
+
+    def __init__(self, parser: model_parser):
+        """normalization_folding_parser __init__
+
+        ### Inputs:
+
+        parser: `model_parser`              ... parser of the float model (not quantized)
+        """
+        if parser.quantized:
+            raise ValueError("Normalization has to be folded before quantization.")
+        if parser.get_sparse_layers():
+            raise ValueError("Normalization has to be folded before the sparse layers are compressed.")
+
+        layer_table = parser.get_layer_table()
+        fold_normalization = parser.has_normalization and not parser.get_temporal_layers()
+        if parser.has_normalization and not fold_normalization:
+            logger.warning(
+                f"Normalization of '{parser.model_name}' is not folded: "
+                + "the model starts with convolution or pooling layers."
+            )
+        fold_denormalization = parser.has_denormalization and layer_table[-1][2] == activation_or_normalization.linear
+        if parser.has_denormalization and not fold_denormalization:
+            logger.warning(
+                f"Denormalization of '{parser.model_name}' is not folded: "
+                + f"the output layer has the non-linear activation '{layer_table[-1][2].value}'."
+            )
+
+        super(normalization_folding_parser, self).__init__(
+            parser,
+            has_normalization=parser.has_normalization and not fold_normalization,
+            has_denormalization=parser.has_denormalization and not fold_denormalization,
+        )
+        self.folded_weights = self._fold(parser.get_weights(), fold_normalization, fold_denormalization)
+
+    def _iter_weights(self) -> Iterator[np.ndarray]:
+        for member_name, _, _ in self.get_weights_layout():
+            yield self.folded_weights[member_name]
+
+    def _fold(self, weights: dict, fold_normalization: bool, fold_denormalization: bool) -> dict:
+        """returns the weights of the parser with the (de)normalization folded into the dense layers."""
+        weights = {member_name: np.array(values, dtype=np.float64) for member_name, values in weights.items()}
+        num_dense_layers = len(self.get_layer_table())
+        if self.get_recurrent_layers():  # the normalized inputs enter the first recurrent layer
+            first_layer_role = get_recurrent_layer_role(1)
+            first_weight = f"{first_layer_role}_kernel"
+        else:
+            first_layer_role = get_layer_role(1, num_dense_layers)
+            first_weight = f"{first_layer_role}_weight"
+        output_layer_role = get_layer_role(num_dense_layers, num_dense_layers)
+
+        if fold_normalization:
+            mean, std = weights["normalization_mean"], weights["normalization_std"]
+            if np.any(std == 0):
+                raise RuntimeError("Input normalization with a standard deviation of zero can not be folded.")
+            weight = weights[first_weight]
+            weights[f"{first_layer_role}_bias"] = weights[f"{first_layer_role}_bias"] - weight @ (mean / std)
+            weights[first_weight] = weight / std[np.newaxis, :]
+            weights["normalization_mean"], weights["normalization_std"] = np.zeros(1), np.zeros(1)
+
+        if fold_denormalization:
+            mean, std = weights["denormalization_mean"], weights["denormalization_std"]
+            weights[f"{output_layer_role}_weight"] = weights[f"{output_layer_role}_weight"] * std[:, np.newaxis]
+            weights[f"{output_layer_role}_bias"] = weights[f"{output_layer_role}_bias"] * std + mean
+            weights["denormalization_mean"], weights["denormalization_std"] = np.zeros(1), np.zeros(1)
+        return weights
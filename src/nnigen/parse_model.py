@@ -1,5 +1,5 @@
-from typing import Tuple
-import keras
+from typing import Tuple, Iterator, BinaryIO, NamedTuple, TYPE_CHECKING
+import io
 import struct
 import numpy as np
 import re
@@ -7,6 +7,11 @@ import hashlib
 from abc import ABC, abstractmethod
 from enum import Enum
 
+from nnigen.cost_model import get_calibration, format_cost_report, LAYER_STRUCT_SIZES
+
+if TYPE_CHECKING:  # Keras is only imported, when a Keras model is parsed (see `nnigen.keras_archive` otherwise)
+    import keras
+
 
 def clean_indentation(s: str, indent_str: str = "    "):
     """clears all spaces before rach line in `s` and indents each line with `indent_str` afterwards.
@@ -15,6 +20,10 @@ def clean_indentation(s: str, indent_str: str = "    "):
     return re.sub(r"^\s*", indent_str, s, flags=re.MULTILINE)
 
 
+HASH_NUM_BYTES = 32
+""" number of bytes of the SHA-256 hash at the end of each weights file"""
+
+
 def get_bytes_hash(binary_weights: bytes) -> bytes:
     """returns a sha256 hash for a given sequence of bytes."""
     m = hashlib.sha256()
@@ -23,6 +32,44 @@ def get_bytes_hash(binary_weights: bytes) -> bytes:
     return hash_sha_1
 
 
+def get_layer_role(layer_counter: int, num_dense_layers: int) -> str:
+    """returns the name prefix of a dense layer's members in the `LayerWeights` struct (`layer_counter` starts at 1)."""
+    return "OutputLayer" if layer_counter == num_dense_layers else f"HiddenLayers{layer_counter}"
+
+
+def get_recurrent_layer_role(layer_counter: int) -> str:
+    """returns the name prefix of a recurrent layer's members in the `LayerWeights` struct (`layer_counter` starts at 1)."""
+    return f"RecurrentLayer{layer_counter}"
+
+
+def get_temporal_layer_role(layer_counter: int) -> str:
+    """returns the name prefix of a convolution layer's members in the `LayerWeights` struct (`layer_counter` starts
+    at 1 and counts the pooling layers as well)."""
+    return f"TemporalLayer{layer_counter}"
+
+
+nn_data_types = {"LREAL": "d", "REAL": "f"}
+""" supported floating point types on the PLC and their `struct` format characters for the weights file"""
+
+plc_data_types = {**nn_data_types, "SINT": "b", "BYTE": "B", "UINT": "H", "DINT": "i", "UDINT": "I"}
+""" `struct` format characters of all PLC data types used in the `LayerWeights` struct"""
+
+rtnni_type_suffixes = {"LREAL": "", "REAL": "_REAL"}
+""" name suffixes of the RTNNI data types and functions for each supported floating point type"""
+
+
+def pad_weights_layout(layout: list, alignment: int = 8, member_name: str = "padding") -> list:
+    """appends a BYTE `padding` member to a weights layout, such that its size is a multiple of `alignment` bytes.
+
+    The FB hashes the first `SIZEOF(nn.weights)-32` bytes, so the struct must not end with implicit padding after the
+    hash. This is needed as soon as the layout contains members smaller than the largest (8-byte aligned) member."""
+    num_bytes = sum(int(np.prod(shape)) * struct.calcsize(plc_data_types[data_type]) for _, shape, data_type in layout)
+    padding = -num_bytes % alignment
+    if padding:
+        layout = layout + [(member_name, (padding,), "BYTE")]
+    return layout
+
+
 class activation_or_normalization(str, Enum):
     """ helper class for framework independent layer type (based on keras types)"""
     linear = "linear"
@@ -38,13 +85,117 @@ class activation_or_normalization(str, Enum):
     denormalization = "denormalization"
 
 
+class layer_kind(str, Enum):
+    """ layer types of the framework independent intermediate representation (`model_ir`)"""
+    dense = "dense"
+    normalization = "normalization"
+    dropout = "dropout"
+    lstm = "lstm"
+    gru = "gru"
+    conv1d = "conv1d"
+    max_pooling1d = "max_pooling1d"
+    average_pooling1d = "average_pooling1d"
+    global_max_pooling1d = "global_max_pooling1d"
+    global_average_pooling1d = "global_average_pooling1d"
+    unsupported = "unsupported"
+
+
+class ir_layer(NamedTuple):
+    """ one layer of the intermediate representation"""
+    kind: layer_kind
+    name: str
+    num_neurons: int
+    """ number of outputs (channels) of the layer (0 for dropout, pooling and unsupported layers)"""
+    activation: activation_or_normalization
+    """ activation function of dense, recurrent and convolution layers, `None` otherwise"""
+    weights: Tuple[np.ndarray, ...]
+    """ dense: weight matrix of shape `(num_neurons, num_inputs)` and bias, normalization: mean and standard deviation,
+    recurrent: kernel `(num_gates * num_neurons, num_inputs)`, recurrent kernel `(num_gates * num_neurons, num_neurons)`
+    and bias (GRU: input and recurrent bias), rows in the Keras gate order (see `recurrent_gates`), convolution: kernel
+    `(num_neurons, window * num_inputs)` with the kernel taps of a filter in time order and bias"""
+    recurrent_activation: activation_or_normalization = None
+    """ activation function of the gates of recurrent layers, `None` otherwise"""
+    return_sequences: bool = False
+    """ whether a recurrent layer returns its output for each time step (or for the last one only)"""
+    window: int = 0
+    """ kernel size of convolution layers, pool size of pooling layers (0 for global pooling)"""
+    dilation: int = 1
+    """ time steps between the kernel taps of convolution layers"""
+    stride: int = 1
+    """ time steps between the windows of pooling layers"""
+
+
+recurrent_gates = {layer_kind.lstm: 4, layer_kind.gru: 3}
+""" number of gates of the recurrent layers (LSTM: i, f, c, o, GRU: z, r, h), each with one row per unit"""
+
+recurrent_state_sizes = {layer_kind.lstm: 2, layer_kind.gru: 1}
+""" size of the persistent state per unit (LSTM: hidden and cell state, GRU: hidden state)"""
+
+recurrent_buffer_sizes = {layer_kind.lstm: 4, layer_kind.gru: 6}
+""" size of the gates buffer of `F_LSTMCell` and `F_GRUCell` per unit"""
+
+
+class recurrent_layer(NamedTuple):
+    """ one recurrent layer in front of the dense layers (see `model_parser.get_recurrent_layers`)"""
+    kind: layer_kind
+    num_inputs: int
+    num_units: int
+    activation: activation_or_normalization
+    recurrent_activation: activation_or_normalization
+    return_sequences: bool
+
+
+temporal_pooling = {
+    layer_kind.max_pooling1d: False,
+    layer_kind.average_pooling1d: True,
+    layer_kind.global_max_pooling1d: False,
+    layer_kind.global_average_pooling1d: True,
+}
+""" pooling layers over time (`F_Pooling1D`, global: `F_GlobalPooling1D`) and whether they average the inputs"""
+
+temporal_layer_kinds = (layer_kind.conv1d, *temporal_pooling)
+""" causal convolution and pooling layers, which are evaluated for the newest time step only"""
+
+global_pooling_kinds = (layer_kind.global_max_pooling1d, layer_kind.global_average_pooling1d)
+""" pooling layers over all time steps since the reset, their output is no sequence"""
+
+
+class temporal_layer(NamedTuple):
+    """ one causal convolution or pooling layer in front of the recurrent and dense layers (see
+    `model_parser.get_temporal_layers`)"""
+    kind: layer_kind
+    num_inputs: int
+    num_outputs: int
+    window: int
+    dilation: int
+    stride: int
+    activation: activation_or_normalization
+
+
+def get_temporal_history_length(layer: temporal_layer) -> int:
+    """returns the number of past inputs in the ring buffer of a temporal layer (global pooling: 1 for the running sum
+    or maximum)."""
+    if layer.kind == layer_kind.conv1d:
+        return (layer.window - 1) * layer.dilation + 1
+    return max(layer.window, 1)
+
+
+class model_ir(NamedTuple):
+    """ framework independent intermediate representation of a sequential model, extracted once from the model.
+
+    The generators and the weights writer only query the IR (see `ir_parser`)."""
+    input_dim: int
+    output_dim: int
+    layers: Tuple[ir_layer, ...]
+
+
 class model_parser(ABC):
     """Base class to parse dense forward model to general API.
     
     Concrete implementation requires an implementation of the following methods in the subclass for the specific model type:
 
     ```
-    _get_all_weights_flattened(self)
+    _iter_weights(self) -> Iterator[np.ndarray]
     _get_num_layers(self) -> int
     _get_num_dense_layers(self) -> int
     _get_num_neurons(self, layer_num: int) -> int
@@ -56,19 +207,29 @@ class model_parser(ABC):
      
     """
 
+    quantized = False
+    """ whether the weights are quantized (see `nnigen.quantize`), which requires the quantized RTNNI kernels"""
+
+    weights_chunk_size = None
+    """ number of bytes loaded and verified per cycle on the PLC (see `nnigen.chunking`), `None` loads all at once"""
+
     def __init__(
         self,
         unique_model_name: str,
         has_normalization: bool,
         has_denormalization: bool,
+        nn_data_type: str = "LREAL",
     ):
 
         if not self._all_layers_dense_or_normalization():
             raise RuntimeError(
-                "Model is invalid for nnigen. For now, only dense layers and normalization of inputs and outputs is allowed."
+                "Model is invalid for nnigen. For now, only dense layers (after causal Conv1D and pooling layers and "
+                + "LSTM or GRU layers) and normalization of inputs and outputs is allowed."
             )
+        if nn_data_type not in nn_data_types:
+            raise ValueError(f"Data type '{nn_data_type}' is not supported. Use one of {list(nn_data_types)}.")
 
-        self.nn_data_type = "LREAL"
+        self.nn_data_type = nn_data_type
         self.model_name = unique_model_name
         input_dim, output_dim = self._get_io_dimensions()
         self.input_dim = input_dim
@@ -77,8 +238,10 @@ class model_parser(ABC):
         self.has_denormalization = has_denormalization
 
     @abstractmethod
-    def _get_all_weights_flattened(self):
-        """returns a sequence of all network weights, matrices are flattened. This is used for weights serialization."""
+    def _iter_weights(self) -> Iterator[np.ndarray]:
+        """yields the network weights as arrays, one per member of `get_weights_layout` and in the same order.
+
+        This is used for weights serialization. Arrays must be reshapeable to the shape of the member (row-major)."""
         pass
 
     @abstractmethod
@@ -116,207 +279,828 @@ class model_parser(ABC):
         """checks whether all layers are dense layers, normalization layers, or dropout layers"""
         pass
 
+    def write_weights_binary(self, f: BinaryIO) -> bytes:
+        """Streams all network weights in the binary format to the file object `f` and returns the SHA-256 hash.
+
+        Each array is converted to the little endian PLC data type (one copy at most) and its buffer is written directly.
+        The hash is updated incrementally and appended at the end. Peak memory stays at about one layer."""
+        m = hashlib.sha256()
+        for (member_name, shape, data_type), values in zip(self.get_weights_layout(), self._iter_weights()):
+            buffer = np.ascontiguousarray(values, dtype="<" + plc_data_types[data_type])
+            if buffer.size != int(np.prod(shape)):
+                raise RuntimeError(f"Weights of '{member_name}' have {buffer.size} values, expected shape {shape}.")
+            m.update(buffer)
+            f.write(buffer)
+
+        hash_sha_256 = m.digest()
+        f.write(hash_sha_256)
+        return hash_sha_256
+
     def pack_weights_binary(self) -> bytes:
         """Packs all network weights to a binary format."""
-        all_weights = self._get_all_weights_flattened()
+        f = io.BytesIO()
+        self.write_weights_binary(f)
+        return f.getvalue()
+
+    def get_weights_file_size(self) -> int:
+        """returns the size of the binary weights in bytes (including the hash)."""
+        return HASH_NUM_BYTES + sum(
+            int(np.prod(shape)) * struct.calcsize(plc_data_types[data_type])
+            for _, shape, data_type in self.get_weights_layout()
+        )
+
+    def get_weights(self) -> dict:
+        """returns the network weights as `np.ndarray` for each member of the `LayerWeights` struct (see `get_weights_layout`)."""
+        return {
+            member_name: np.asarray(values).reshape(shape)
+            for (member_name, shape, _), values in zip(self.get_weights_layout(), self._iter_weights())
+        }
+
+    def get_sparse_layers(self) -> set:
+        """returns the layer counters (starting at 1, see `get_layer_table`) of the dense layers stored in the compressed
+        row format (see `nnigen.sparse`). Without a sparse stage, all layers are stored as dense matrices."""
+        return set()
+
+    def get_approximated_layers(self) -> set:
+        """returns the layer counters (starting at 1, see `get_layer_table`) of the dense layers whose activation function
+        is approximated by a table (see `nnigen.approximation`). Without an approximation stage, all are exact."""
+        return set()
+
+    def get_recurrent_layers(self) -> list:
+        """returns one `recurrent_layer` per LSTM or GRU layer in front of the dense layers.
+
+        The generated `FB_<name>` advances the recurrent layers by one time step per call and keeps their states between
+        the calls, the dense layers are evaluated on the hidden state of the last recurrent layer. Without recurrent
+        layers, each call evaluates one independent sample."""
+        return []
+
+    def get_temporal_layers(self) -> list:
+        """returns one `temporal_layer` per causal convolution or pooling layer in front of the recurrent and dense
+        layers.
+
+        The generated `FB_<name>` keeps the past inputs of each layer in a ring buffer and evaluates only the newest
+        output position per call (see `get_temporal_history_length`). Pooling layers with a window complete an output
+        every `stride` calls only, the following layers are evaluated in these calls."""
+        return []
+
+    def get_layer_table(self) -> list:
+        """returns one `(num_inputs, num_neurons, activation)` tuple per dense layer in the order of the `Layers` struct.
+
+        Dropout and normalization layers are skipped, the last entry is the output layer. The first dense layer gets the
+        hidden state of the last recurrent layer (or the output of the last temporal layer) as input, if there are
+        recurrent (or temporal) layers."""
+        layer_table = []
+        recurrent_layers, temporal_layers = self.get_recurrent_layers(), self.get_temporal_layers()
+        if recurrent_layers:
+            num_inputs = recurrent_layers[-1].num_units
+        elif temporal_layers:
+            num_inputs = temporal_layers[-1].num_outputs
+        else:
+            num_inputs = self.input_dim
+        for layer_num in range(self._get_num_layers()):
+            if self._is_layer_dense_layer(layer_num):
+                num_neurons = self._get_num_neurons(layer_num)
+                layer_table.append((num_inputs, num_neurons, self._get_activation_type(layer_num)))
+                num_inputs = num_neurons
+        return layer_table
+
+    def _get_row_macs(self, layer_counter: int) -> np.ndarray:
+        """returns the number of multiply-accumulates of each neuron (row) of a dense layer (`layer_counter` starts at 1)."""
+        num_inputs, num_neurons, _ = self.get_layer_table()[layer_counter - 1]
+        return np.full(num_neurons, num_inputs)
+
+    def get_time_slices(self, macs_per_call: int) -> list:
+        """splits the forward pass into slices of at most `macs_per_call` multiply-accumulates (one slice per FB call).
+
+        Each slice is a list of `(layer_counter, first_neuron, end_neuron)` segments (`end_neuron` exclusive).
+        Consecutive layers share a slice as long as the budget allows, otherwise a layer is split between its neurons.
+        A single neuron exceeding the budget gets a slice of its own."""
+        if macs_per_call < 1:
+            raise ValueError(f"The MAC budget per call must be positive, got {macs_per_call}.")
+        if self.get_recurrent_layers() or self.get_temporal_layers():
+            raise ValueError("Time sliced inference is not available for recurrent, convolution and pooling layers.")
+
+        slices, segments, budget = [], [], macs_per_call
+        for layer_counter in range(1, len(self.get_layer_table()) + 1):
+            row_macs = self._get_row_macs(layer_counter)
+            row = 0
+            while row < len(row_macs):
+                cumulated_macs = np.cumsum(row_macs[row:])
+                end = row + int(np.searchsorted(cumulated_macs, budget, side="right"))
+                if end == row:
+                    if segments:  # the slice is full, continue the layer in the next one
+                        slices.append(segments)
+                        segments, budget = [], macs_per_call
+                        continue
+                    end = row + 1
+                segments.append((layer_counter, row, end))
+                budget -= int(cumulated_macs[end - row - 1])
+                row = end
+        if segments:
+            slices.append(segments)
+        return slices
+
+    def get_weights_layout(self) -> list:
+        """returns a `(member_name, shape, data_type)` tuple for each member of the `LayerWeights` struct (without the hash).
+
+        The order is the serialization order of `pack_weights_binary`, `data_type` is the PLC data type. Weight matrices
+        have the shape `(num_neurons, num_inputs)`, i.e. they are stored row-major with one row per neuron. The kernels of
+        convolution layers (one row per filter) and recurrent layers (one row per gate and unit) follow after the
+        normalization."""
+        norm_dim = self.input_dim if self.has_normalization else 1
+        denorm_dim = self.output_dim if self.has_denormalization else 1
+
+        layout = [("normalization_mean", (norm_dim,)), ("normalization_std", (norm_dim,))]
+        for layer_counter, layer in enumerate(self.get_temporal_layers(), start=1):
+            if layer.kind == layer_kind.conv1d:
+                layer_role = get_temporal_layer_role(layer_counter)
+                layout.append((f"{layer_role}_kernel", (layer.num_outputs, layer.window * layer.num_inputs)))
+                layout.append((f"{layer_role}_bias", (layer.num_outputs,)))
+        for layer_counter, layer in enumerate(self.get_recurrent_layers(), start=1):
+            layer_role = get_recurrent_layer_role(layer_counter)
+            num_rows = recurrent_gates[layer.kind] * layer.num_units
+            layout.append((f"{layer_role}_kernel", (num_rows, layer.num_inputs)))
+            layout.append((f"{layer_role}_recurrent_kernel", (num_rows, layer.num_units)))
+            layout.append((f"{layer_role}_bias", (num_rows,)))
+            if layer.kind == layer_kind.gru:
+                layout.append((f"{layer_role}_recurrent_bias", (num_rows,)))
+        layer_table = self.get_layer_table()
+        for layer_counter, (num_inputs, num_neurons, _) in enumerate(layer_table, start=1):
+            layer_role = get_layer_role(layer_counter, len(layer_table))
+            layout.append((f"{layer_role}_weight", (num_neurons, num_inputs)))
+            layout.append((f"{layer_role}_bias", (num_neurons,)))
+        layout += [("denormalization_mean", (denorm_dim,)), ("denormalization_std", (denorm_dim,))]
+        return [(member_name, shape, self.nn_data_type) for member_name, shape in layout]
+
+    def _get_layer_buffer_size(self) -> int:
+        """returns the size of the two layer buffers of the `Layers` struct."""
+        # the layers alternate between two buffers, the output layer writes to the output of the FB directly
+        # and the (normalized) input is only buffered if there is an input normalization
+        buffer_dims = [num_neurons for _, num_neurons, _ in self.get_layer_table()[:-1]]
+        if self.has_normalization:
+            buffer_dims.append(self.input_dim)
+        return max(buffer_dims, default=1)
+
+    def get_cost_report(
+        self, target="generic_x64", specialized: bool = False, time_slice_macs_per_call: int = None
+    ) -> dict:
+        """static estimate of the computational cost and memory of the exported network.
+
+        ### Inputs:
+
+        target [default: "generic_x64"]     ... name of a calibration table in `nnigen.cost_model.cost_calibrations`
+                                                or a dictionary with the same keys
+        specialized: bool [default: False]  ... whether the FB is generated in specialized mode (no per neuron dispatch)
+        time_slice_macs_per_call: int [default: None] ... MAC budget per call of a time sliced FB (see `get_time_slices`)
+
+        ### Outputs:
+
+        dictionary with the list `layers` (per temporal, recurrent and dense layer: `layer`, `num_inputs`,
+        `num_neurons`, `activation`, `macs`, `activation_evaluations`, `bytes_touched`, `estimated_time_us`, temporal and
+        recurrent layers per time step, recurrent layers with the activation `<activation>/<recurrent_activation>`) and
+        the dictionary `total` (`macs`,
+        `activation_evaluations` by type, `bytes_touched`, `weights_struct_bytes`, `layers_struct_bytes`,
+        `estimated_time_us`). For a time sliced FB, `total` also contains `num_calls` and the longest call
+        `estimated_time_per_call_us`.
+        """
+        calibration = get_calibration(target)
+        layer_table = self.get_layer_table()
+        weights_layout = self.get_weights_layout()
+        member_bytes = {
+            member_name: int(np.prod(shape)) * struct.calcsize(plc_data_types[data_type])
+            for member_name, shape, data_type in weights_layout
+        }
+        member_shapes = {member_name: shape for member_name, shape, _ in weights_layout}
+        sparse_layers = self.get_sparse_layers()
+        approximated_layers = self.get_approximated_layers()
+        mac_data_type = "SINT" if self.quantized else self.nn_data_type
+        value_bytes = struct.calcsize(plc_data_types[self.nn_data_type])
+
+        # the newest output position of `F_Conv1D` (one dot product per filter and kernel tap) or of a pooling layer
+        temporal_layers = []
+        for layer_counter, layer in enumerate(self.get_temporal_layers(), start=1):
+            layer_role = get_temporal_layer_role(layer_counter)
+            activation = layer.activation if layer.kind == layer_kind.conv1d else activation_or_normalization.linear
+            if layer.kind == layer_kind.conv1d:
+                macs, num_reads = layer.num_outputs * layer.window * layer.num_inputs, layer.window * layer.num_inputs
+            else:  # one addition or comparison per input in the window
+                macs, num_reads = 0, max(layer.window, 1) * layer.num_inputs
+            activation_evaluations = 0 if activation == activation_or_normalization.linear else layer.num_outputs
+            bytes_touched = (layer.num_inputs + num_reads + layer.num_outputs) * value_bytes + sum(
+                num_bytes for member_name, num_bytes in member_bytes.items() if member_name.startswith(f"{layer_role}_")
+            )
+            time_ns = (
+                calibration["layer_overhead_ns"]
+                + (macs or num_reads) * calibration["mac_ns"][self.nn_data_type]
+                + layer.num_outputs * calibration["neuron_overhead_ns"]
+                + activation_evaluations * calibration["activation_ns"][activation.value]
+                + bytes_touched * calibration["byte_ns"]
+            )
+            temporal_layers.append(
+                {
+                    "layer": layer_role,
+                    "num_inputs": layer.num_inputs,
+                    "num_neurons": layer.num_outputs,
+                    "activation": activation.value,
+                    "macs": macs,
+                    "activation_evaluations": activation_evaluations,
+                    "bytes_touched": bytes_touched,
+                    "estimated_time_us": time_ns / 1000,
+                }
+            )
+
+        # one time step of `F_LSTMCell` or `F_GRUCell`, one dot product per gate and unit
+        recurrent_layers, recurrent_activation_evaluations = [], {}
+        for layer_counter, layer in enumerate(self.get_recurrent_layers(), start=1):
+            layer_role = get_recurrent_layer_role(layer_counter)
+            num_rows = recurrent_gates[layer.kind] * layer.num_units
+            macs = num_rows * (layer.num_inputs + layer.num_units)
+            activation_evaluations = {
+                layer.recurrent_activation.value: (recurrent_gates[layer.kind] - 1) * layer.num_units,
+                layer.activation.value: recurrent_state_sizes[layer.kind] * layer.num_units,
+            }
+            if layer.activation == layer.recurrent_activation:
+                activation_evaluations = {layer.activation.value: sum(activation_evaluations.values())}
+            bytes_touched = (
+                layer.num_inputs
+                + (recurrent_buffer_sizes[layer.kind] + 2 * recurrent_state_sizes[layer.kind]) * layer.num_units
+            ) * value_bytes + sum(
+                num_bytes for member_name, num_bytes in member_bytes.items() if member_name.startswith(f"{layer_role}_")
+            )
+            time_ns = (
+                calibration["layer_overhead_ns"]
+                + macs * calibration["mac_ns"][self.nn_data_type]
+                + num_rows * calibration["neuron_overhead_ns"]
+                + sum(
+                    num_evaluations * calibration["activation_ns"][activation]
+                    for activation, num_evaluations in activation_evaluations.items()
+                )
+                + bytes_touched * calibration["byte_ns"]
+            )
+            for activation, num_evaluations in activation_evaluations.items():
+                if activation != activation_or_normalization.linear.value:
+                    recurrent_activation_evaluations[activation] = (
+                        recurrent_activation_evaluations.get(activation, 0) + num_evaluations
+                    )
+
+            recurrent_layers.append(
+                {
+                    "layer": layer_role,
+                    "num_inputs": layer.num_inputs,
+                    "num_neurons": layer.num_units,
+                    "activation": f"{layer.activation.value}/{layer.recurrent_activation.value}",
+                    "macs": macs,
+                    "activation_evaluations": sum(activation_evaluations.values()),
+                    "bytes_touched": bytes_touched,
+                    "estimated_time_us": time_ns / 1000,
+                }
+            )
+
+        layers = []
+        for layer_counter, (num_inputs, num_neurons, activation) in enumerate(layer_table, start=1):
+            layer_role = get_layer_role(layer_counter, len(layer_table))
+            if layer_counter in sparse_layers:  # one multiply-accumulate per stored (nonzero) weight
+                macs = member_shapes[f"{layer_role}_values"][0]
+            else:
+                macs = num_inputs * num_neurons
+            activation_evaluations = 0 if activation == activation_or_normalization.linear else num_neurons
+            bytes_touched = (num_inputs + num_neurons) * value_bytes + sum(
+                num_bytes for member_name, num_bytes in member_bytes.items() if member_name.startswith(f"{layer_role}_")
+            )
+
+            if layer_counter in approximated_layers:
+                activation_ns = calibration["activation_table_ns"]
+            else:
+                activation_ns = calibration["activation_ns"][activation.value]
+            time_ns = (
+                calibration["layer_overhead_ns"]
+                + macs * calibration["mac_ns"][mac_data_type]
+                + num_neurons * activation_ns
+                + bytes_touched * calibration["byte_ns"]
+            )
+            if not specialized:
+                time_ns += num_neurons * calibration["neuron_overhead_ns"]
+            if self.quantized:
+                time_ns += num_inputs * calibration["quantization_ns"]
+            if layer_counter in sparse_layers:
+                time_ns += macs * calibration["sparse_index_ns"]
+
+            layers.append(
+                {
+                    "layer": layer_role,
+                    "num_inputs": num_inputs,
+                    "num_neurons": num_neurons,
+                    "activation": activation.value,
+                    "macs": macs,
+                    "activation_evaluations": activation_evaluations,
+                    "bytes_touched": bytes_touched,
+                    "estimated_time_us": time_ns / 1000,
+                }
+            )
+
+        num_normalized = self.input_dim * int(self.has_normalization) + self.output_dim * int(self.has_denormalization)
+        activation_evaluations = dict(recurrent_activation_evaluations)
+        for layer in temporal_layers + layers:
+            if layer["activation_evaluations"]:
+                activation_evaluations[layer["activation"]] = (
+                    activation_evaluations.get(layer["activation"], 0) + layer["activation_evaluations"]
+                )
+
+        weights_struct_bytes = self.get_weights_file_size()
+        layers_struct_bytes = (
+            weights_struct_bytes
+            + (len(layer_table) + 1) * LAYER_STRUCT_SIZES["INT8" if self.quantized else self.nn_data_type]
+            + 2 * self._get_layer_buffer_size() * value_bytes
+        )
+        if self.quantized:
+            layers_struct_bytes += max(num_inputs for num_inputs, _, _ in layer_table)
+        if sparse_layers:
+            layers_struct_bytes += (len(layer_table) + 1) * LAYER_STRUCT_SIZES["CSR"]
+        layers_struct_bytes += len(recurrent_layers) * LAYER_STRUCT_SIZES["RECURRENT"]
+        layers_struct_bytes += len(temporal_layers) * LAYER_STRUCT_SIZES["TEMPORAL"]
+
+        all_layers = temporal_layers + recurrent_layers + layers
+        total = {
+            "macs": sum(layer["macs"] for layer in all_layers),
+            "activation_evaluations": activation_evaluations,
+            "bytes_touched": sum(layer["bytes_touched"] for layer in all_layers) + 3 * num_normalized * value_bytes,
+            "weights_struct_bytes": weights_struct_bytes,
+            "layers_struct_bytes": layers_struct_bytes,
+            "estimated_time_us": sum(layer["estimated_time_us"] for layer in all_layers)
+            + num_normalized * calibration["normalization_ns"] / 1000,
+        }
+        if time_slice_macs_per_call is not None:
+            # each segment takes the share of its layer's time, which corresponds to its neurons
+            slices = self.get_time_slices(time_slice_macs_per_call)
+            slice_times_us = [
+                sum(
+                    layers[layer_counter - 1]["estimated_time_us"] * (end_neuron - first_neuron) / num_neurons
+                    for layer_counter, first_neuron, end_neuron in segments
+                    for num_neurons in [layer_table[layer_counter - 1][1]]
+                )
+                for segments in slices
+            ]
+            slice_times_us[0] += self.input_dim * int(self.has_normalization) * calibration["normalization_ns"] / 1000
+            slice_times_us[-1] += (
+                self.output_dim * int(self.has_denormalization) * calibration["normalization_ns"] / 1000
+            )
+            total["num_calls"] = len(slices)
+            total["estimated_time_per_call_us"] = max(slice_times_us)
+        return {"layers": all_layers, "total": total}
+
+    def check_cost_budget(
+        self,
+        cycle_time_budget_us: float = None,
+        memory_budget_bytes: int = None,
+        target="generic_x64",
+        specialized: bool = False,
+        time_slice_macs_per_call: int = None,
+    ) -> dict:
+        """raises a `RuntimeError` if the estimated execution time or memory (see `get_cost_report`) exceed a budget.
+
+        ### Inputs:
+
+        cycle_time_budget_us: float [default: None]  ... maximum estimated execution time per call in µs (None: unchecked)
+        memory_budget_bytes: int [default: None]     ... maximum size of the `Layers` struct in bytes (None: unchecked)
+        target, specialized, time_slice_macs_per_call ... see `get_cost_report`
+
+        ### Outputs:
 
-        layer_format = "d" * len(all_weights)
-        binary_weights = struct.pack(layer_format, *all_weights)
-        binary_weights += get_bytes_hash(binary_weights)
-        return binary_weights
+        the cost report, if the budgets are met
+        """
+        report = self.get_cost_report(
+            target=target, specialized=specialized, time_slice_macs_per_call=time_slice_macs_per_call
+        )
+        total = report["total"]
+        time_per_call_us = total.get("estimated_time_per_call_us", total["estimated_time_us"])
+
+        violations = []
+        if cycle_time_budget_us is not None and time_per_call_us > cycle_time_budget_us:
+            violations.append(
+                f"estimated execution time {time_per_call_us:.1f} µs per call exceeds the budget of {cycle_time_budget_us} µs"
+            )
+        if memory_budget_bytes is not None and total["layers_struct_bytes"] > memory_budget_bytes:
+            violations.append(
+                f"memory of {total['layers_struct_bytes']} bytes exceeds the budget of {memory_budget_bytes} bytes"
+            )
+        if violations:
+            raise RuntimeError(
+                f"Model '{self.model_name}' does not fit the budget: " + "; ".join(violations) + "\n"
+                + format_cost_report(report)
+            )
+        return report
 
     def generate_struct_layers(self) -> str:
         """
         generate the text which is used to define the layers in the struct Layers
         """
-
-        num_model_layers = self._get_num_layers()
-        num_dense_layers = self._get_num__dense_layers()
+        layer_table = self.get_layer_table()
 
         context = f"""
-                    num_layers : UINT := {num_dense_layers+1};
+                    num_layers : UINT := {len(layer_table)+1};
                     weights : {self.model_name}_LayerWeights;
-                    layers : ARRAY[0..{num_dense_layers}] OF Layer :=[
-                    (num_neurons := {self.input_dim}),
+                    layers : ARRAY[0..{len(layer_table)}] OF Layer{rtnni_type_suffixes[self.nn_data_type]} :=[
+                    (num_neurons := {layer_table[0][0]}),
                    """
 
-        max_num_neurons = self.output_dim
-
         layers_init = []
-        layers_counter = 1
-        for layer_num in range(int(self.has_normalization) , num_model_layers - int(self.has_denormalization) +1):
-            if self._is_layer_dense_layer(layer_num):
-                if layer_num == num_model_layers - int(self.has_denormalization) - int(not self.has_normalization):
-                    layers_init.append(
-                        f"(num_neurons := {self.output_dim}, activation := act_type.{self._get_activation_type(layer_num).value}, pointer_weight:= ADR(weights.OutputLayer_weight),pointer_bias:= ADR(weights.OutputLayer_bias))"
-                    )
-                else:
-                    layers_init.append(
-                        f"""(num_neurons := {self._get_num_neurons(layer_num)}, activation := act_type.{self._get_activation_type(layer_num).value}, pointer_weight:= ADR(weights.HiddenLayers{layers_counter}_weight),pointer_bias:= ADR(weights.HiddenLayers{layers_counter}_bias)),"""
-                    )
-                    if self._get_num_neurons(layer_num) > max_num_neurons:
-                        max_num_neurons = self._get_num_neurons(layer_num)
-                    layers_counter += 1
+        for layer_counter, (_, num_neurons, activation) in enumerate(layer_table, start=1):
+            layer_role = get_layer_role(layer_counter, len(layer_table))
+            layers_init.append(
+                f"(num_neurons := {num_neurons}, activation := act_type.{activation.value}, pointer_weight:= ADR(weights.{layer_role}_weight),pointer_bias:= ADR(weights.{layer_role}_bias))"
+            )
+        buffer_size = self._get_layer_buffer_size()
 
-        context += "\n".join(layers_init)
+        context += ",\n".join(layers_init)
         context += "];\n"
+        context += self._generate_struct_temporal_layers() + self._generate_struct_recurrent_layers()
         context = (
             context
-            + f"layer_output : ARRAY[0..{max_num_neurons-1}] OF LREAL;\nlayer_input : ARRAY[0..{max_num_neurons-1}] OF {self.nn_data_type};\n"
+            + f"layer_buffer_a : ARRAY[0..{buffer_size-1}] OF {self.nn_data_type};\nlayer_buffer_b : ARRAY[0..{buffer_size-1}] OF {self.nn_data_type};\n"
         )
         return clean_indentation(context)
 
+    def _generate_struct_temporal_layers(self) -> str:
+        """returns the declaration of the `temporal_layers` array of the `Layers` struct (empty without such layers)."""
+        temporal_layers = self.get_temporal_layers()
+        if not temporal_layers:
+            return ""
+
+        layers_init = []
+        for layer_counter, layer in enumerate(temporal_layers, start=1):
+            layer_init = f"(num_inputs := {layer.num_inputs}, num_outputs := {layer.num_outputs}, window := {layer.window}, dilation := {layer.dilation}, stride := {layer.stride}"
+            if layer.kind == layer_kind.conv1d:
+                layer_role = get_temporal_layer_role(layer_counter)
+                layer_init += f", activation := act_type.{layer.activation.value}, pointer_kernel:= ADR(weights.{layer_role}_kernel),pointer_bias:= ADR(weights.{layer_role}_bias)"
+            layers_init.append(layer_init + ")")
+        return (
+            f"temporal_layers : ARRAY[1..{len(temporal_layers)}] OF TemporalLayer{rtnni_type_suffixes[self.nn_data_type]} :=[\n"
+            + ",\n".join(layers_init)
+            + "];\n"
+        )
+
+    def _generate_struct_recurrent_layers(self) -> str:
+        """returns the declaration of the `recurrent_layers` array of the `Layers` struct (empty without recurrent layers)."""
+        recurrent_layers = self.get_recurrent_layers()
+        if not recurrent_layers:
+            return ""
+
+        layers_init = []
+        for layer_counter, layer in enumerate(recurrent_layers, start=1):
+            layer_role = get_recurrent_layer_role(layer_counter)
+            recurrent_bias = (
+                f",pointer_recurrent_bias:= ADR(weights.{layer_role}_recurrent_bias)"
+                if layer.kind == layer_kind.gru
+                else ""
+            )
+            layers_init.append(
+                f"(num_inputs := {layer.num_inputs}, num_units := {layer.num_units}, activation := act_type.{layer.activation.value}, recurrent_activation := act_type.{layer.recurrent_activation.value}, pointer_kernel:= ADR(weights.{layer_role}_kernel),pointer_recurrent_kernel:= ADR(weights.{layer_role}_recurrent_kernel),pointer_bias:= ADR(weights.{layer_role}_bias){recurrent_bias})"
+            )
+        return (
+            f"recurrent_layers : ARRAY[1..{len(recurrent_layers)}] OF RecurrentLayer{rtnni_type_suffixes[self.nn_data_type]} :=[\n"
+            + ",\n".join(layers_init)
+            + "];\n"
+        )
+
     def generate_struct_layer_weights(self) -> str:
         """
         generate the text which is used to define the matrix in the struct LayerWeights
         """
-
         weights_ST_code = ""
-        nnLayers = self.model.layers
+        for member_name, shape, data_type in self.get_weights_layout():
+            if shape:
+                dims = ",".join(f"0..{dim-1}" for dim in shape)
+                weights_ST_code += f"{member_name} : ARRAY[{dims}] OF {data_type};\n"
+            else:
+                weights_ST_code += f"{member_name} : {data_type};\n"
 
-        if self.has_normalization:
-            weights_ST_code += f"""
-                                normalization_mean : ARRAY[0..{self.input_dim-1}] OF {self.nn_data_type};
-                                normalization_std : ARRAY[0..{self.input_dim-1}] OF {self.nn_data_type};
-                                """
-        else:
-            weights_ST_code += f"""
-                                normalization_mean : ARRAY[0..0] OF {self.nn_data_type};
-                                normalization_std : ARRAY[0..0] OF {self.nn_data_type};
-                                """
-        layers_counter = 1
-        for layer_num in range(len(nnLayers) - int(self.has_denormalization)):
-
-            if "dropout" in nnLayers[layer_num].name:
-                continue
+        weights_ST_code += """hash_sha_256 : ARRAY[0..31] OF BYTE;"""
+        return clean_indentation(weights_ST_code)
 
-            is_input_layer = layer_num == 0
-            is_output_layer = layer_num == len(nnLayers) - int(self.has_denormalization) - 1
 
-            if is_input_layer and self.has_normalization:
-                continue
-            try:
-                dim_curr = self.input_dim - 1 if is_input_layer else self._get_num_neurons(layer_num - 1) - 1
-            except:
-                dim_curr = self.input_dim - 1 if is_input_layer else self._get_num_neurons(layer_num - 2) - 1
-            dim_next = self.output_dim - 1 if is_output_layer else self._get_num_neurons(layer_num) - 1
-
-            if is_output_layer:
-                layer_role = "OutputLayer"
-            else:
-                layer_role = f"HiddenLayers{layers_counter}"
+class model_parser_stage(model_parser):
+    """Base class for optional stages between a `model_parser` and the writers (e.g. optimization passes).
 
-            weights_ST_code += f"""{layer_role}_weight : ARRAY[0..{dim_next},0..{dim_curr}] OF {self.nn_data_type};
-                                {layer_role}_bias : ARRAY[0..{dim_next}] OF {self.nn_data_type};
-                                """
-            layers_counter += 1
+    All model queries are delegated to the wrapped parser, subclasses transform the weights (`_iter_weights`) and
+    possibly the layout of the `LayerWeights` struct.
+    """
 
-        if self.has_denormalization:
-            weights_ST_code += f"""
-                                denormalization_mean : ARRAY[0..{self.output_dim-1}] OF {self.nn_data_type};
-                                denormalization_std : ARRAY[0..{self.output_dim-1}] OF {self.nn_data_type};
-                                """
-        else:
-            weights_ST_code += f"""
-                                denormalization_mean : ARRAY[0..0] OF {self.nn_data_type};
-                                denormalization_std : ARRAY[0..0] OF {self.nn_data_type};
-                                """
+    def __init__(
+        self,
+        parser: model_parser,
+        has_normalization: bool = None,
+        has_denormalization: bool = None,
+        nn_data_type: str = None,
+    ):
+        """model_parser_stage __init__
 
-        weights_ST_code += """hash_sha_256 : ARRAY[0..3] OF LREAL;"""
-        return clean_indentation(weights_ST_code)
+        ### Inputs:
 
+        parser: `model_parser`                  ... parser to wrap
+        has_normalization: bool [default: None] ... overrides the input normalization of the wrapped parser
+        has_denormalization: bool [default: None] ... overrides the output denormalization of the wrapped parser
+        nn_data_type: str [default: None]       ... overrides the data type of the wrapped parser
+        """
+        self.parser = parser
+        super(model_parser_stage, self).__init__(
+            parser.model_name,
+            parser.has_normalization if has_normalization is None else has_normalization,
+            parser.has_denormalization if has_denormalization is None else has_denormalization,
+            nn_data_type=parser.nn_data_type if nn_data_type is None else nn_data_type,
+        )
 
-class keras_to_st_parser(model_parser):
-    """ nnigen model parser implementation for Keras sequential models. """
-    def __init__(self, keras_model: keras.Sequential, unique_model_name: str):
+    def _iter_weights(self) -> Iterator[np.ndarray]:
+        return self.parser._iter_weights()
 
-        self.model = keras_model
-        has_normalization = True if "normalization" in self.model.layers[0].name else False
-        has_denormalization = True if "normalization" in self.model.layers[-1].name else False
+    def _get_num_layers(self) -> int:
+        return self.parser._get_num_layers()
 
-        super(keras_to_st_parser, self).__init__(unique_model_name, has_normalization, has_denormalization)
+    def _get_num__dense_layers(self) -> int:
+        return self.parser._get_num__dense_layers()
 
-    def _get_all_weights_flattened(self):
-        """returns a sequence of all network weights, matrices are flattened. This is used for weights serialization."""
-        all_weights = []
-        if self.has_denormalization:
-            layers = self.model.layers[int(self.has_normalization) : -1]
-        else:
-            layers = self.model.layers[int(self.has_normalization) :]
+    def _get_num_neurons(self, layer_num: int) -> int:
+        return self.parser._get_num_neurons(layer_num)
+
+    def _get_activation_type(self, layer_num: int) -> activation_or_normalization:
+        return self.parser._get_activation_type(layer_num)
 
+    def _is_layer_dense_layer(self, layer_num: int) -> bool:
+        return self.parser._is_layer_dense_layer(layer_num)
+
+    def _get_io_dimensions(self) -> Tuple[int, int]:
+        return self.parser._get_io_dimensions()
+
+    def _all_layers_dense_or_normalization(self) -> bool:
+        return self.parser._all_layers_dense_or_normalization()
+
+    def get_sparse_layers(self) -> set:
+        return self.parser.get_sparse_layers()
+
+    def get_approximated_layers(self) -> set:
+        return self.parser.get_approximated_layers()
+
+    def get_recurrent_layers(self) -> list:
+        return self.parser.get_recurrent_layers()
+
+    def get_temporal_layers(self) -> list:
+        return self.parser.get_temporal_layers()
+
+
+class ir_parser(model_parser):
+    """ nnigen model parser implementation for the framework independent `model_ir`.
+
+    All queries of the generators and the weights writer are answered from the IR, which is extracted once from the
+    model (e.g. by `extract_keras_ir`). Weights are yielded as the arrays of the IR, without further copies.
+    """
+    def __init__(self, ir: model_ir, unique_model_name: str, nn_data_type: str = "LREAL"):
+
+        self.ir = ir
+        has_normalization = len(ir.layers) > 0 and ir.layers[0].kind == layer_kind.normalization
+        has_denormalization = len(ir.layers) > 0 and ir.layers[-1].kind == layer_kind.normalization
+
+        super(ir_parser, self).__init__(
+            unique_model_name, has_normalization, has_denormalization, nn_data_type=nn_data_type
+        )
+
+    def _iter_weights(self) -> Iterator[np.ndarray]:
+        """yields the weights of the IR layer by layer."""
         if self.has_normalization:
-            mean = self.model.layers[0].get_weights()[0].T.flatten().tolist()
-            std = np.sqrt(self.model.layers[0].get_weights()[1].T.flatten()).tolist()
-            all_weights += mean + std
+            yield from self.ir.layers[0].weights
         else:
-            mean = [0]
-            std = [0]
-            all_weights += mean + std
+            yield from (np.zeros(1), np.zeros(1))
 
-        for layer in layers:
-            if "dropout" in layer.name:
-                continue
+        for layer in self.ir.layers:
+            if layer.kind == layer_kind.conv1d:
+                yield from layer.weights
+
+        for layer in self.ir.layers:
+            if layer.kind in recurrent_gates:
+                yield from layer.weights
 
-            weight_matrix = layer.get_weights()[0].T.flatten().tolist()
-            bias = layer.get_weights()[1].T.flatten().tolist()
-            all_weights += weight_matrix + bias
+        for layer in self.ir.layers:
+            if layer.kind == layer_kind.dense:
+                yield from layer.weights
 
         if self.has_denormalization:
-            mean = self.model.layers[-1].get_weights()[0].T.flatten().tolist()
-            std = np.sqrt(self.model.layers[-1].get_weights()[1].T.flatten()).tolist()
-            all_weights += mean + std
+            yield from self.ir.layers[-1].weights
         else:
-            mean = [0]
-            std = [0]
-            all_weights += mean + std
-
-        return all_weights
+            yield from (np.zeros(1), np.zeros(1))
 
     def _get_num_layers(self) -> int:
-        return len(self.model.layers)
+        return len(self.ir.layers)
 
     def _get_num__dense_layers(self) -> int:
-        return np.array([1 for layer in self.model.layers if "dense" in layer.name]).sum()
+        return sum(layer.kind == layer_kind.dense for layer in self.ir.layers)
 
     def _get_num_neurons(self, layer_num: int) -> int:
         """returns the number of neurons for a given layer of the network"""
-        nnLayers = self.model.layers
-        return len(nnLayers[layer_num].get_weights()[1])
+        return self.ir.layers[layer_num].num_neurons
 
     def _get_activation_type(self, layer_num: int) -> activation_or_normalization:
         """returns the activation type of layer i"""
-        nnLayers = self.model.layers
-        return activation_or_normalization(nnLayers[layer_num].get_config()["activation"])
+        return self.ir.layers[layer_num].activation
 
     def _is_layer_dense_layer(self, layer_num: int) -> bool:
         """returns, whether a given layer is a dense layer (which needs code generation)"""
-        nnLayers = self.model.layers
-        return "dense" in nnLayers[layer_num].name
+        return self.ir.layers[layer_num].kind == layer_kind.dense
 
     def _get_io_dimensions(self) -> Tuple[int, int]:
         """returns the number of inputs and number of outputs of the model"""
-        num_inputs = self.model.layers[0].input.shape[1]
-        num_outputs = self.model.layers[-1].output.shape[1]
-        return num_inputs, num_outputs
+        return self.ir.input_dim, self.ir.output_dim
+
+    def get_temporal_layers(self) -> list:
+        temporal_layers = []
+        num_inputs = self.ir.input_dim
+        for layer in self.ir.layers:
+            if layer.kind in temporal_layer_kinds:
+                num_outputs = layer.num_neurons if layer.kind == layer_kind.conv1d else num_inputs
+                temporal_layers.append(
+                    temporal_layer(
+                        layer.kind,
+                        num_inputs,
+                        num_outputs,
+                        layer.window,
+                        layer.dilation,
+                        layer.stride,
+                        layer.activation,
+                    )
+                )
+                num_inputs = num_outputs
+        return temporal_layers
+
+    def get_recurrent_layers(self) -> list:
+        recurrent_layers = []
+        temporal_layers = self.get_temporal_layers()
+        num_inputs = temporal_layers[-1].num_outputs if temporal_layers else self.ir.input_dim
+        for layer in self.ir.layers:
+            if layer.kind in recurrent_gates:
+                recurrent_layers.append(
+                    recurrent_layer(
+                        layer.kind,
+                        num_inputs,
+                        layer.num_neurons,
+                        layer.activation,
+                        layer.recurrent_activation,
+                        layer.return_sequences,
+                    )
+                )
+                num_inputs = layer.num_neurons
+        return recurrent_layers
 
     def _all_layers_dense_or_normalization(self) -> bool:
-        """checks whether all layers are dense layers, normalization layers, or dropout layers"""
+        """checks whether all layers are dense layers, normalization layers, or dropout layers.
+
+        Causal convolution and pooling layers, followed by LSTM and GRU layers, are allowed in front of the first dense
+        layer (after the input normalization)."""
         all_layers_okay = True
-        for i, layer in enumerate(self.model.layers):
-            if "dropout" in layer.name:
+        first_dense_layer = next(
+            (i for i, layer in enumerate(self.ir.layers) if layer.kind == layer_kind.dense), len(self.ir.layers)
+        )
+        first_recurrent_layer = next(
+            (i for i, layer in enumerate(self.ir.layers) if layer.kind in recurrent_gates), len(self.ir.layers)
+        )
+        for i, layer in enumerate(self.ir.layers):
+            if layer.kind == layer_kind.dropout:
                 continue
 
-            if i == 0 or i == len(self.model.layers) - 1:
-                if not isinstance(layer, keras.layers.Dense) and not isinstance(
-                    layer, keras.src.layers.preprocessing.normalization.Normalization
-                ):
-                    layer_name = "First" if i == 1 else "Last"
+            if layer.kind in recurrent_gates or layer.kind in temporal_layer_kinds:
+                layer_name = "Recurrent" if layer.kind in recurrent_gates else "Temporal"
+                if i > first_dense_layer or first_dense_layer == len(self.ir.layers):
+                    print(f"{layer_name} layer {i} is not in front of the Dense layers.")
+                    all_layers_okay = False
+                elif layer.kind in temporal_layer_kinds and i > first_recurrent_layer:
+                    print(f"Temporal layer {i} is not in front of the recurrent layers.")
+                    all_layers_okay = False
+            elif i == 0 or i == len(self.ir.layers) - 1:
+                if layer.kind not in (layer_kind.dense, layer_kind.normalization):
+                    layer_name = "First" if i == 0 else "Last"
                     print(f"{layer_name} layer is neither Dense nor Normalization layer.")
                     all_layers_okay = False
 
             else:  # all other layers:
-                if not isinstance(layer, keras.layers.Dense):
+                if layer.kind != layer_kind.dense:
                     print(f"layer {i} is neither Dense nor Normalization layer.")
                     all_layers_okay = False
 
         return all_layers_okay
+
+
+def extract_keras_ir(keras_model: "keras.Sequential") -> model_ir:
+    """extracts the `model_ir` of a Keras sequential model.
+
+    Each Keras layer is queried once. Weight matrices are transposed views of the backend variables (no copy, if the
+    backend keeps them in host memory), normalization statistics are converted to mean and standard deviation."""
+    import keras
+
+    layers = []
+    for layer in keras_model.layers:
+        if isinstance(layer, (keras.layers.LSTM, keras.layers.GRU)):
+            layers.append(get_recurrent_ir_layer(layer.get_config(), type(layer).__name__, layer.weights))
+        elif type(layer).__name__ in TEMPORAL_LAYER_CLASSES:
+            layers.append(get_temporal_ir_layer(layer.get_config(), type(layer).__name__, layer.weights))
+        elif isinstance(layer, keras.layers.Dense):
+            weight = np.asarray(layer.kernel).T
+            bias = np.asarray(layer.bias) if layer.use_bias else np.zeros(layer.units, dtype=weight.dtype)
+            activation = activation_or_normalization(layer.get_config()["activation"])
+            layers.append(ir_layer(layer_kind.dense, layer.name, layer.units, activation, (weight, bias)))
+        elif isinstance(layer, keras.layers.Normalization):
+            # adapted or given in the constructor, broadcast to the features
+            mean, std = np.asarray(layer.mean).flatten(), np.sqrt(np.asarray(layer.variance).flatten())
+            layers.append(ir_layer(layer_kind.normalization, layer.name, len(mean), None, (mean, std)))
+        elif isinstance(layer, keras.layers.Dropout):
+            layers.append(ir_layer(layer_kind.dropout, layer.name, 0, None, ()))
+        else:
+            layers.append(ir_layer(layer_kind.unsupported, layer.name, 0, None, ()))
+
+    return model_ir(
+        input_dim=keras_model.layers[0].input.shape[-1],
+        output_dim=keras_model.layers[-1].output.shape[-1],
+        layers=tuple(layers),
+    )
+
+
+def get_recurrent_ir_layer(config: dict, class_name: str, variables: list) -> ir_layer:
+    """returns the IR layer of a Keras `LSTM` or `GRU` layer from its config and its cell variables (kernel, recurrent
+    kernel and bias, if `use_bias`).
+
+    Layers, which can not be evaluated one time step per call (`go_backwards`, `GRU` without `reset_after`), are
+    returned as unsupported layers."""
+    kind = layer_kind.lstm if class_name == "LSTM" else layer_kind.gru
+    if config["go_backwards"] or (kind == layer_kind.gru and not config["reset_after"]):
+        return ir_layer(layer_kind.unsupported, config["name"], 0, None, ())
+
+    units = config["units"]
+    kernel = np.asarray(variables[0]).T
+    recurrent_kernel = np.asarray(variables[1]).T
+    num_rows = recurrent_gates[kind] * units
+    if config["use_bias"]:
+        bias = np.asarray(variables[2]).reshape(-1, num_rows)  # GRU: input bias and recurrent bias
+    else:
+        bias = np.zeros((1 if kind == layer_kind.lstm else 2, num_rows), dtype=kernel.dtype)
+    return ir_layer(
+        kind,
+        config["name"],
+        units,
+        activation_or_normalization(config["activation"]),
+        (kernel, recurrent_kernel, *bias),
+        recurrent_activation=activation_or_normalization(config["recurrent_activation"]),
+        return_sequences=config["return_sequences"],
+    )
+
+
+TEMPORAL_LAYER_CLASSES = {
+    "Conv1D": layer_kind.conv1d,
+    "MaxPooling1D": layer_kind.max_pooling1d,
+    "AveragePooling1D": layer_kind.average_pooling1d,
+    "GlobalMaxPooling1D": layer_kind.global_max_pooling1d,
+    "GlobalAveragePooling1D": layer_kind.global_average_pooling1d,
+}
+""" Keras layer classes of the temporal layers (see `get_temporal_ir_layer`)"""
+
+
+def get_temporal_ir_layer(config: dict, class_name: str, variables: list) -> ir_layer:
+    """returns the IR layer of a Keras `Conv1D`, `(Global)MaxPooling1D` or `(Global)AveragePooling1D` layer from its
+    config and its variables (kernel and bias, if `use_bias`).
+
+    Layers, which can not be evaluated for the newest time step only, are returned as unsupported layers: convolutions
+    without `padding="causal"`, with strides or groups, pooling without `padding="valid"`, `channels_first` data and
+    global pooling with `keepdims`."""
+    kind = TEMPORAL_LAYER_CLASSES[class_name]
+    unsupported = ir_layer(layer_kind.unsupported, config["name"], 0, None, ())
+    if config.get("data_format", "channels_last") != "channels_last" or config.get("keepdims", False):
+        return unsupported
+
+    if kind == layer_kind.conv1d:
+        if config["padding"] != "causal" or tuple(config["strides"]) != (1,) or config.get("groups", 1) != 1:
+            return unsupported
+        (window,), (dilation,) = config["kernel_size"], config["dilation_rate"]
+        kernel = np.asarray(variables[0])  # (kernel_size, num_inputs, filters)
+        kernel = kernel.transpose(2, 0, 1).reshape(config["filters"], -1)
+        bias = np.asarray(variables[1]) if config["use_bias"] else np.zeros(config["filters"], dtype=kernel.dtype)
+        return ir_layer(
+            kind,
+            config["name"],
+            config["filters"],
+            activation_or_normalization(config["activation"]),
+            (kernel, bias),
+            window=window,
+            dilation=dilation,
+        )
+
+    if kind in global_pooling_kinds:
+        return ir_layer(kind, config["name"], 0, None, ())
+    if config["padding"] != "valid":
+        return unsupported
+    (window,) = np.atleast_1d(config["pool_size"])
+    (stride,) = np.atleast_1d(config["strides"] if config["strides"] is not None else window)
+    return ir_layer(kind, config["name"], 0, None, (), window=int(window), stride=int(stride))
+
+
+class keras_to_st_parser(ir_parser):
+    """ nnigen model parser implementation for Keras sequential models (see `extract_keras_ir`). """
+    def __init__(self, keras_model: "keras.Sequential", unique_model_name: str, nn_data_type: str = "LREAL"):
+
+        self.model = keras_model
+        super(keras_to_st_parser, self).__init__(
+            extract_keras_ir(keras_model), unique_model_name, nn_data_type=nn_data_type
+        )
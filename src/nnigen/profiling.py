@@ -0,0 +1,244 @@
+"""reads the trace of a profiling build of `FB_<name>` and reports the latency per section (`nnigen-profile`)."""
+
+import argparse
+import json
+import os
+import sys
+import numpy as np
+
+from nnigen.parse_model import (
+    model_parser,
+    get_layer_role,
+    get_recurrent_layer_role,
+    get_temporal_layer_role,
+)
+
+PROFILING_SECTIONS = ("load_weights", "check_weights", "weights_update", "normalization")
+""" sections of `FB_<name>` in front of the layers: one call of the weights loading, one step of the hash verification
+(or of `FB_<name>_Weights` with shared weights), one step of a hot swap of the weights and the input normalization"""
+
+PROFILING_RECORD_DTYPE = np.dtype([("call", "<u4"), ("section", "<u4"), ("start", "<u8"), ("stop", "<u8")])
+""" layout of the RTNNI struct `ProfilingRecord`, one record per section and call in the ring buffer `profiling_trace`
+of `FB_<name>` (the binary trace written by `FB_WriteProfilingTrace` of RTNNI)"""
+
+CPU_COUNTER_PERIOD_NS = 100.0
+""" period of the CPU counter of TwinCAT (`GETCPUCOUNTER`), in which the start and stop times are recorded"""
+
+
+def get_profiling_sections(parser: model_parser) -> list:
+    """returns the names of the sections recorded by a profiling build of `FB_<name>`, the index in this list is the
+    `section` of a `ProfilingRecord`.
+
+    The sections are `PROFILING_SECTIONS`, the temporal, recurrent and dense layers (named like their members in the
+    `LayerWeights` struct and the layers of `model_parser.get_cost_report`) and the output `denormalization`.
+    """
+    num_dense_layers = len(parser.get_layer_table())
+    return (
+        list(PROFILING_SECTIONS)
+        + [get_temporal_layer_role(i) for i in range(1, len(parser.get_temporal_layers()) + 1)]
+        + [get_recurrent_layer_role(i) for i in range(1, len(parser.get_recurrent_layers()) + 1)]
+        + [get_layer_role(i, num_dense_layers) for i in range(1, num_dense_layers + 1)]
+        + ["denormalization"]
+    )
+
+
+def read_profiling_trace(trace_path: str) -> np.ndarray:
+    """reads an exported trace of a profiling build of `FB_<name>`.
+
+    ### Inputs:
+
+    trace_path: str                     ... binary file written by `FB_WriteProfilingTrace` of RTNNI (the array
+                                            `profiling_trace` of `FB_<name>`), or a CSV file with the columns `call`,
+                                            `section`, `start` and `stop` and a header line (e.g. read via ADS)
+
+    ### Outputs:
+
+    structured array (`PROFILING_RECORD_DTYPE`) of the used records, in the order of the calls and sections
+    """
+    if os.fspath(trace_path).lower().endswith(".csv"):
+        columns = np.loadtxt(trace_path, delimiter=",", skiprows=1, dtype=np.uint64, ndmin=2)
+        if columns.shape[1] != len(PROFILING_RECORD_DTYPE.names):
+            raise ValueError(f"'{trace_path}' does not contain the columns {list(PROFILING_RECORD_DTYPE.names)}.")
+        records = np.zeros(len(columns), dtype=PROFILING_RECORD_DTYPE)
+        for column, name in enumerate(PROFILING_RECORD_DTYPE.names):
+            records[name] = columns[:, column]
+    else:
+        if os.path.getsize(trace_path) % PROFILING_RECORD_DTYPE.itemsize:
+            raise ValueError(f"The size of '{trace_path}' is no multiple of a ProfilingRecord.")
+        records = np.fromfile(trace_path, dtype=PROFILING_RECORD_DTYPE)
+    return _get_used_records(records)
+
+
+def _get_used_records(records: np.ndarray) -> np.ndarray:
+    """returns the used records of a ring buffer in the order of the calls and sections.
+
+    If the ring buffer is full, the oldest call may be partially overwritten and is dropped."""
+    used_records = records[records["call"] != 0]
+    if len(used_records) == len(records) and len(records):
+        used_records = used_records[used_records["call"] != used_records["call"].min()]
+    return used_records[np.lexsort((used_records["start"], used_records["call"]))]
+
+
+def _get_latency_statistics(durations_us: np.ndarray) -> dict:
+    return {
+        "num_samples": len(durations_us),
+        "min_us": float(durations_us.min()),
+        "mean_us": float(durations_us.mean()),
+        "p99_us": float(np.percentile(durations_us, 99)),
+        "max_us": float(durations_us.max()),
+        "jitter_us": float(durations_us.max() - durations_us.min()),
+    }
+
+
+def get_profiling_report(
+    parser: model_parser,
+    trace,
+    counter_period_ns: float = CPU_COUNTER_PERIOD_NS,
+    underperformance_threshold: float = 1.5,
+) -> dict:
+    """measured latency per section of a profiling build of `FB_<name>`, compared to the static MAC counts.
+
+    ### Inputs:
+
+    parser: `model_parser`              ... parser of the exported model (the same stages as for the export, e.g.
+                                            sparse layers, since they change the MAC counts)
+    trace                               ... path of the exported trace (see `read_profiling_trace`) or its records
+    counter_period_ns: float [default: 100] ... period of the CPU counter in the trace
+    underperformance_threshold: float [default: 1.5] ... a layer is marked as `underperforming`, if its mean time per
+                                            MAC exceeds the mean time per MAC of all layers with MACs by this factor
+
+    ### Outputs:
+
+    dictionary with the list `sections` (per recorded section: `section`, `num_samples` and the latency `min_us`,
+    `mean_us`, `p99_us`, `max_us` and `jitter_us` (max - min), layers additionally `macs`, `ns_per_mac`,
+    `relative_cost` (time per MAC relative to all layers) and `underperforming`), the same statistics of the whole
+    calls in `calls` (`None` for an empty trace) and the list `unknown_sections` of section indices, which do not
+    belong to the model.
+    """
+    records = read_profiling_trace(trace) if isinstance(trace, (str, os.PathLike)) else _get_used_records(trace)
+    section_names = get_profiling_sections(parser)
+    macs = {layer["layer"]: layer["macs"] for layer in parser.get_cost_report()["layers"]}
+    durations_us = (records["stop"].astype(np.float64) - records["start"]) * counter_period_ns / 1000
+
+    sections = []
+    for section, section_name in enumerate(section_names):
+        section_durations_us = durations_us[records["section"] == section]
+        if not len(section_durations_us):
+            continue
+        statistics = {"section": section_name, **_get_latency_statistics(section_durations_us)}
+        if section_name in macs:
+            statistics["macs"] = macs[section_name]
+            statistics["ns_per_mac"] = (
+                statistics["mean_us"] * 1000 / macs[section_name] if macs[section_name] else None
+            )
+        sections.append(statistics)
+
+    # time per MAC of each layer relative to all layers with MACs, e.g. cache misses or slow activation functions
+    layers = [statistics for statistics in sections if statistics.get("ns_per_mac") is not None]
+    if layers:
+        mean_ns_per_mac = sum(layer["mean_us"] for layer in layers) * 1000 / sum(layer["macs"] for layer in layers)
+        for layer in layers:
+            layer["relative_cost"] = layer["ns_per_mac"] / mean_ns_per_mac
+            layer["underperforming"] = layer["relative_cost"] > underperformance_threshold
+
+    # whole calls from the start of the first to the end of the last section
+    calls = None
+    if len(records):
+        _, first_records = np.unique(records["call"], return_index=True)
+        last_records = np.append(first_records[1:], len(records)) - 1
+        call_durations_us = (
+            (records["stop"][last_records].astype(np.float64) - records["start"][first_records])
+            * counter_period_ns
+            / 1000
+        )
+        calls = _get_latency_statistics(call_durations_us)
+
+    return {
+        "sections": sections,
+        "calls": calls,
+        "unknown_sections": sorted(set(records["section"].tolist()) - set(range(len(section_names)))),
+    }
+
+
+def format_profiling_report(report: dict) -> str:
+    """returns a human readable table of a profiling report (see `get_profiling_report`)."""
+    lines = [
+        f"{'section':<16}{'samples':>9}{'min [us]':>11}{'mean [us]':>11}{'p99 [us]':>11}{'max [us]':>11}"
+        + f"{'jitter [us]':>13}{'MACs':>10}{'ns/MAC':>9}{'relative':>10}"
+    ]
+    for section in report["sections"]:
+        line = (
+            f"{section['section']:<16}{section['num_samples']:>9}{section['min_us']:>11.2f}{section['mean_us']:>11.2f}"
+            + f"{section['p99_us']:>11.2f}{section['max_us']:>11.2f}{section['jitter_us']:>13.2f}"
+        )
+        if "macs" in section:
+            line += f"{section['macs']:>10}"
+        if section.get("ns_per_mac") is not None:
+            line += f"{section['ns_per_mac']:>9.2f}{section['relative_cost']:>10.2f}"
+            if section["underperforming"]:
+                line += "  <- underperforming"
+        lines.append(line)
+    calls = report["calls"]
+    if calls is not None:
+        lines.append(
+            f"{'calls':<16}{calls['num_samples']:>9}{calls['min_us']:>11.2f}{calls['mean_us']:>11.2f}"
+            + f"{calls['p99_us']:>11.2f}{calls['max_us']:>11.2f}{calls['jitter_us']:>13.2f}"
+        )
+    if report["unknown_sections"]:
+        lines.append(f"sections not in the model (trace of another model?): {report['unknown_sections']}")
+    return "\n".join(lines)
+
+
+def main(argv: list = None) -> int:
+    """entry point of `nnigen-profile`."""
+    from nnigen.keras_archive import keras_archive_parser
+    from nnigen.optimize import normalization_folding_parser
+    from nnigen.sparse import sparse_layer_parser
+
+    argument_parser = argparse.ArgumentParser(
+        prog="nnigen-profile",
+        description="Reports the latency per layer of a profiling build of FB_<name> from its exported trace.",
+    )
+    argument_parser.add_argument("model", help="the exported Keras model (`.keras` file)")
+    argument_parser.add_argument(
+        "trace", help="binary trace of FB_WriteProfilingTrace or CSV (call,section,start,stop)"
+    )
+    argument_parser.add_argument("--nn-data-type", default="LREAL", help="data type of the export (default: LREAL)")
+    argument_parser.add_argument(
+        "--fold-normalization", action="store_true", help="the normalization was folded in the export"
+    )
+    argument_parser.add_argument(
+        "--sparsity-threshold", type=float, default=None, help="sparsity threshold of the export"
+    )
+    argument_parser.add_argument(
+        "--cost-target", default="generic_x64", help="cost target of the export, selects the sparse layers"
+    )
+    argument_parser.add_argument(
+        "--counter-period-ns",
+        type=float,
+        default=CPU_COUNTER_PERIOD_NS,
+        help="period of the CPU counter (default: 100)",
+    )
+    argument_parser.add_argument(
+        "--threshold", type=float, default=1.5, help="relative time per MAC of an underperforming layer (default: 1.5)"
+    )
+    argument_parser.add_argument("--report-json", default=None, help="write the report to this JSON file")
+    args = argument_parser.parse_args(argv)
+
+    model_name = os.path.splitext(os.path.basename(args.model))[0]
+    parser = keras_archive_parser(args.model, model_name, nn_data_type=args.nn_data_type)
+    if args.fold_normalization:
+        parser = normalization_folding_parser(parser)
+    if args.sparsity_threshold is not None:
+        parser = sparse_layer_parser(parser, args.sparsity_threshold, target=args.cost_target)
+    report = get_profiling_report(parser, args.trace, args.counter_period_ns, args.threshold)
+    print(format_profiling_report(report))
+
+    if args.report_json is not None:
+        with open(args.report_json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
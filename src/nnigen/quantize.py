@@ -0,0 +1,170 @@
+from typing import Iterator
+import numpy as np
+
+from nnigen.parse_model import (
+    model_parser,
+    model_parser_stage,
+    activation_or_normalization,
+    get_layer_role,
+    clean_indentation,
+    pad_weights_layout,
+)
+from nnigen.emulator import activation_functions
+
+INT8_MAX = 127
+""" largest magnitude of the symmetric int8 range (-127..127)"""
+
+
+def round_half_away_from_zero(x: np.ndarray) -> np.ndarray:
+    """rounds like the IEC 61131-3 conversion `LREAL_TO_SINT` (ties away from zero)."""
+    return np.sign(x) * np.floor(np.abs(x) + 0.5)
+
+
+def quantize_symmetric(x: np.ndarray, scale) -> np.ndarray:
+    """quantizes `x` to int8 with the given scale(s): `x ~ q * scale` with `q` in -127..127."""
+    return np.clip(round_half_away_from_zero(x / scale), -INT8_MAX, INT8_MAX).astype(np.int8)
+
+
+def get_symmetric_scale(max_abs) -> np.ndarray:
+    """returns the int8 scale for a given maximum magnitude (1.0 for all-zero tensors)."""
+    max_abs = np.asarray(max_abs, dtype=np.float64)
+    return np.where(max_abs > 0, max_abs / INT8_MAX, 1.0)
+
+
+class int8_quantized_parser(model_parser_stage):
+    """Post-training int8 quantization stage between a float `model_parser` and the writers.
+
+    Weights are quantized symmetrically with one scale per output channel (neuron). The input of each dense layer is
+    quantized with one scale per layer, which is calibrated on representative inputs (maximum magnitude).
+    On the PLC, `F_ForwardPropagation_INT8` multiplies in SINT, accumulates in DINT and rescales each neuron with
+    `input_scale * weight_scale` to LREAL before the bias and the activation function are applied.
+    Normalization, denormalization, biases and the layer buffers stay in LREAL.
+    """
+
+    quantized = True
+
+    def __init__(self, parser: model_parser, calibration_inputs: np.ndarray):
+        """int8_quantized_parser __init__
+
+        ### Inputs:
+
+        parser: `model_parser`              ... parser of the float model (`nn_data_type` must be "LREAL")
+        calibration_inputs: np.ndarray      ... representative model inputs of shape `(num_samples, num_inputs)`
+        """
+        if parser.nn_data_type != "LREAL":
+            raise ValueError("Quantization requires a parser with nn_data_type 'LREAL'.")
+        if parser.get_sparse_layers():
+            raise ValueError("Quantization of sparse layers is not supported.")
+        if parser.get_recurrent_layers() or parser.get_temporal_layers():
+            raise ValueError("Quantization of recurrent, convolution and pooling layers is not supported.")
+
+        super(int8_quantized_parser, self).__init__(parser)
+        self.quantized_weights = self._quantize(np.asarray(calibration_inputs, dtype=np.float64))
+
+    def _iter_weights(self) -> Iterator[np.ndarray]:
+        for member_name, _, _ in self.get_weights_layout():
+            yield self.quantized_weights[member_name]
+
+    def _quantize(self, calibration_inputs: np.ndarray) -> dict:
+        """quantizes the weights of the float parser and calibrates the input scales of all dense layers."""
+        float_weights = self.parser.get_weights()
+        layer_table = self.get_layer_table()
+
+        weights = {
+            member_name: float_weights[member_name]
+            for member_name in [
+                "normalization_mean",
+                "normalization_std",
+                "denormalization_mean",
+                "denormalization_std",
+            ]
+        }
+
+        x = calibration_inputs.reshape(-1, self.input_dim)
+        if self.has_normalization:
+            x = (x - weights["normalization_mean"]) / weights["normalization_std"]
+
+        for layer_counter, (_, _, activation) in enumerate(layer_table, start=1):
+            layer_role = get_layer_role(layer_counter, len(layer_table))
+            weight = float_weights[f"{layer_role}_weight"]
+            bias = float_weights[f"{layer_role}_bias"]
+
+            input_scale = get_symmetric_scale(np.max(np.abs(x)))
+            weight_scale = get_symmetric_scale(np.max(np.abs(weight), axis=1))
+            weights[f"{layer_role}_input_scale"] = input_scale
+            weights[f"{layer_role}_scale"] = input_scale * weight_scale
+            weights[f"{layer_role}_bias"] = bias
+            weights[f"{layer_role}_weight"] = quantize_symmetric(weight, weight_scale[:, np.newaxis])
+
+            # calibrate the next layer with the quantized forward pass of this layer
+            x = self.forward_layer(weights, layer_role, activation, x)
+
+        for member_name, shape, _ in self.get_weights_layout():
+            if member_name == "padding":
+                weights[member_name] = np.zeros(shape, dtype=np.uint8)
+        return weights
+
+    @staticmethod
+    def forward_layer(
+        weights: dict, layer_role: str, activation: activation_or_normalization, x: np.ndarray
+    ) -> np.ndarray:
+        """evaluates a quantized dense layer like `F_ForwardPropagation_INT8` for a batch of LREAL inputs."""
+        x_quantized = quantize_symmetric(x, weights[f"{layer_role}_input_scale"])
+        accumulator = x_quantized.astype(np.int64) @ weights[f"{layer_role}_weight"].astype(np.int64).T
+        return activation_functions[activation](
+            weights[f"{layer_role}_bias"] + accumulator.astype(np.float64) * weights[f"{layer_role}_scale"]
+        )
+
+    def _get_unpadded_weights_layout(self) -> list:
+        """returns the layout of the quantized `LayerWeights` struct without the padding before the hash."""
+        norm_dim = self.input_dim if self.has_normalization else 1
+        denorm_dim = self.output_dim if self.has_denormalization else 1
+        layer_table = self.get_layer_table()
+
+        # all LREAL members first, the SINT weights last: no alignment gaps inside the struct
+        layout = [("normalization_mean", (norm_dim,), "LREAL"), ("normalization_std", (norm_dim,), "LREAL")]
+        for layer_counter, (_, num_neurons, _) in enumerate(layer_table, start=1):
+            layer_role = get_layer_role(layer_counter, len(layer_table))
+            layout.append((f"{layer_role}_input_scale", (), "LREAL"))
+            layout.append((f"{layer_role}_scale", (num_neurons,), "LREAL"))
+            layout.append((f"{layer_role}_bias", (num_neurons,), "LREAL"))
+        layout += [("denormalization_mean", (denorm_dim,), "LREAL"), ("denormalization_std", (denorm_dim,), "LREAL")]
+        for layer_counter, (num_inputs, num_neurons, _) in enumerate(layer_table, start=1):
+            layer_role = get_layer_role(layer_counter, len(layer_table))
+            layout.append((f"{layer_role}_weight", (num_neurons, num_inputs), "SINT"))
+        return layout
+
+    def get_weights_layout(self) -> list:
+        """returns the layout of the quantized `LayerWeights` struct (see `model_parser.get_weights_layout`).
+
+        The SINT weights are padded to a multiple of 8 bytes, such that `SIZEOF(nn.weights)-32` is the offset of the hash
+        in the struct (LREAL members are 8-byte aligned)."""
+        return pad_weights_layout(self._get_unpadded_weights_layout())
+
+    def generate_struct_layers(self) -> str:
+        layer_table = self.get_layer_table()
+        buffer_size = self._get_layer_buffer_size()
+        quantized_buffer_size = max(num_inputs for num_inputs, _, _ in layer_table)
+
+        context = f"""
+                    num_layers : UINT := {len(layer_table)+1};
+                    weights : {self.model_name}_LayerWeights;
+                    layers : ARRAY[0..{len(layer_table)}] OF Layer_INT8 :=[
+                    (num_neurons := {self.input_dim}),
+                   """
+
+        layers_init = []
+        for layer_counter, (_, num_neurons, activation) in enumerate(layer_table, start=1):
+            layer_role = get_layer_role(layer_counter, len(layer_table))
+            layers_init.append(
+                f"(num_neurons := {num_neurons}, activation := act_type.{activation.value}, pointer_input_scale:= ADR(weights.{layer_role}_input_scale), pointer_weight:= ADR(weights.{layer_role}_weight),pointer_scale:= ADR(weights.{layer_role}_scale),pointer_bias:= ADR(weights.{layer_role}_bias))"
+            )
+
+        context += ",\n".join(layers_init)
+        context += "];\n"
+        context = (
+            context
+            + f"layer_buffer_a : ARRAY[0..{buffer_size-1}] OF {self.nn_data_type};\nlayer_buffer_b : ARRAY[0..{buffer_size-1}] OF {self.nn_data_type};\n"
+            + f"layer_buffer_quantized : ARRAY[0..{quantized_buffer_size-1}] OF SINT;\n"
+        )
+        return clean_indentation(context)
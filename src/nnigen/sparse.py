@@ -0,0 +1,175 @@
+from typing import Iterator, Tuple
+import numpy as np
+
+from nnigen.parse_model import (
+    model_parser,
+    model_parser_stage,
+    get_layer_role,
+    clean_indentation,
+    pad_weights_layout,
+    plc_data_types,
+    rtnni_type_suffixes,
+)
+from nnigen.cost_model import get_calibration
+
+
+def to_csr(weight: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """compresses a weight matrix of shape `(num_neurons, num_inputs)` row-wise (one row per neuron).
+
+    ### Outputs:
+
+    `(values, column_index, row_start)`: the nonzero weights row by row, their input indices, and the index of the first
+    value of each row in `values` (`row_start[j+1] - row_start[j]` values belong to neuron `j`). A matrix without
+    nonzero weights stores a single explicit zero, because the PLC does not allow empty arrays.
+    """
+    weight = np.asarray(weight)
+    rows, column_index = np.nonzero(weight)
+    if rows.size == 0:
+        rows, column_index = np.zeros(1, dtype=np.intp), np.zeros(1, dtype=np.intp)
+    row_start = np.zeros(weight.shape[0] + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=weight.shape[0]), out=row_start[1:])
+    return weight[rows, column_index], column_index, row_start
+
+
+def from_csr(values: np.ndarray, column_index: np.ndarray, row_start: np.ndarray, num_inputs: int) -> np.ndarray:
+    """inverse of `to_csr`: returns the dense weight matrix of shape `(num_neurons, num_inputs)`."""
+    weight = np.zeros((len(row_start) - 1, num_inputs), dtype=values.dtype)
+    rows = np.repeat(np.arange(len(row_start) - 1), np.diff(row_start))
+    weight[rows, column_index] = values
+    return weight
+
+
+class sparse_layer_parser(model_parser_stage):
+    """Stores pruned dense layers in the compressed sparse row (CSR) format.
+
+    A layer is stored sparse, if the share of zero weights reaches `sparsity_threshold` and the estimated execution time
+    (see `nnigen.cost_model`) of the sparse kernel is below the one of the dense kernel. For each sparse layer, the
+    `LayerWeights` struct contains `<layer>_values`, `<layer>_row_start` (DINT) and `<layer>_column_index` (UINT)
+    instead of `<layer>_weight`. On the PLC, sparse layers are evaluated by `F_ForwardPropagation_CSR`.
+    """
+
+    def __init__(self, parser: model_parser, sparsity_threshold: float = 0.5, target="generic_x64"):
+        """sparse_layer_parser __init__
+
+        ### Inputs:
+
+        parser: `model_parser`                  ... parser of the float model (not quantized)
+        sparsity_threshold: float [default: 0.5] ... minimum share of zero weights of a layer to consider the CSR format
+        target [default: "generic_x64"]         ... calibration table for the cost comparison (see `nnigen.cost_model`)
+        """
+        if parser.quantized:
+            raise ValueError("Sparse layers are not supported for quantized models.")
+        if not 0 <= sparsity_threshold <= 1:
+            raise ValueError(f"Sparsity threshold {sparsity_threshold} is not in the range [0, 1].")
+
+        super(sparse_layer_parser, self).__init__(parser)
+        self.sparsity_threshold = sparsity_threshold
+        self.sparse_weights, self.sparse_layers = self._compress(parser.get_weights(), get_calibration(target))
+
+    def get_sparse_layers(self) -> set:
+        return set(self.sparse_layers)
+
+    def _iter_weights(self) -> Iterator[np.ndarray]:
+        for member_name, shape, _ in self.get_weights_layout():
+            if member_name == "padding":
+                yield np.zeros(shape, dtype=np.uint8)
+            else:
+                yield self.sparse_weights[member_name]
+
+    def _compress(self, weights: dict, calibration: dict) -> Tuple[dict, set]:
+        """selects the sparse layers by their estimated cost and replaces their weights by the CSR arrays."""
+        layer_table = self.get_layer_table()
+        value_bytes = np.dtype(plc_data_types[self.nn_data_type]).itemsize
+        index_bytes = np.dtype(plc_data_types["UINT"]).itemsize
+
+        sparse_weights = dict(weights)
+        sparse_layers = set()
+        for layer_counter, (num_inputs, num_neurons, _) in enumerate(layer_table, start=1):
+            layer_role = get_layer_role(layer_counter, len(layer_table))
+            weight = weights[f"{layer_role}_weight"]
+            num_nonzero = int(np.count_nonzero(weight))
+            if 1 - num_nonzero / weight.size < self.sparsity_threshold or num_inputs > np.iinfo(np.uint16).max + 1:
+                continue  # column indices are stored as UINT
+
+            # only the parts of the cost model which differ between the dense and the sparse kernel
+            mac_ns = calibration["mac_ns"][self.nn_data_type]
+            dense_ns = weight.size * (mac_ns + value_bytes * calibration["byte_ns"])
+            sparse_ns = (
+                num_nonzero
+                * (mac_ns + calibration["sparse_index_ns"] + (value_bytes + index_bytes) * calibration["byte_ns"])
+                + (num_neurons + 1) * np.dtype(plc_data_types["DINT"]).itemsize * calibration["byte_ns"]
+            )
+            if sparse_ns >= dense_ns:
+                continue
+
+            values, column_index, row_start = to_csr(weight)
+            del sparse_weights[f"{layer_role}_weight"]
+            sparse_weights[f"{layer_role}_values"] = values
+            sparse_weights[f"{layer_role}_column_index"] = column_index
+            sparse_weights[f"{layer_role}_row_start"] = row_start
+            sparse_layers.add(layer_counter)
+        return sparse_weights, sparse_layers
+
+    def _get_row_macs(self, layer_counter: int) -> np.ndarray:
+        if layer_counter not in self.sparse_layers:
+            return super(sparse_layer_parser, self)._get_row_macs(layer_counter)
+        layer_role = get_layer_role(layer_counter, len(self.get_layer_table()))
+        return np.diff(self.sparse_weights[f"{layer_role}_row_start"])
+
+    def get_weights_layout(self) -> list:
+        """returns the layout of the `LayerWeights` struct (see `model_parser.get_weights_layout`).
+
+        The values of sparse layers replace their weight matrices. The index arrays follow after all floating point
+        members, first the `row_start` (DINT) arrays of all sparse layers and then their `column_index` (UINT) arrays,
+        such that there are no alignment gaps inside the struct. The struct is padded to a multiple of 8 bytes."""
+        layer_table = self.get_layer_table()
+        sparse_roles = {get_layer_role(layer_counter, len(layer_table)) for layer_counter in self.sparse_layers}
+
+        layout, row_start_layout, column_index_layout = [], [], []
+        for member_name, shape, data_type in self.parser.get_weights_layout():
+            layer_role = member_name[: -len("_weight")]
+            if member_name.endswith("_weight") and layer_role in sparse_roles:
+                num_values = len(self.sparse_weights[f"{layer_role}_values"])
+                layout.append((f"{layer_role}_values", (num_values,), data_type))
+                row_start_layout.append((f"{layer_role}_row_start", (shape[0] + 1,), "DINT"))
+                column_index_layout.append((f"{layer_role}_column_index", (num_values,), "UINT"))
+            else:
+                layout.append((member_name, shape, data_type))
+        return pad_weights_layout(layout + row_start_layout + column_index_layout)
+
+    def generate_struct_layers(self) -> str:
+        layer_table = self.get_layer_table()
+        type_suffix = rtnni_type_suffixes[self.nn_data_type]
+        buffer_size = self._get_layer_buffer_size()
+
+        num_inputs = layer_table[0][0]
+        layers_init, layers_csr_init = [f"(num_neurons := {num_inputs})"], [f"(num_neurons := {num_inputs})"]
+        for layer_counter, (_, num_neurons, activation) in enumerate(layer_table, start=1):
+            layer_role = get_layer_role(layer_counter, len(layer_table))
+            if layer_counter in self.sparse_layers:
+                layers_init.append(f"(num_neurons := {num_neurons}, activation := act_type.{activation.value})")
+                layers_csr_init.append(
+                    f"(num_neurons := {num_neurons}, activation := act_type.{activation.value}, pointer_values:= ADR(weights.{layer_role}_values),pointer_bias:= ADR(weights.{layer_role}_bias),pointer_column_index:= ADR(weights.{layer_role}_column_index),pointer_row_start:= ADR(weights.{layer_role}_row_start))"
+                )
+            else:
+                layers_init.append(
+                    f"(num_neurons := {num_neurons}, activation := act_type.{activation.value}, pointer_weight:= ADR(weights.{layer_role}_weight),pointer_bias:= ADR(weights.{layer_role}_bias))"
+                )
+                layers_csr_init.append(f"(num_neurons := {num_neurons})")
+
+        context = (
+            f"num_layers : UINT := {len(layer_table)+1};\n"
+            + f"weights : {self.model_name}_LayerWeights;\n"
+            + f"layers : ARRAY[0..{len(layer_table)}] OF Layer{type_suffix} :=[\n"
+            + ",\n".join(layers_init)
+            + "];\n"
+            # sparse layers have a `pointer_row_start`, which is 0 for all dense layers
+            + f"layers_csr : ARRAY[0..{len(layer_table)}] OF Layer_CSR{type_suffix} :=[\n"
+            + ",\n".join(layers_csr_init)
+            + "];\n"
+            + self._generate_struct_temporal_layers()
+            + self._generate_struct_recurrent_layers()
+            + f"layer_buffer_a : ARRAY[0..{buffer_size-1}] OF {self.nn_data_type};\n"
+            + f"layer_buffer_b : ARRAY[0..{buffer_size-1}] OF {self.nn_data_type};\n"
+        )
+        return clean_indentation(context)
@@ -32,22 +32,25 @@ template_fb_inference_decl = """FUNCTION_BLOCK FB_[[NAME]]
 VAR_INPUT
 	pointer_input: POINTER TO [[DATA_TYPE]];
 	pointer_output : POINTER TO [[DATA_TYPE]];
-	
+[[INPUT_VARS]]	
 END_VAR
-VAR	
+[[OUTPUT_VARS]]VAR	
   i : UINT;
-  flag_AreWeightsLoaded : BOOL := FALSE;
+  pointer_layer_in : POINTER TO [[DATA_TYPE]];
+  pointer_layer_out : POINTER TO [[DATA_TYPE]];
+[[WEIGHTS_VARS]][[ADDITIONAL_VARS]]END_VAR
+"""
+
+template_fb_weights_vars = """  flag_AreWeightsLoaded : BOOL := FALSE;
   flag_AreWeightsChecked : BOOL := FALSE;
-  load_weights : FB_LoadWeights;
-  filePath : T_MaxString := '[[WEIGHTS_FILE_PATH]]';
-  nn : [[NAME_ST_LAYERS]];
-  hash_sha_256_twincat : ARRAY[0..3] OF LREAL;
+  load_weights : [[LOAD_WEIGHTS_FB]];
+[[LOAD_WEIGHTS_VARS]]  filePath : T_MaxString := '[[WEIGHTS_FILE_PATH]]';
+[[NN_VARS]]  hash_sha_256_twincat : ARRAY[0..3] OF LREAL;
   compare_res : DINT := 99;
-END_VAR
 """
 
 template_fb_inference_impl = """IF NOT flag_AreWeightsLoaded THEN
-		load_weights(execute := TRUE,filePath := filePath,ReadAdr := ADR(nn.weights), ReadLen :=  SIZEOF(nn.weights));
+		load_weights(execute := TRUE,filePath := filePath,ReadAdr := ADR(nn.weights), ReadLen :=  SIZEOF(nn.weights), ReadOffset := [[WEIGHTS_DATA_OFFSET]]);[[PROFILING_LOAD]]
 		IF NOT load_weights.busy THEN 
 			flag_AreWeightsLoaded := TRUE;
 		END_IF
@@ -56,21 +59,392 @@ ELSIF NOT flag_AreWeightsChecked THEN
 	compare_res := MEMCMp(pBuf1 := ADR(hash_sha_256_twincat),ADR(nn.weights.hash_sha_256),32);
 	IF compare_res = 0 THEN
 		flag_AreWeightsChecked := TRUE;
+	END_IF[[PROFILING_CHECK]]
+ELSE
+[[INFERENCE]]
+END_IF
+"""
+
+template_fb_inference_impl_chunked = """IF NOT flag_AreWeightsLoaded THEN
+		load_weights(execute := TRUE,filePath := filePath,ReadAdr := ADR(nn.weights), ReadLen :=  SIZEOF(nn.weights), ReadOffset := [[WEIGHTS_DATA_OFFSET]], ChunkLen := [[CHUNK_SIZE]]);[[PROFILING_LOAD]]
+		IF NOT load_weights.busy THEN 
+			flag_AreWeightsLoaded := TRUE;
+		END_IF
+ELSIF NOT flag_AreWeightsChecked THEN
+	// one hash per call: the chunk table and chunk hashes first, then chunk by chunk ([[NUM_CHUNKS]] chunks of at most [[CHUNK_SIZE]] bytes)
+	IF chunk_counter = 0 THEN
+		F_GenerateHashValue(hashMode:=E_HashMode.HASH_SHA256,pData := ADR(nn.weights.chunk_table),nData := SIZEOF(nn.weights.chunk_table)+SIZEOF(nn.weights.chunk_hashes),pHash := ADR(hash_sha_256_twincat),nHash:=32);
+		compare_res := MEMCMP(pBuf1 := ADR(hash_sha_256_twincat),ADR(nn.weights.chunk_index_hash),32);
+	ELSE
+		F_GenerateHashValue(hashMode:=E_HashMode.HASH_SHA256,pData := ADR(nn.weights) + nn.weights.chunk_table[chunk_counter-1],
+			nData := nn.weights.chunk_table[chunk_counter]-nn.weights.chunk_table[chunk_counter-1],pHash := ADR(hash_sha_256_twincat),nHash:=32);
+		compare_res := MEMCMP(pBuf1 := ADR(hash_sha_256_twincat),ADR(nn.weights.chunk_hashes[chunk_counter-1,0]),32);
 	END_IF
+	IF compare_res = 0 THEN
+		IF chunk_counter = [[NUM_CHUNKS]] THEN
+			flag_AreWeightsChecked := TRUE;
+		ELSE
+			chunk_counter := chunk_counter + 1;
+		END_IF
+	END_IF[[PROFILING_CHECK]]
 ELSE
-	MEMCPY(destAddr:=ADR(nn.layer_input),srcAddr:=pointer_input,n:=SIZEOF([[DATA_TYPE]])*nn.layers[0].num_neurons);
-[[NORMALIZATION]]
-    
-   // forward inference
+[[INFERENCE]]
+END_IF
+"""
+
+template_fb_inference_generic = """[[NORMALIZATION]]
+	pointer_layer_in := [[FIRST_LAYER_INPUT]];
+
+   // forward inference (layers alternate between two buffers, the last layer writes to pointer_output)
 	FOR i := 0 TO nn.num_layers-2 DO
-		F_ForwardPropagation(	layer_pre	:= 	nn.layers[i],
+		IF i = nn.num_layers-2 THEN
+			pointer_layer_out := pointer_output;
+		ELSIF pointer_layer_in = ADR(nn.layer_buffer_a) THEN
+			pointer_layer_out := ADR(nn.layer_buffer_b);
+		ELSE
+			pointer_layer_out := ADR(nn.layer_buffer_a);
+		END_IF
+[[FORWARD_PROPAGATION]][[PROFILING_LAYER]]
+		pointer_layer_in := pointer_layer_out;
+	END_FOR
+    
+[[DENORMALIZATION]]    """
+
+template_forward_propagation = """		F_ForwardPropagation[[KERNEL_SUFFIX]](	layer_pre	:= 	nn.layers[i],
 								layer_next	:=	nn.layers[i+1],
-								pointer_in 	:=	ADR(nn.layer_input),
-								pointer_out	:=	ADR(nn.layer_output)	);
-		MEMCPY(destAddr:=ADR(nn.layer_input),srcAddr:=ADR(nn.layer_output),n:=SIZEOF([[DATA_TYPE]])*nn.layers[i+1].num_neurons);
+								pointer_in 	:=	pointer_layer_in,
+								pointer_out	:=	pointer_layer_out[[KERNEL_ARGS]]	);"""
+
+template_forward_propagation_sparse = """		IF nn.layers_csr[i+1].pointer_row_start <> 0 THEN
+			F_ForwardPropagation_CSR[[TYPE_SUFFIX]](	layer_next	:=	nn.layers_csr[i+1],
+								pointer_in 	:=	pointer_layer_in,
+								pointer_out	:=	pointer_layer_out	);
+		ELSE
+	[[FORWARD_PROPAGATION]]
+		END_IF"""
+
+template_fb_inference_specialized = """[[NORMALIZATION]]
+
+   // forward inference (specialized for this network)
+[[LAYERS]]
+
+[[DENORMALIZATION]]    """
+
+template_specialized_layer = """	// layer [[LAYER_NUM]]: [[NUM_INPUTS]] -> [[NUM_NEURONS]] neurons, activation [[ACTIVATION]]
+	FOR j := 0 TO [[NUM_NEURONS]]-1 DO
+		acc := 0;
+		FOR k := 0 TO [[NUM_INPUTS]]-1 DO
+			acc := acc + nn.weights.[[LAYER_ROLE]]_weight[j,k] * [[LAYER_INPUT]][k];
+		END_FOR
+		[[LAYER_OUTPUT]][j] := nn.weights.[[LAYER_ROLE]]_bias[j] + acc;
+	END_FOR[[ACTIVATION_LAYER]]"""
+
+template_specialized_sparse_layer = """	// layer [[LAYER_NUM]]: [[NUM_INPUTS]] -> [[NUM_NEURONS]] neurons, activation [[ACTIVATION]], sparse ([[NUM_VALUES]] nonzero weights)
+	FOR j := 0 TO [[NUM_NEURONS]]-1 DO
+		acc := 0;
+		FOR k_sparse := nn.weights.[[LAYER_ROLE]]_row_start[j] TO nn.weights.[[LAYER_ROLE]]_row_start[j+1]-1 DO
+			acc := acc + nn.weights.[[LAYER_ROLE]]_values[k_sparse] * [[LAYER_INPUT]][nn.weights.[[LAYER_ROLE]]_column_index[k_sparse]];
+		END_FOR
+		[[LAYER_OUTPUT]][j] := nn.weights.[[LAYER_ROLE]]_bias[j] + acc;
+	END_FOR[[ACTIVATION_LAYER]]"""
+
+template_specialized_activation = """
+	F_ActivationLayer[[TYPE_SUFFIX]](pointer_input := [[LAYER_OUTPUT_ADR]], activation := act_type.[[ACTIVATION]], num_values := [[NUM_NEURONS]]);"""
+
+template_specialized_activation_table = """
+	F_ActivationLayer_LUT[[TYPE_SUFFIX]](pointer_input := [[LAYER_OUTPUT_ADR]], activation := act_type.[[ACTIVATION]], num_values := [[NUM_NEURONS]],
+		pointer_table := ADR(nn.weights.[[LAYER_ROLE]]_activation_table));"""
+
+template_fb_sequence_input_vars = """	reset_state : BOOL; // TRUE: this call starts a new sequence (the ring buffers and states of the layers are cleared first)
+"""
+
+template_fb_sequence_output_vars = """	updated : BOOL; // the outputs were updated in this call (the pooling layers complete a window every stride-th call)
+"""
+
+template_fb_sequence = """	// sequence layers: one time step per call, the past inputs and the states persist between the calls
+	IF reset_state THEN
+[[RESET_STATES]]
+	END_IF
+[[SEQUENCE_LAYERS]]"""
+
+template_temporal_reset = """		MEMSET(destAddr:=ADR(temporal_history_[[LAYER_NUM]]),fillByte:=0,n:=SIZEOF(temporal_history_[[LAYER_NUM]]));"""
+
+template_temporal_conv = """	F_Conv1D[[TYPE_SUFFIX]](layer := nn.temporal_layers[[[LAYER_NUM]]], pointer_in := [[LAYER_INPUT]],
+		pointer_history := ADR(temporal_history_[[LAYER_NUM]]), pointer_out := ADR(temporal_output_[[LAYER_NUM]]),
+		newest := temporal_newest_[[LAYER_NUM]]);"""
+
+template_temporal_pooling = """	updated := F_Pooling1D[[TYPE_SUFFIX]](layer := nn.temporal_layers[[[LAYER_NUM]]], average := [[AVERAGE]],
+		pointer_in := [[LAYER_INPUT]], pointer_history := ADR(temporal_history_[[LAYER_NUM]]),
+		pointer_out := ADR(temporal_output_[[LAYER_NUM]]), newest := temporal_newest_[[LAYER_NUM]], count := temporal_count_[[LAYER_NUM]]);[[PROFILING_EVENT]]
+	IF NOT updated THEN
+		RETURN; // no complete pooling window in this call, the outputs keep their values
+	END_IF"""
+
+template_temporal_global_pooling = """	F_GlobalPooling1D[[TYPE_SUFFIX]](layer := nn.temporal_layers[[[LAYER_NUM]]], average := [[AVERAGE]],
+		pointer_in := [[LAYER_INPUT]], pointer_history := ADR(temporal_history_[[LAYER_NUM]]),
+		pointer_out := ADR(temporal_output_[[LAYER_NUM]]), count := temporal_count_[[LAYER_NUM]]);"""
+
+template_recurrent_reset = """		MEMSET(destAddr:=ADR(recurrent_state_[[LAYER_NUM]]),fillByte:=0,
+			n:=SIZEOF(recurrent_state_[[LAYER_NUM]]));"""
+
+template_recurrent_layer = """	F_[[CELL]]Cell[[TYPE_SUFFIX]](cell := nn.recurrent_layers[[[LAYER_NUM]]], pointer_in := [[LAYER_INPUT]],
+		pointer_state := ADR(recurrent_state_[[LAYER_NUM]]), pointer_gates := ADR(recurrent_gates));"""
+
+template_fb_profiling_output_vars = """	profiling_trace : ARRAY[0..[[TRACE_LENGTH]]-1] OF ProfilingRecord; // ring buffer of the profiling build, one record per section and call (export with FB_WriteProfilingTrace)
+	profiling_next : UDINT; // index of the oldest record in profiling_trace (overwritten next)
+"""
+
+template_fb_profiling_vars = """  profiling_call : UDINT; // number of the current call (starting with 1)
+  profiling_time : ULINT; // CPU counter at the end of the last section
+"""
+
+template_profiling_start = """profiling_call := profiling_call + 1;
+profiling_time := F_GetCpuCounter();
+"""
+
+template_profiling_event = """[[INDENT]]profiling_time := F_ProfilingEvent(pointer_trace := ADR(profiling_trace), trace_length := [[TRACE_LENGTH]], call := profiling_call,
+[[INDENT]]	section := [[SECTION]], start := profiling_time, next_record := profiling_next); // [[SECTION_NAME]]"""
+
+template_fb_time_sliced_output_vars = """	busy : BOOL; // an inference is in progress (the outputs are not updated yet)
+	done : BOOL; // the outputs were updated in this call
+"""
+
+template_fb_inference_time_sliced = """   // time sliced inference: one slice per call, a result every [[NUM_SLICES]] calls (at most [[MACS_PER_CALL]] MACs per call)
+	done := FALSE;
+	CASE slice OF
+[[SLICES]]
+	END_CASE
+	IF slice = [[NUM_SLICES]]-1 THEN
+		slice := 0;
+		busy := FALSE;
+		done := TRUE;
+	ELSE
+		slice := slice + 1;
+		busy := TRUE;
+	END_IF"""
+
+template_time_slice_input = """		// latch the input of the caller for the whole inference
+		MEMCPY(destAddr:=ADR(slice_input),srcAddr:=pointer_input,n:=SIZEOF(slice_input));"""
+
+template_time_slice_normalization = """		F_NormalizationLayer[[TYPE_SUFFIX]](pointer_input := ADR(slice_input),pointer_mean := ADR(nn.weights.normalization_mean),
+			pointer_std := ADR(nn.weights.normalization_std),invert := FALSE, num_neurons := nn.layers[0].num_neurons);"""
+
+template_time_slice_output = """		MEMCPY(destAddr:=pointer_output,srcAddr:=ADR(slice_output),
+			n:=SIZEOF(slice_output));"""
+
+template_time_slice_denormalization = """		F_NormalizationLayer[[TYPE_SUFFIX]](pointer_input := pointer_output,pointer_mean := ADR(nn.weights.denormalization_mean),
+			pointer_std := ADR(nn.weights.denormalization_std),invert := TRUE, num_neurons := SIZEOF(slice_output)/SIZEOF(slice_output[0]));"""
+
+template_time_slice_segment = """		// [[LAYER_ROLE]]: neurons [[FIRST_NEURON]]..[[LAST_NEURON]] of [[NUM_NEURONS]]
+		slice_layer := nn.layers[[[LAYER_NUM]]];
+		slice_layer.num_neurons := [[SLICE_NEURONS]];
+		slice_layer.pointer_weight := ADR(nn.layers[[[LAYER_NUM]]].pointer_weight[[[FIRST_WEIGHT]]]);
+[[SLICE_POINTERS]]		slice_layer.pointer_bias := ADR(nn.layers[[[LAYER_NUM]]].pointer_bias[[[FIRST_NEURON]]]);
+		F_ForwardPropagation[[KERNEL_SUFFIX]](layer_pre := nn.layers[[[PREVIOUS_LAYER_NUM]]], layer_next := slice_layer,
+			pointer_in := ADR([[LAYER_INPUT]]), pointer_out := ADR([[LAYER_OUTPUT]][[[FIRST_NEURON]]])[[KERNEL_ARGS]]);"""
+
+template_time_slice_segment_sparse = """		// [[LAYER_ROLE]]: neurons [[FIRST_NEURON]]..[[LAST_NEURON]] of [[NUM_NEURONS]] (sparse)
+		slice_layer_csr := nn.layers_csr[[[LAYER_NUM]]];
+		slice_layer_csr.num_neurons := [[SLICE_NEURONS]];
+		slice_layer_csr.pointer_bias := ADR(nn.layers_csr[[[LAYER_NUM]]].pointer_bias[[[FIRST_NEURON]]]);
+		slice_layer_csr.pointer_row_start := ADR(nn.layers_csr[[[LAYER_NUM]]].pointer_row_start[[[FIRST_NEURON]]]);
+		F_ForwardPropagation_CSR[[TYPE_SUFFIX]](layer_next := slice_layer_csr,
+			pointer_in := ADR([[LAYER_INPUT]]), pointer_out := ADR([[LAYER_OUTPUT]][[[FIRST_NEURON]]]));"""
+
+template_fb_batch_inference_decl = """FUNCTION_BLOCK FB_[[NAME]]_Batch
+VAR_INPUT
+	pointer_input: POINTER TO [[DATA_TYPE]]; // batch_size x [[NUM_INPUTS]] values, one sample after another
+	pointer_output : POINTER TO [[DATA_TYPE]]; // batch_size x [[NUM_OUTPUTS]] values, one sample after another
+	batch_size : UINT; // number of samples (at most [[MAX_BATCH_SIZE]], further samples are ignored)
+END_VAR
+VAR	
+  i : UINT;
+  s : UINT;
+  num_samples : UINT;
+  pointer_layer_in : POINTER TO [[DATA_TYPE]];
+  pointer_layer_out : POINTER TO [[DATA_TYPE]];
+[[WEIGHTS_VARS]]  batch_buffer_a : ARRAY[0..[[BATCH_BUFFER_SIZE]]-1] OF [[DATA_TYPE]];
+  batch_buffer_b : ARRAY[0..[[BATCH_BUFFER_SIZE]]-1] OF [[DATA_TYPE]];
+END_VAR
+"""
+
+template_fb_batch_inference = """	num_samples := MIN(batch_size, [[MAX_BATCH_SIZE]]);
+	IF num_samples = 0 THEN
+		RETURN;
+	END_IF
+[[NORMALIZATION]]
+	pointer_layer_in := [[FIRST_LAYER_INPUT]];
+
+   // forward inference for all samples (each weight is loaded once per batch)
+	FOR i := 0 TO nn.num_layers-2 DO
+		IF i = nn.num_layers-2 THEN
+			pointer_layer_out := pointer_output;
+		ELSIF pointer_layer_in = ADR(batch_buffer_a) THEN
+			pointer_layer_out := ADR(batch_buffer_b);
+		ELSE
+			pointer_layer_out := ADR(batch_buffer_a);
+		END_IF
+		F_ForwardPropagation_Batch[[TYPE_SUFFIX]](	layer_pre	:= 	nn.layers[i],
+									layer_next	:=	nn.layers[i+1],
+									pointer_in 	:=	pointer_layer_in,
+									pointer_out	:=	pointer_layer_out,
+									batch_size	:=	num_samples	);
+		pointer_layer_in := pointer_layer_out;
 	END_FOR
-	MEMCPY(destAddr:=pointer_output,srcAddr:=ADR(nn.layer_output),n:=SIZEOF([[DATA_TYPE]])*nn.layers[SIZEOF(nn.layers)/SIZEOF(nn.layers[0])-1].num_neurons);
     
-[[DENORMALIZATION]]    
+[[DENORMALIZATION]]    """
+
+template_fb_batch_normalization = """	// input normalization (on a copy, the input of the caller is not modified)
+	MEMCPY(destAddr:=ADR(batch_buffer_a),srcAddr:=pointer_input,n:=SIZEOF([[DATA_TYPE]])*nn.layers[0].num_neurons*num_samples);
+	FOR s := 0 TO num_samples-1 DO
+		F_NormalizationLayer[[TYPE_SUFFIX]](pointer_input := ADR(batch_buffer_a[s*nn.layers[0].num_neurons]),pointer_mean := ADR(nn.weights.normalization_mean),
+			pointer_std := ADR(nn.weights.normalization_std),invert := FALSE, num_neurons := nn.layers[0].num_neurons);
+	END_FOR"""
+
+template_fb_batch_denormalization = """	// output denormalization
+	FOR s := 0 TO num_samples-1 DO
+		F_NormalizationLayer[[TYPE_SUFFIX]](pointer_input := ADR(pointer_output[s*[[NUM_OUTPUTS]]]),pointer_mean := ADR(nn.weights.denormalization_mean),
+			pointer_std := ADR(nn.weights.denormalization_std),invert := TRUE, num_neurons := [[NUM_OUTPUTS]]);
+	END_FOR"""
+
+
+template_fb_hot_swap_input_vars = """	check_for_update : BOOL; // rising edge: read the manifest and load a newer weights version in the background
+"""
+
+template_fb_hot_swap_output_vars = """	weights_version : UDINT; // version of the weights used for the inference (0: [[WEIGHTS_FILE_NAME]])
+	update_busy : BOOL; // a newer weights version is loaded or verified in the background
+	update_error : BOOL; // the last update failed (missing manifest or file, other size or hash), the weights were not switched
+"""
+
+template_fb_hot_swap_nn_vars = """  nn_a : [[NAME_ST_LAYERS]];
+  nn_b : [[NAME_ST_LAYERS]]; // shadow buffer for a weights update, whichever of nn_a and nn_b is not in use
+  nn : REFERENCE TO [[NAME_ST_LAYERS]]; // weights used for the inference
+  pointer_shadow : POINTER TO [[NAME_ST_LAYERS]];
+  check_for_update_previous : BOOL;
+  swap_step : UINT;
+  load_manifest : FB_LoadWeights;
+  manifestPath : T_MaxString := '[[MANIFEST_FILE_PATH]]';
+  manifest : WeightsManifest;
+  load_shadow : [[LOAD_WEIGHTS_FB]];
+  shadowPath : T_MaxString;
+  shadow_compare_res : DINT := 99;
+"""
+
+template_fb_hot_swap_init = """IF NOT __ISVALIDREF(nn) THEN
+	nn REF= nn_a;
 END_IF
 """
+
+template_fb_hot_swap = """	// weights update: read the manifest, load a newer version into the shadow buffer and verify it (one step per call),
+	// then switch the weights between two inferences
+	CASE swap_step OF
+	0:
+		IF check_for_update AND NOT check_for_update_previous THEN
+			update_error := FALSE;
+			MEMSET(destAddr := ADR(manifest), fillByte := 0, n := SIZEOF(manifest)); // an unread manifest has size 0
+			swap_step := 1;
+		END_IF
+	1:
+		load_manifest(execute := TRUE,filePath := manifestPath,ReadAdr := ADR(manifest), ReadLen := SIZEOF(manifest));
+		IF NOT load_manifest.busy THEN
+			IF manifest.weights_size <> SIZEOF(nn.weights) THEN // missing manifest or weights of another model
+				update_error := TRUE;
+				swap_step := 0;
+			ELSIF manifest.version > weights_version THEN
+				pointer_shadow := SEL(ADR(nn) = ADR(nn_a), ADR(nn_a), ADR(nn_b));
+				shadowPath := CONCAT(CONCAT('[[VERSIONED_FILE_PATH_PREFIX]]', UDINT_TO_STRING(manifest.version)), '.dat');
+				swap_step := 2;
+			ELSE
+				swap_step := 0;
+			END_IF
+		END_IF
+	2:
+		load_shadow(execute := TRUE,filePath := shadowPath,ReadAdr := ADR(pointer_shadow^.weights), ReadLen := SIZEOF(nn.weights), ReadOffset := [[WEIGHTS_DATA_OFFSET]][[LOAD_SHADOW_ARGS]]);
+		IF NOT load_shadow.busy THEN
+			swap_step := 3;
+		END_IF
+	3:
+[[SHADOW_CHECK]]
+	4:
+[[SWITCH_WEIGHTS]]
+	END_CASE
+	update_busy := swap_step <> 0;
+	check_for_update_previous := check_for_update;
+"""
+
+template_hot_swap_switch = """		nn REF= pointer_shadow^;
+		weights_version := manifest.version;
+		swap_step := 0;"""
+
+template_hot_swap_check = """		F_GenerateHashValue(hashMode:=E_HashMode.HASH_SHA256,pData := ADR(pointer_shadow^.weights),nData := SIZEOF(nn.weights)-32,pHash := ADR(hash_sha_256_twincat),nHash:=32);
+		shadow_compare_res := MEMCMP(pBuf1 := ADR(hash_sha_256_twincat),ADR(pointer_shadow^.weights.hash_sha_256),32);
+		IF shadow_compare_res = 0 AND MEMCMP(pBuf1 := ADR(manifest.hash_sha_256),ADR(pointer_shadow^.weights.hash_sha_256),32) = 0 THEN
+			swap_step := 4;
+		ELSE
+			update_error := TRUE;
+			swap_step := 0;
+		END_IF"""
+
+template_hot_swap_check_chunked = """		// one hash per call like the initial check: the chunk index first, then chunk by chunk
+		IF shadow_chunk_counter = 0 THEN
+			F_GenerateHashValue(hashMode:=E_HashMode.HASH_SHA256,pData := ADR(pointer_shadow^.weights.chunk_table),nData := SIZEOF(nn.weights.chunk_table)+SIZEOF(nn.weights.chunk_hashes),pHash := ADR(hash_sha_256_twincat),nHash:=32);
+			shadow_compare_res := MEMCMP(pBuf1 := ADR(hash_sha_256_twincat),ADR(pointer_shadow^.weights.chunk_index_hash),32);
+		ELSE
+			F_GenerateHashValue(hashMode:=E_HashMode.HASH_SHA256,pData := ADR(pointer_shadow^.weights) + pointer_shadow^.weights.chunk_table[shadow_chunk_counter-1],
+				nData := pointer_shadow^.weights.chunk_table[shadow_chunk_counter]-pointer_shadow^.weights.chunk_table[shadow_chunk_counter-1],pHash := ADR(hash_sha_256_twincat),nHash:=32);
+			shadow_compare_res := MEMCMP(pBuf1 := ADR(hash_sha_256_twincat),ADR(pointer_shadow^.weights.chunk_hashes[shadow_chunk_counter-1,0]),32);
+		END_IF
+		IF shadow_compare_res <> 0 THEN
+			shadow_chunk_counter := 0;
+			update_error := TRUE;
+			swap_step := 0;
+		ELSIF shadow_chunk_counter < [[NUM_CHUNKS]] THEN
+			shadow_chunk_counter := shadow_chunk_counter + 1;
+		ELSE
+			shadow_chunk_counter := 0;
+			IF MEMCMP(pBuf1 := ADR(manifest.hash_sha_256),ADR(pointer_shadow^.weights.hash_sha_256),32) = 0 THEN
+				swap_step := 4;
+			ELSE
+				update_error := TRUE;
+				swap_step := 0;
+			END_IF
+		END_IF"""
+
+
+template_fb_shared_weights_vars = """  nn : REFERENCE TO [[NAME_ST_LAYERS]]; // weights shared by all instances (GVL_[[NAME]])
+"""
+
+template_fb_shared_weights_init = """IF NOT __ISVALIDREF(nn) THEN
+	nn REF= GVL_[[NAME]].nn;
+END_IF
+"""
+
+template_fb_inference_impl_shared = """IF NOT GVL_[[NAME]].weights.ready THEN
+	GVL_[[NAME]].weights(); // loads and verifies the weights once for all instances[[PROFILING_LOAD]]
+ELSE
+[[INFERENCE]]
+END_IF
+"""
+
+template_fb_shared_weights_decl = """FUNCTION_BLOCK FB_[[NAME]]_Weights
+VAR_OUTPUT
+	ready : BOOL; // GVL_[[NAME]].nn is loaded and verified (called by the instances of FB_[[NAME]] until then)
+END_VAR
+VAR
+[[WEIGHTS_VARS]]END_VAR
+"""
+
+template_gvl_shared_weights = """{attribute 'qualified_only'}
+VAR_GLOBAL
+	nn : [[NAME_ST_LAYERS]]; // weights and layer table of [[NAME]], shared by all instances of FB_[[NAME]]
+	weights : FB_[[NAME]]_Weights; // loads and verifies nn.weights once
+END_VAR"""
+
+template_st_gvl_xml = """<?xml version="1.0" encoding="utf-8"?>
+<TcPlcObject Version="1.1.0.1" ProductVersion="[[TWINCAT_VERSION]]">
+  <GVL Name="GVL_[[NAME]]" Id="{[[UUID]]}">
+    <Declaration><![CDATA[
+[[GVL_DECL]]
+]]></Declaration>
+  </GVL>
+</TcPlcObject>"""
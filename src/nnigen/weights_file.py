@@ -0,0 +1,229 @@
+"""versioned format of the `<name>_weights.dat` files.
+
+A weights file consists of
+
+- a header of `WEIGHTS_HEADER_SIZE` bytes (`WEIGHTS_HEADER_FORMAT`): magic `b"NNIW"`, format version, header size,
+  number of tensors, offset of the tensor table, offset and size of the data, SHA-256 hash of the header fields before
+  it and the tensor table,
+- the tensor table, one record of `tensor_record_dtype` per member of the `LayerWeights` struct (name, PLC data type,
+  byte offset in the data, number of bytes, shape),
+- zeros up to the data offset (a multiple of `WEIGHTS_DATA_ALIGNMENT`),
+- the data: the `LayerWeights` struct as the PLC holds it, i.e. the members in the order of `get_weights_layout` and the
+  SHA-256 hash of all members before it (member `hash_sha_256`, the last 32 bytes of the file).
+
+The members of the struct are naturally aligned (offsets are multiples of their item sizes), so each tensor can be
+mapped with `numpy.memmap` and read without a copy (see `weights_file_reader`). The PLC skips the header and reads the
+data into the struct (`ReadOffset` of `FB_LoadWeights`), single tensors can be read from `data_offset + offset`.
+"""
+
+from typing import BinaryIO, Union
+import hashlib
+import os
+import struct
+import numpy as np
+
+from nnigen.parse_model import model_parser, plc_data_types, HASH_NUM_BYTES
+
+WEIGHTS_FILE_MAGIC = b"NNIW"
+WEIGHTS_FILE_VERSION = 1
+""" version of the weights file format, incremented with incompatible changes"""
+
+WEIGHTS_HEADER_FORMAT = "<4sHHIIQQ32s"
+WEIGHTS_HEADER_SIZE = struct.calcsize(WEIGHTS_HEADER_FORMAT)
+WEIGHTS_DATA_ALIGNMENT = 64
+""" alignment of the data in the file (in bytes)"""
+
+MAX_TENSOR_DIMS = 4
+tensor_record_dtype = np.dtype(
+    [
+        ("name", "S48"),
+        ("data_type", "S8"),
+        ("offset", "<u8"),
+        ("num_bytes", "<u8"),
+        ("num_dims", "<u4"),
+        ("shape", "<u4", (MAX_TENSOR_DIMS,)),
+        ("reserved", "<u4"),
+    ]
+)
+""" record of the tensor table: name and PLC data type (ASCII, zero padded), byte offset in the data, number of bytes,
+number of dimensions and shape (unused dimensions are 0)"""
+
+
+def get_weights_file_layout(parser: model_parser) -> list:
+    """returns the layout of the data of a weights file: `get_weights_layout` of the parser and the hash member."""
+    return parser.get_weights_layout() + [("hash_sha_256", (HASH_NUM_BYTES,), "BYTE")]
+
+
+def get_weights_file_header(layout: list) -> bytes:
+    """returns the header, the tensor table and the padding up to the data for a layout (see `get_weights_file_layout`).
+
+    Raises a `ValueError`, if a member is not naturally aligned in the struct or does not fit into the tensor table.
+    """
+    table = np.zeros(len(layout), dtype=tensor_record_dtype)
+    offset = 0
+    for record, (member_name, shape, data_type) in zip(table, layout):
+        item_size = np.dtype(plc_data_types[data_type]).itemsize
+        if offset % item_size:
+            raise ValueError(f"Member '{member_name}' is not aligned at offset {offset} of the `LayerWeights` struct.")
+        if len(member_name) > tensor_record_dtype["name"].itemsize or len(shape) > MAX_TENSOR_DIMS:
+            raise ValueError(f"Member '{member_name}' with shape {shape} does not fit into the tensor table.")
+
+        num_bytes = int(np.prod(shape)) * item_size
+        record["name"] = member_name.encode("ascii")
+        record["data_type"] = data_type.encode("ascii")
+        record["offset"] = offset
+        record["num_bytes"] = num_bytes
+        record["num_dims"] = len(shape)
+        record["shape"][: len(shape)] = shape
+        offset += num_bytes
+
+    table_offset = WEIGHTS_HEADER_SIZE
+    data_offset = -(-(table_offset + table.nbytes) // WEIGHTS_DATA_ALIGNMENT) * WEIGHTS_DATA_ALIGNMENT
+    header_fields = (
+        WEIGHTS_FILE_MAGIC,
+        WEIGHTS_FILE_VERSION,
+        WEIGHTS_HEADER_SIZE,
+        len(table),
+        table_offset,
+        data_offset,
+        offset,
+    )
+    header = struct.pack(WEIGHTS_HEADER_FORMAT, *header_fields, bytes(HASH_NUM_BYTES))
+    header_hash = hashlib.sha256(header[:-HASH_NUM_BYTES] + table.tobytes()).digest()
+    header = header[:-HASH_NUM_BYTES] + header_hash + table.tobytes()
+    return header + bytes(data_offset - len(header))
+
+
+def get_weights_data_offset(parser: model_parser) -> int:
+    """returns the byte offset of the `LayerWeights` struct in the weights file of the parser."""
+    return len(get_weights_file_header(get_weights_file_layout(parser)))
+
+
+def write_weights_file_to(f: BinaryIO, parser: model_parser) -> bytes:
+    """writes the weights file of the parser to the file object `f` (streamed, see `model_parser.write_weights_binary`).
+
+    ### Outputs:
+
+    the SHA-256 hash of the data (the last 32 bytes)
+    """
+    f.write(get_weights_file_header(get_weights_file_layout(parser)))
+    return parser.write_weights_binary(f)
+
+
+class weights_file_reader:
+    """Reads a weights file without copying the data.
+
+    The file is mapped with `numpy.memmap` (or a `bytes`-like object is used directly). The format is validated when
+    opened, tensors are returned as read-only views of the mapped data (the file stays mapped as long as they exist).
+    """
+
+    def __init__(self, source: Union[str, os.PathLike, bytes], check_hash: bool = True):
+        """weights_file_reader __init__
+
+        ### Inputs:
+
+        source: str | bytes                 ... path of the weights file or its contents
+        check_hash: bool [default: True]    ... raise a `RuntimeError` if the SHA-256 hash of the data does not match
+        """
+        if isinstance(source, (str, os.PathLike)):
+            self.file_path = os.fspath(source)
+            self.buffer = np.memmap(self.file_path, dtype=np.uint8, mode="r")
+        else:
+            self.file_path = None
+            self.buffer = np.frombuffer(source, dtype=np.uint8)
+
+        self._read_header()
+        if check_hash and not self.verify_hash():
+            raise RuntimeError("SHA-256 hash of the weights does not match their contents.")
+
+    def _read_header(self):
+        """validates the header and the tensor table (raises a `RuntimeError` for invalid files)."""
+        if len(self.buffer) < WEIGHTS_HEADER_SIZE or bytes(self.buffer[:4]) != WEIGHTS_FILE_MAGIC:
+            raise RuntimeError("Not a weights file of nnigen (missing header), export the model again.")
+        (
+            _,
+            self.format_version,
+            header_size,
+            num_tensors,
+            table_offset,
+            self.data_offset,
+            self.data_size,
+            header_hash,
+        ) = struct.unpack_from(WEIGHTS_HEADER_FORMAT, self.buffer)
+        if self.format_version != WEIGHTS_FILE_VERSION:
+            raise RuntimeError(
+                f"Weights file format version {self.format_version} is not supported (expected {WEIGHTS_FILE_VERSION})."
+            )
+
+        table_end = table_offset + num_tensors * tensor_record_dtype.itemsize
+        if header_size != WEIGHTS_HEADER_SIZE or not WEIGHTS_HEADER_SIZE <= table_end <= self.data_offset:
+            raise RuntimeError("Invalid header of the weights file.")
+        if self.data_offset + self.data_size != len(self.buffer) or self.data_size < HASH_NUM_BYTES:
+            raise RuntimeError(
+                f"Weights file has {len(self.buffer)} bytes, but the header requires {self.data_offset + self.data_size}."
+            )
+        m = hashlib.sha256(self.buffer[: WEIGHTS_HEADER_SIZE - HASH_NUM_BYTES])
+        m.update(self.buffer[table_offset:table_end])
+        if m.digest() != header_hash:
+            raise RuntimeError("SHA-256 hash of the header does not match the tensor table.")
+
+        self.table = np.frombuffer(self.buffer, dtype=tensor_record_dtype, count=num_tensors, offset=table_offset)
+        self.tensors = {}
+        for record in self.table:
+            name, data_type = record["name"].decode("ascii"), record["data_type"].decode("ascii")
+            shape = tuple(int(dim) for dim in record["shape"][: record["num_dims"]])
+            if data_type not in plc_data_types or record["num_dims"] > MAX_TENSOR_DIMS:
+                raise RuntimeError(f"Invalid record of tensor '{name}' in the weights file.")
+            dtype = np.dtype("<" + plc_data_types[data_type])
+            offset, num_bytes = int(record["offset"]), int(record["num_bytes"])
+            if num_bytes != int(np.prod(shape)) * dtype.itemsize or offset % dtype.itemsize:
+                raise RuntimeError(f"Invalid shape or offset of tensor '{name}' in the weights file.")
+            if offset + num_bytes > self.data_size:
+                raise RuntimeError(f"Tensor '{name}' exceeds the data of the weights file.")
+            self.tensors[name] = (shape, data_type, offset)
+
+    def get_data(self) -> np.ndarray:
+        """returns the data (the `LayerWeights` struct including the hash) as view of bytes."""
+        return self.buffer[self.data_offset :]
+
+    def get_hash(self) -> bytes:
+        """returns the SHA-256 hash stored at the end of the data."""
+        return bytes(self.buffer[-HASH_NUM_BYTES:])
+
+    def verify_hash(self) -> bool:
+        """checks the SHA-256 hash of the data (hashed directly from the mapped file)."""
+        return hashlib.sha256(self.buffer[self.data_offset : -HASH_NUM_BYTES]).digest() == self.get_hash()
+
+    def get_layout(self) -> list:
+        """returns the `(member_name, shape, data_type)` tuples of the tensor table (see `get_weights_file_layout`)."""
+        return [(name, shape, data_type) for name, (shape, data_type, _) in self.tensors.items()]
+
+    def check_layout(self, parser: model_parser):
+        """raises a `RuntimeError`, if the tensors of the file differ from the `LayerWeights` struct of the parser."""
+        expected_layout = [
+            (member_name, tuple(shape), data_type) for member_name, shape, data_type in get_weights_file_layout(parser)
+        ]
+        if self.get_layout() != expected_layout:
+            differences = set(self.get_layout()).symmetric_difference(expected_layout)
+            raise RuntimeError(
+                f"Tensors of the weights file do not match the model '{parser.model_name}': {sorted(differences)}."
+            )
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.tensors
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """returns the tensor `name` as read-only view of the mapped data."""
+        shape, data_type, offset = self.tensors[name]
+        values = np.frombuffer(
+            self.buffer,
+            dtype="<" + plc_data_types[data_type],
+            count=int(np.prod(shape)),
+            offset=self.data_offset + offset,
+        ).reshape(shape)
+        values.flags.writeable = False
+        return values
+
+    def get_weights(self) -> dict:
+        """returns all tensors except the hash as dictionary of views (see `model_parser.get_weights`)."""
+        return {name: self[name] for name in self.tensors if name != "hash_sha_256"}
@@ -0,0 +1,28 @@
+import os
+import numpy as np
+import pytest
+
+from nnigen import emulator
+from nnigen.nnigen import get_model_parser
+from nnigen.parse_model import activation_or_normalization
+
+TEST_MODEL_PATH = os.path.join(os.path.dirname(__file__), "..", "examples", "Python", "test_model.keras")
+
+
+@pytest.mark.parametrize("nn_data_type", ["LREAL", "REAL"])
+def test_activation_kernels_match_scalar_functions(nn_data_type):
+    parser = get_model_parser(TEST_MODEL_PATH, "test_model", nn_data_type=nn_data_type)
+    inputs = np.random.default_rng(0).standard_normal((200, parser.input_dim)) * 5
+    assert emulator.rtnni_emulator(parser).check_activation_kernels(inputs) > 0
+
+
+def test_changed_kernel_branch_is_detected(monkeypatch):
+    # softsign computed in REAL instead of calling F_softsign in LREAL rounds differently
+    kernel = dict(emulator.activation_layer_kernels["REAL"])
+    kernel[activation_or_normalization.softsign] = emulator._inlined_softsign
+    monkeypatch.setitem(emulator.activation_layer_kernels, "REAL", kernel)
+
+    parser = get_model_parser(TEST_MODEL_PATH, "test_model", nn_data_type="REAL")
+    inputs = np.random.default_rng(0).standard_normal((10, parser.input_dim))
+    with pytest.raises(RuntimeError, match="softsign"):
+        emulator.rtnni_emulator(parser).check_activation_kernels(inputs)
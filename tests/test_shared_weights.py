@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from nnigen.chunking import chunked_weights_parser
+from nnigen.gen_st import ST_writer
+from nnigen.nnigen import get_model_parser
+
+keras = pytest.importorskip("keras")
+
+
+def get_normalized_model(sequence: bool = False) -> "keras.Sequential":
+    keras.utils.set_random_seed(0)
+    return keras.Sequential(
+        [
+            keras.Input((None, 3) if sequence else (3,)),
+            keras.layers.Normalization(mean=np.zeros(3), variance=np.ones(3)),
+        ]
+        + ([keras.layers.LSTM(4)] if sequence else [])
+        + [keras.layers.Dense(8, activation="relu"), keras.layers.Dense(2)]
+    )
+
+
+@pytest.mark.parametrize(
+    "writer_options, weights_chunk_size, sequence",
+    [
+        ({}, None, False),
+        ({"specialized": True}, None, False),
+        ({}, 64, False),
+        ({"profiling_trace_length": 16}, None, False),
+        ({}, None, True),
+    ],
+)
+def test_shared_weights_use_the_local_layer_buffers(tmp_path, writer_options, weights_chunk_size, sequence):
+    parser = get_model_parser(get_normalized_model(sequence), "shared")
+    if weights_chunk_size is not None:
+        parser = chunked_weights_parser(parser, weights_chunk_size)
+    writer = ST_writer("shared", parser, shared_weights=True, **writer_options)
+    writer.write_ST_files_to(str(tmp_path), overwrite_if_exists=True)
+
+    fb_inference = writer.to_write["FB_shared.st"]
+    assert "ADR(layer_buffer_a)" in fb_inference  # the normalized input
+    assert "nn.layer_buffer" not in fb_inference
+    assert "layer_buffer" not in writer.to_write["shared_Layers.st"]